@@ -1,9 +1,26 @@
+import json
 from collections.abc import Callable
 from dataclasses import dataclass
 from typing import Any
 
+from pydantic import BaseModel
 from typing_extensions import Self
 
+from fetchbits.core.utils.function_schema import convert_function_to_function_schema, function_arguments_model
+
+
+
+@dataclass
+
+class ToolCall:
+    """
+    A tool call requested by the LLM.
+    """
+
+    id: str
+    name: str
+    arguments: dict[str, Any] | str
+    """The arguments, either decoded or as the JSON generated by the LLM."""
 
 
 @dataclass
@@ -23,6 +40,7 @@ class Tool:
     description : str
     parameters: dict[str, Any]
     on_tool_call : Callable
+    arguments_model: type[BaseModel] | None = None
 
     @classmethod
     def from_callable(cls,callable : Callable) -> Self:
@@ -33,7 +51,46 @@ class Tool:
             description=schema["function"]["description"],
             parameters=schema["function"]["parameters"],
             on_tool_call=callable,
+            arguments_model=function_arguments_model(callable),
         )
+
+    def parse_arguments(self, json_str: str) -> dict[str, Any]:
+        """
+        Parse and validate the arguments of a tool call generated by the LLM in a single pass.
+
+        Args:
+            json_str: The JSON object with the arguments. An empty string means no arguments.
+
+        Returns:
+            The validated arguments, ready to be passed to the tool as keyword arguments.
+
+        Raises:
+            ValidationError: If the arguments do not match the parameters of the tool.
+        """
+        if self.arguments_model is None:
+            # Tools created without a callable have no model, their arguments are only decoded.
+            return json.loads(json_str or "{}")
+
+        return dict(self.arguments_model.model_validate_json(json_str or "{}"))
+
+    def validate_arguments(self, arguments: dict[str, Any] | str) -> dict[str, Any]:
+        """
+        Validate the arguments of a tool call, either already decoded or as the JSON generated by the LLM.
+
+        Args:
+            arguments: The arguments, see `ToolCall.arguments`.
+
+        Returns:
+            The validated arguments, ready to be passed to the tool as keyword arguments.
+
+        Raises:
+            ValidationError: If the arguments do not match the parameters of the tool.
+        """
+        if isinstance(arguments, str):
+            return self.parse_arguments(arguments)
+        if self.arguments_model is None:
+            return arguments
+        return dict(self.arguments_model.model_validate(arguments))
     
     def to_function_schema(self) -> dict[str,Any]:
          """
@@ -0,0 +1,174 @@
+import asyncio
+import contextlib
+import inspect
+from collections.abc import Callable, Sequence
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Literal, overload
+
+from typing_extensions import Self
+
+from fetchbits.agents.exceptions import (
+    AgentToolDuplicateError,
+    AgentToolExecutionError,
+    AgentToolNotAvailableError,
+)
+from fetchbits.agents.tool import Tool, ToolCall, ToolCallResult
+
+
+class ToolExecutor:
+    """
+    Runs the batch of tool calls requested by the LLM in one turn concurrently. Async tools run on the event loop,
+    sync tools are offloaded to a bounded pool, so independent calls do not wait for each other.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[Tool | Callable],
+        timeout: float | None = 60.0,
+        max_workers: int = 8,
+        executor: Executor | None = None,
+    ) -> None:
+        """
+        Constructs a new ToolExecutor instance.
+
+        Args:
+            tools: The tools available to the LLM. Callables are converted with `Tool.from_callable`.
+            timeout: The number of seconds every tool call may take once it starts running, None for no limit.
+                Sync tools which time out keep running in their worker, since threads cannot be interrupted.
+            max_workers: The number of sync tool calls running at once, and the number of threads of the pool
+                running them. With an `executor`, it should match the number of its workers.
+            executor: The pool running the sync tools, e.g. a process pool for CPU-bound tools with picklable
+                callables. It is not shut down by `close`.
+
+        Raises:
+            AgentToolDuplicateError: If multiple tools have the same name.
+        """
+        self.tools: dict[str, Tool] = {}
+        for tool in tools:
+            tool = tool if isinstance(tool, Tool) else Tool.from_callable(tool)
+            if tool.name in self.tools:
+                raise AgentToolDuplicateError(tool.name)
+            self.tools[tool.name] = tool
+
+        self.timeout = timeout
+        self._max_workers = max_workers
+        self._workers = asyncio.Semaphore(max_workers)
+        self._executor = executor
+        self._owned_executor: ThreadPoolExecutor | None = None
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is not None:
+            return self._executor
+        if self._owned_executor is None:
+            self._owned_executor = ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="fetchbits-tool"
+            )
+        return self._owned_executor
+
+    def close(self) -> None:
+        """
+        Shuts the thread pool of the sync tools down, without waiting for the running calls.
+        """
+        if self._owned_executor is not None:
+            self._owned_executor.shutdown(wait=False, cancel_futures=True)
+            self._owned_executor = None
+
+    @overload
+    async def execute(
+        self, tool_calls: Sequence[ToolCall], return_exceptions: Literal[False] = False
+    ) -> list[ToolCallResult]: ...
+
+    @overload
+    async def execute(
+        self, tool_calls: Sequence[ToolCall], return_exceptions: Literal[True]
+    ) -> list[ToolCallResult | AgentToolExecutionError]: ...
+
+    async def execute(
+        self, tool_calls: Sequence[ToolCall], return_exceptions: bool = False
+    ) -> list[ToolCallResult] | list[ToolCallResult | AgentToolExecutionError]:
+        """
+        Runs the tool calls concurrently. By default, if any of them fails, the others are cancelled.
+
+        Args:
+            tool_calls: The tool calls requested by the LLM.
+            return_exceptions: Whether to run all the calls to completion and return the error of every failed
+                call in place of its result, instead of raising the first error.
+
+        Returns:
+            The results of the tool calls, or their errors if `return_exceptions` is set, in the order of the calls.
+
+        Raises:
+            AgentToolNotAvailableError: If any of the called tools is not available. No tool is run then.
+            AgentToolExecutionError: If any of the tool calls fails, has invalid arguments or times out,
+                unless `return_exceptions` is set.
+        """
+        for tool_call in tool_calls:
+            if tool_call.name not in self.tools:
+                raise AgentToolNotAvailableError(tool_call.name)
+
+        tasks = [asyncio.ensure_future(self._execute(tool_call)) for tool_call in tool_calls]
+        if return_exceptions:
+            try:
+                return list(await asyncio.gather(*tasks, return_exceptions=True))
+            except asyncio.CancelledError:
+                for task in tasks:
+                    task.cancel()
+                raise
+
+        try:
+            return list(await asyncio.gather(*tasks))
+        except AgentToolExecutionError:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _execute(self, tool_call: ToolCall) -> ToolCallResult:
+        tool = self.tools[tool_call.name]
+        try:
+            arguments = tool.validate_arguments(tool_call.arguments)
+            if inspect.iscoroutinefunction(tool.on_tool_call):
+                result = await asyncio.wait_for(tool.on_tool_call(**arguments), timeout=self.timeout)
+            else:
+                result = await self._call_sync(tool, arguments)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            raise AgentToolExecutionError(tool.name, e) from e
+
+        return ToolCallResult(id=tool_call.id, name=tool.name, arguments=arguments, result=result)
+
+    async def _call_sync(self, tool: Tool, arguments: dict[str, Any]) -> Any:  # noqa: ANN401
+        """
+        Runs the sync tool in the pool. The call waits for a free worker first, so the timeout counts only
+        the time it runs, and its worker is counted as busy until the call returns, even after a timeout.
+        """
+        loop = asyncio.get_running_loop()
+        await self._workers.acquire()
+        try:
+            future = self._get_executor().submit(partial(tool.on_tool_call, **arguments))
+        except BaseException:
+            self._workers.release()
+            raise
+        future.add_done_callback(partial(self._release_worker, loop))
+
+        async def _run() -> Any:  # noqa: ANN401
+            result = await asyncio.wrap_future(future)
+            # Sync callables may still return awaitables, e.g. partials of async functions.
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+
+        return await asyncio.wait_for(_run(), timeout=self.timeout)
+
+    def _release_worker(self, loop: asyncio.AbstractEventLoop, _: Future) -> None:
+        # Called from the worker thread, possibly after the event loop was closed.
+        with contextlib.suppress(RuntimeError):
+            loop.call_soon_threadsafe(self._workers.release)
@@ -0,0 +1,65 @@
+import pytest
+from pydantic import ValidationError
+
+from fetchbits.agents.tool import Tool
+
+
+def get_weather(location: str, days: int = 1, units: str = "celsius") -> str:
+    """
+    Returns the weather forecast.
+
+    Args:
+        location: The city to get the forecast for.
+        days: The number of days of the forecast.
+        units: The temperature units.
+    """
+    return f"{location} {days} {units}"
+
+
+def test_tool_from_callable() -> None:
+    tool = Tool.from_callable(get_weather)
+
+    assert tool.name == "get_weather"
+    assert tool.description == "Returns the weather forecast."
+    assert tool.parameters["required"] == ["location"]
+    assert tool.parameters["properties"]["location"]["description"] == "The city to get the forecast for."
+    assert tool.to_function_schema()["function"]["parameters"] == tool.parameters
+
+
+def test_parse_arguments() -> None:
+    tool = Tool.from_callable(get_weather)
+
+    assert tool.parse_arguments('{"location": "Paris", "days": "3"}') == {
+        "location": "Paris",
+        "days": 3,
+        "units": "celsius",
+    }
+
+
+@pytest.mark.parametrize("json_str", ['{"days": 3}', '{"location": "Paris", "days": "many"}', "", "not json"])
+def test_parse_invalid_arguments(json_str: str) -> None:
+    tool = Tool.from_callable(get_weather)
+
+    with pytest.raises(ValidationError):
+        tool.parse_arguments(json_str)
+
+
+def test_validate_arguments() -> None:
+    tool = Tool.from_callable(get_weather)
+
+    assert tool.validate_arguments({"location": "Paris", "days": "2"}) == {
+        "location": "Paris",
+        "days": 2,
+        "units": "celsius",
+    }
+    assert tool.validate_arguments('{"location": "Oslo"}')["location"] == "Oslo"
+    with pytest.raises(ValidationError):
+        tool.validate_arguments({"days": 2})
+
+
+def test_arguments_of_tool_without_model_are_only_decoded() -> None:
+    tool = Tool(name="echo", description="Echo.", parameters={}, on_tool_call=print)
+
+    assert tool.parse_arguments('{"text": 1}') == {"text": 1}
+    assert tool.parse_arguments("") == {}
+    assert tool.validate_arguments({"text": 1}) == {"text": 1}
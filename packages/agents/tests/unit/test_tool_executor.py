@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from fetchbits.agents.exceptions import AgentToolDuplicateError, AgentToolExecutionError, AgentToolNotAvailableError
+from fetchbits.agents.tool import ToolCall, ToolCallResult
+from fetchbits.agents.tool_executor import ToolExecutor
+
+
+async def wait(seconds: float) -> float:
+    """
+    Waits asynchronously.
+
+    Args:
+        seconds: The number of seconds to wait.
+    """
+    await asyncio.sleep(seconds)
+    return seconds
+
+
+def block(seconds: float) -> str:
+    """
+    Blocks the calling thread.
+
+    Args:
+        seconds: The number of seconds to block.
+    """
+    time.sleep(seconds)
+    return threading.current_thread().name
+
+
+def fail(message: str) -> None:
+    """
+    Fails with the message.
+
+    Args:
+        message: The error message.
+    """
+    raise RuntimeError(message)
+
+
+def _call(name: str, index: int = 0, **arguments: object) -> ToolCall:
+    return ToolCall(id=f"call-{index}", name=name, arguments=arguments)
+
+
+def test_duplicate_tools_are_rejected() -> None:
+    with pytest.raises(AgentToolDuplicateError):
+        ToolExecutor([wait, wait])
+
+
+@pytest.mark.asyncio
+async def test_calls_run_concurrently() -> None:
+    async with ToolExecutor([wait, block], max_workers=4) as executor:
+        start = time.perf_counter()
+        results = await executor.execute(
+            [_call("wait", 0, seconds=0.2), _call("block", 1, seconds=0.2), _call("block", 2, seconds="0.2")]
+        )
+        elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5
+    assert [result.id for result in results] == ["call-0", "call-1", "call-2"]
+    assert results[0] == ToolCallResult(id="call-0", name="wait", arguments={"seconds": 0.2}, result=0.2)
+    assert results[2].arguments == {"seconds": 0.2}
+    assert all(result.result.startswith("fetchbits-tool") for result in results[1:])
+
+
+@pytest.mark.asyncio
+async def test_json_arguments_are_parsed() -> None:
+    async with ToolExecutor([wait]) as executor:
+        results = await executor.execute([ToolCall(id="call", name="wait", arguments='{"seconds": 0}')])
+
+    assert results[0].result == 0
+
+
+@pytest.mark.asyncio
+async def test_unknown_tool_runs_nothing() -> None:
+    calls: list[float] = []
+
+    def record(seconds: float) -> None:
+        calls.append(seconds)
+
+    async with ToolExecutor([record]) as executor:
+        with pytest.raises(AgentToolNotAvailableError):
+            await executor.execute([_call("record", seconds=1.0), _call("missing")])
+
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_failure_cancels_the_other_calls() -> None:
+    async with ToolExecutor([wait, fail]) as executor:
+        start = time.perf_counter()
+        with pytest.raises(AgentToolExecutionError) as error:
+            await executor.execute([_call("wait", 0, seconds=5), _call("fail", 1, message="broken")])
+
+    assert time.perf_counter() - start < 1
+    assert error.value.tool_name == "fail"
+    assert isinstance(error.value.error, RuntimeError)
+
+
+@pytest.mark.asyncio
+async def test_errors_are_returned_in_place_of_results() -> None:
+    async with ToolExecutor([wait, fail]) as executor:
+        outcomes = await executor.execute(
+            [_call("fail", 0, message="broken"), _call("wait", 1, seconds=0.01), _call("wait", 2, seconds="soon")],
+            return_exceptions=True,
+        )
+
+    assert isinstance(outcomes[0], AgentToolExecutionError)
+    assert isinstance(outcomes[1], ToolCallResult)
+    assert outcomes[1].result == 0.01
+    assert isinstance(outcomes[2], AgentToolExecutionError)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("tool_name", ["wait", "block"])
+async def test_calls_time_out(tool_name: str) -> None:
+    async with ToolExecutor([wait, block], timeout=0.05) as executor:
+        with pytest.raises(AgentToolExecutionError) as error:
+            await executor.execute([_call(tool_name, seconds=0.5)])
+
+    assert isinstance(error.value.error, TimeoutError)
+
+
+@pytest.mark.asyncio
+async def test_timeout_counts_only_the_running_time() -> None:
+    # With a single worker the second call waits for the first one, longer than the timeout.
+    async with ToolExecutor([block], timeout=0.3, max_workers=1) as executor:
+        results = await executor.execute([_call("block", 0, seconds=0.2), _call("block", 1, seconds=0.2)])
+
+    assert len(results) == 2
+
+
+@pytest.mark.asyncio
+async def test_custom_executor_is_not_shut_down() -> None:
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="custom")
+    async with ToolExecutor([block], executor=pool, max_workers=2) as executor:
+        results = await executor.execute([_call("block", seconds=0)])
+
+    assert results[0].result.startswith("custom")
+    assert pool.submit(int, "1").result() == 1
+    pool.shutdown()
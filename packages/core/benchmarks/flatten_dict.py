@@ -0,0 +1,67 @@
+"""
+Benchmarks of flattening metadata with `flatten_dict` and `flatten_many`, compared with the previous
+implementation copying the accumulator at every nested dict.
+
+Run with: python packages/core/benchmarks/flatten_dict.py
+"""
+
+import timeit
+from typing import Any
+
+from fetchbits.core.utils.dict_transformations import SimpleTypes, flatten_dict, flatten_many
+
+
+def _copying_flatten_dict(input_dict: dict[str, Any], parent_key: str = "", sep: str = ".") -> dict[str, SimpleTypes]:
+    items: dict[str, SimpleTypes] = {}
+    for k, v in input_dict.items():
+        new_key = f"{parent_key}{sep}{k}" if parent_key else k
+        if isinstance(v, dict):
+            items = {**items, **_copying_flatten_dict(v, new_key, sep=sep)}
+        elif isinstance(v, list):
+            for i, item in enumerate(v):
+                list_key = f"{new_key}[{i}]"
+                if isinstance(item, dict):
+                    items = {**items, **_copying_flatten_dict(item, list_key, sep=sep)}
+                else:
+                    items[list_key] = item if isinstance(item, SimpleTypes) else str(item)
+        else:
+            items[new_key] = v if isinstance(v, SimpleTypes) else str(v)
+    return items
+
+
+def deep_payload(depth: int, width: int) -> dict[str, Any]:
+    """Nested dicts `depth` levels deep with `width` leaves on every level."""
+    payload: dict[str, Any] = {f"leaf{i}": i for i in range(width)}
+    for level in range(depth):
+        payload = {f"level{level}": payload, **{f"leaf{i}": i for i in range(width)}}
+    return payload
+
+
+def wide_payload(items: int, fields: int) -> dict[str, Any]:
+    """A list of `items` dicts with `fields` leaves each, like chunks or tags of a document."""
+    return {"source": "doc", "chunks": [{f"field{j}": j for j in range(fields)} for _ in range(items)]}
+
+
+def _report(name: str, payloads: list[dict[str, Any]], number: int) -> None:
+    copying = timeit.timeit(lambda: [_copying_flatten_dict(payload) for payload in payloads], number=number)
+    single = timeit.timeit(lambda: [flatten_dict(payload) for payload in payloads], number=number)
+    batch = timeit.timeit(lambda: flatten_many(payloads), number=number)
+    print(
+        f"{name:<28} copying {copying / number * 1e3:9.3f} ms"
+        f"  flatten_dict {single / number * 1e3:9.3f} ms"
+        f"  flatten_many {batch / number * 1e3:9.3f} ms"
+    )
+
+
+def main() -> None:
+    """Runs the benchmarks."""
+    for depth in (10, 50, 200):
+        _report(f"deep depth={depth}", [deep_payload(depth, 5)], number=50)
+    for items in (10, 100, 1000):
+        _report(f"wide items={items}", [wide_payload(items, 5)], number=20)
+    _report("batch 1000 x flat", [{"a": i, "b": {"c": i, "d": [i, i]}} for i in range(1000)], number=20)
+    _report("batch 1000 x wide", [wide_payload(10, 5) for _ in range(1000)], number=5)
+
+
+if __name__ == "__main__":
+    main()
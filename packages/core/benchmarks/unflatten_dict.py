@@ -0,0 +1,36 @@
+"""
+Benchmarks of reading flattened metadata back with `unflatten_dict` row by row and with `unflatten_many`.
+
+Run with: python packages/core/benchmarks/unflatten_dict.py
+"""
+
+import timeit
+from typing import Any
+
+from fetchbits.core.utils.dict_transformations import flatten_dict, unflatten_dict, unflatten_many
+
+
+def hit_metadata(i: int, chunks: int) -> dict[str, Any]:
+    """Metadata of a retrieved chunk, as stored by a document ingestion."""
+    return {
+        "document": {"title": f"title {i}", "source": {"path": f"/docs/{i}.pdf", "type": "pdf"}},
+        "tags": ["a", "b", "c"],
+        "chunks": [{"page": j, "score": j / 10} for j in range(chunks)],
+    }
+
+
+def _report(name: str, rows: list[dict[str, Any]], number: int) -> None:
+    single = timeit.timeit(lambda: [unflatten_dict(row) for row in rows], number=number)
+    batch = timeit.timeit(lambda: unflatten_many(rows), number=number)
+    print(f"{name:<32} unflatten_dict {single / number * 1e3:9.3f} ms  unflatten_many {batch / number * 1e3:9.3f} ms")
+
+
+def main() -> None:
+    """Runs the benchmarks."""
+    for hits in (10, 1000, 10000):
+        _report(f"hits={hits} same keys", [flatten_dict(hit_metadata(i, 5)) for i in range(hits)], number=5)
+    _report("hits=1000 varying keys", [flatten_dict(hit_metadata(i, i % 10)) for i in range(1000)], number=5)
+
+
+if __name__ == "__main__":
+    main()
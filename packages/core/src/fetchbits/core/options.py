@@ -1,52 +1,191 @@
 from abc import ABC
+from collections.abc import Hashable
 from typing import Any, ClassVar, TypeVar
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 from typing_extensions import Self
 
-from ragbits.core.types import NotGiven
+from fetchbits.core.types import NotGiven
 
 OptionsT = TypeVar("OptionsT",bound = "Options")
 
+_MERGE_CACHE_SIZE = 128
+
+
+class _FrozenDict(dict):
+    """A dict rejecting modifications, holding the nested dicts of the options."""
+
+    def _immutable(self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        raise TypeError("Options are immutable, their nested dicts cannot be modified.")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = __ior__ = _immutable  # type: ignore
+
+    def __reduce__(self) -> tuple:
+        return _FrozenDict, (dict(self),)
+
+
+class _FrozenList(list):
+    """A list rejecting modifications, holding the nested lists of the options."""
+
+    def _immutable(self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        raise TypeError("Options are immutable, their nested lists cannot be modified.")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable  # type: ignore
+    append = extend = insert = pop = remove = clear = sort = reverse = _immutable  # type: ignore
+
+    def __reduce__(self) -> tuple:
+        return _FrozenList, (list(self),)
+
+
+def _freeze_containers(value: Any) -> Any:  # noqa: ANN401
+    """Copies the nested dicts and lists of an option value into their immutable counterparts."""
+    if isinstance(value, dict) and not isinstance(value, _FrozenDict):
+        return _FrozenDict({key: _freeze_containers(item) for key, item in value.items()})
+    if isinstance(value, list) and not isinstance(value, _FrozenList):
+        return _FrozenList(_freeze_containers(item) for item in value)
+    return value
+
+
+def _thaw_containers(value: Any) -> Any:  # noqa: ANN401
+    """Copies the immutable dicts and lists of an option value back into plain ones."""
+    if isinstance(value, dict):
+        return {key: _thaw_containers(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_thaw_containers(item) for item in value]
+    return value
+
+
+def _freeze(value: Any) -> Hashable:  # noqa: ANN401
+    """
+    Converts the value of an option to a hashable equivalent. Scalars are tagged with their type,
+    so e.g. `True`, `1` and `1.0` are all different options. The metadata filters tag only bools,
+    so there `1` and `1.0` are equal.
+    """
+    if isinstance(value, Options):
+        return value._frozen()
+    if isinstance(value, dict):
+        return dict, tuple(sorted(((_freeze(key), _freeze(item)) for key, item in value.items()), key=repr))
+    if isinstance(value, list | tuple):
+        return type(value).__name__, tuple(_freeze(item) for item in value)
+    if isinstance(value, set | frozenset):
+        return frozenset, frozenset(_freeze(item) for item in value)
+    if isinstance(value, BaseModel):
+        return type(value), _freeze(value.model_dump())
+    try:
+        hash(value)
+    except TypeError:
+        return type(value), repr(value)
+    return type(value), value
+
+
 class Options(BaseModel,ABC):
     """
     A dataclass that represents all available options. Thanks to the extra='allow' configuration, it allows for
     additional fields that are not defined in the class.
+
+    The options are immutable and hashable, so the results of merging them and their provider-ready dictionaries
+    are computed once and reused by the hot paths merging the default and per-call options on every call.
+    Nested dicts and lists are copied into immutable ones on validation, so the cached results cannot go stale.
     """
 
-    model_config = ConfigDict(extra="allow", arbitrary_types_allowed=True)
+    model_config = ConfigDict(extra="allow", arbitrary_types_allowed=True, frozen=True)
     _not_given : ClassVar[Any] = None
 
-    def __or__(self,other : "Options") -> Self:
+    _hash: int | None = PrivateAttr(default=None)
+    _frozen_values: Hashable | None = PrivateAttr(default=None)
+    _merged: dict["Options", "Options"] = PrivateAttr(default_factory=dict)
+    _resolved: dict[str, Any] | None = PrivateAttr(default=None)
+
+    def model_post_init(self, context: Any) -> None:  # noqa: ANN401
         """
-        Merges two Options, prioritizing non-NOT_GIVEN values from the 'other' object.
+        Freezes the nested containers of the values.
         """
-        self_dict = self.model_dump()
-        other_dict = other.model_dump()
+        for values in (self.__dict__, self.__pydantic_extra__ or {}):
+            for key, value in values.items():
+                if isinstance(value, dict | list):
+                    values[key] = _freeze_containers(value)
+
+    def _values(self) -> dict[str, Any]:
+        if not self.__pydantic_extra__:
+            return self.__dict__
+        return {**self.__dict__, **self.__pydantic_extra__}
+
+    # The private attributes are read from `__pydantic_private__` directly, which is much faster than through
+    # the attribute lookup of pydantic on the hot paths.
+
+    def _frozen(self) -> Hashable:
+        private = self.__pydantic_private__
+        if private["_frozen_values"] is None:
+            private["_frozen_values"] = type(self), _freeze(self._values())
+        return private["_frozen_values"]
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Options):
+            return NotImplemented
+        return self is other or self._frozen() == other._frozen()
 
-        updated_dict= {
-            key : other_dict[key]
-            if not isinstance(other_dict[key],NotGiven) and key in other_dict
-            else self_dict[key]
-            for key in self.dict.keys() | other.dict.keys()
+    def __hash__(self) -> int:
+        private = self.__pydantic_private__
+        if private["_hash"] is None:
+            private["_hash"] = hash(self._frozen())
+        return private["_hash"]
+
+    def model_copy(self, *, update: dict[str, Any] | None = None, deep: bool = False) -> Self:
+        """
+        Copies the options, dropping the cached merges, hash and dictionary which no longer apply to the copy.
+        """
+        copied = super().model_copy(update=update, deep=deep)
+        copied.model_post_init(None)
+        copied.__pydantic_private__ = {
+            "_hash": None,
+            "_frozen_values": None,
+            "_merged": {},
+            "_resolved": None,
         }
+        return copied
 
-        return self.__class__(**updated_dict)
-    
+    def __or__(self,other : "Options") -> Self:
+        """
+        Merges two Options, prioritizing non-NOT_GIVEN values from the 'other' object.
+        The merged options are cached per the 'other' options, equal ones included.
+        """
+        merged_cache = self.__pydantic_private__["_merged"]
+        merged = merged_cache.get(other)
+        if merged is not None:
+            return merged  # type: ignore[return-value]
+
+        self_values = self._values()
+        other_values = other._values()
+        updated_dict = {
+            key: other_values[key]
+            if key in other_values and not isinstance(other_values[key], NotGiven)
+            else self_values[key]
+            for key in self_values.keys() | other_values.keys()
+        }
+        # Both sides were validated already, so the merged values are not validated again.
+        merged = self.__class__.model_construct(**updated_dict)
 
+        if len(merged_cache) >= _MERGE_CACHE_SIZE:
+            merged_cache.clear()
+        merged_cache[other] = merged
+        return merged
 
     def dict(self) -> dict[str,Any]:
         """
         Creates a dictionary representation of the Options instance.
         If a value is None, it will be replaced with a provider-specific not-given sentinel.
+        The dictionary is computed once, every call returns its copy. Only the nested dicts and lists are copied,
+        the other values, the not-given sentinel included, are returned as they are.
 
         Returns:
             A dictionary representation of the Options instance.
         """
-        options = self.model_dump()
+        private = self.__pydantic_private__
+        if private["_resolved"] is None:
+            options = _thaw_containers(self.model_dump())
+            private["_resolved"] = {
+                key: self._not_given if value is None or isinstance(value, NotGiven) else value
+                for key, value in options.items()
+            }
 
-        return {
-            key: self._not_given if value is None or isinstance(value, NotGiven) else value
-            for key, value in options.items()
-        }
\ No newline at end of file
+        return _thaw_containers(private["_resolved"])
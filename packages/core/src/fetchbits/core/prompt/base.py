@@ -1,9 +1,13 @@
 from abc import ABCMeta, abstractmethod
+from collections.abc import Sequence
 from typing import Any, Generic
 
 from pydantic import BaseModel
 from typing_extensions import Self, TypeVar
 
+from fetchbits.core.prompt.history import HistoryBudget, estimate_message_tokens
+from fetchbits.core.prompt.prefix_hash import EMPTY_PREFIX_HASH, extend_prefix_hash
+
 ChatFormat = list[dict[str, Any]]
 
 PromptOutputT = TypeVar("PromptOutputT", default=str)
@@ -14,6 +18,12 @@ class BasePrompt(metaclass=ABCMeta):
     Base class for prompts.
     """
 
+    history_budget: HistoryBudget | None = None
+    """
+    The token limit of the conversation history of the prompts of this class, None for no limit. It is enforced
+    when a message is added, and by `SinglePrompt` already on construction.
+    """
+
     @property
 
     def chat(self) -> ChatFormat:
@@ -24,7 +34,7 @@ class BasePrompt(metaclass=ABCMeta):
             ChatFormat: A list of dictionaries, each containing the role and content of a message.
         """
         if not hasattr(self,"_conversation_history"):
-            self.conversation_history : list[dict[str,Any]] = []
+            self._conversation_history : list[dict[str,Any]] = []
 
         return self._conversation_history
     
@@ -74,6 +84,7 @@ class BasePrompt(metaclass=ABCMeta):
             message = message.model_dump_json()
 
         self._conversation_history.append({"role": "assistant", "content": message})
+        self._enforce_history_budget()
 
         return self
     
@@ -100,7 +111,11 @@ class BasePrompt(metaclass=ABCMeta):
         if not hasattr(self,"_conversation_history"):
             self._conversation_history = []
 
-        self._conversation_history.append(
+        content = str(result)
+        if (budget := self._get_history_budget()) is not None:
+            content = budget.shrink_tool_result(content)
+
+        self._conversation_history.extend(
             [
                 {
                     "role" : "assistant",
@@ -119,10 +134,11 @@ class BasePrompt(metaclass=ABCMeta):
                 {
                     "role": "tool",
                     "tool_call_id": id,
-                    "content": str(result),
+                    "content": content,
                 }
             ]
         )
+        self._enforce_history_budget()
 
         return self
     
@@ -142,7 +158,195 @@ class BasePrompt(metaclass=ABCMeta):
             self._conversation_history = []
 
         self._conversation_history.append({"role": "user", "content": message})
+        self._enforce_history_budget()
+        return self
+
+    @property
+    def history_tokens(self) -> int:
+        """
+        Returns the number of tokens of the conversation history, counted incrementally as the messages are added.
+
+        Returns:
+            The number of tokens, estimated by the token counter of the history budget.
+        """
+        self._count_history_tokens()
+        return self._history_token_total
+
+    def prefix_hashes(self) -> list[str]:
+        """
+        Returns the fingerprints of all the prefixes of the chat: the i-th one covers the first i + 1 messages.
+        Equal fingerprints mean equal prefixes, e.g. the same system prompt and few-shot examples, which makes
+        them fit for placing provider prompt-caching breakpoints and as keys of local response caches.
+
+        The fingerprints are computed incrementally, only the messages appended since the last call are hashed.
+        Messages must not be modified in place once fingerprinted and the chat has to change by appending
+        messages only, or be replaced by a new list, which is compared with the fingerprinted messages.
+
+        Returns:
+            The hex fingerprints of the prefixes, one per message.
+
+        Raises:
+            TypeError: If a message holds values other than JSON types and pydantic models.
+        """
+        return [prefix_hash.hex() for prefix_hash in self._update_prefix_hashes()]
+
+    def prefix_hash(self, length: int | None = None) -> str:
+        """
+        Returns the fingerprint of a prefix of the chat, see `prefix_hashes`.
+
+        Args:
+            length: The number of leading messages, None for the whole chat.
+
+        Returns:
+            The hex fingerprint of the prefix.
+
+        Raises:
+            ValueError: If the chat has fewer messages than the length.
+        """
+        prefix_hashes = self._update_prefix_hashes()
+        length = len(prefix_hashes) if length is None else length
+        if not 0 <= length <= len(prefix_hashes):
+            raise ValueError(f"Invalid prefix length {length} for a chat of {len(prefix_hashes)} messages")
+        return (prefix_hashes[length - 1] if length else EMPTY_PREFIX_HASH).hex()
+
+    def shared_prefix_length(self, prefix_hashes: Sequence[str]) -> int:
+        """
+        Finds how many leading messages this chat shares with another one, e.g. a cached request.
+        Since every fingerprint covers the whole prefix, the length is found by a binary search.
+
+        Args:
+            prefix_hashes: The `prefix_hashes` of the other chat.
+
+        Returns:
+            The number of shared leading messages.
+        """
+        own_hashes = self._update_prefix_hashes()
+        low, high = 0, min(len(own_hashes), len(prefix_hashes))
+        while low < high:
+            middle = (low + high + 1) // 2
+            if own_hashes[middle - 1].hex() == prefix_hashes[middle - 1]:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    def _update_prefix_hashes(self) -> list[bytes]:
+        """
+        Hashes the messages appended to the chat since the last call. If the chat was replaced by another list
+        or compacted, it is compared with the hashed messages first, keeping the longest unchanged prefix.
+        """
+        chat = self.chat
+        hashed: list[dict[str, Any]] = getattr(self, "_prefix_hashed_messages", [])
+        prefix_hashes: list[bytes] = getattr(self, "_prefix_hashes", [])
+        if getattr(self, "_prefix_hashed_chat", None) is not chat or len(hashed) > len(chat):
+            unchanged = 0
+            common = min(len(chat), len(hashed))
+            while unchanged < common and (chat[unchanged] is hashed[unchanged] or chat[unchanged] == hashed[unchanged]):
+                unchanged += 1
+            del hashed[unchanged:]
+            del prefix_hashes[unchanged:]
+            self._prefix_hashed_chat = chat
+
+        if len(hashed) < len(chat):
+            prefix_hash = prefix_hashes[-1] if prefix_hashes else EMPTY_PREFIX_HASH
+            for message in chat[len(hashed) :]:
+                prefix_hash = extend_prefix_hash(prefix_hash, message)
+                prefix_hashes.append(prefix_hash)
+                hashed.append(message)
+        self._prefix_hashed_messages = hashed
+        self._prefix_hashes = prefix_hashes
+        return prefix_hashes
+
+    def set_history_budget(self, budget: HistoryBudget | None) -> Self:
+        """
+        Sets the token limit of the conversation history of this prompt and compacts the history to fit it.
+
+        Args:
+            budget: The token limit, None for no limit.
+
+        Returns:
+            Prompt: The current prompt instance to allow chaining.
+        """
+        self._history_budget = budget
+        # The tokens are counted again, possibly with another token counter.
+        self._history_token_counts: list[int] | None = None
+        self._enforce_history_budget()
         return self
+
+    def _get_history_budget(self) -> HistoryBudget | None:
+        return getattr(self, "_history_budget", self.history_budget)
+
+    def _count_history_tokens(self) -> list[int]:
+        """Counts the tokens of the messages added since the last count, recounting the history if it was replaced."""
+        if not hasattr(self, "_conversation_history"):
+            self._conversation_history = []
+
+        history = self._conversation_history
+        counts = getattr(self, "_history_token_counts", None)
+        if counts is None or getattr(self, "_history_counted", None) is not history or len(counts) > len(history):
+            counts = self._history_token_counts = []
+            self._history_counted = history
+            self._history_token_total = 0
+
+        if len(counts) < len(history):
+            budget = self._get_history_budget()
+            counter = budget.token_counter if budget is not None else estimate_message_tokens
+            new_counts = [counter(message) for message in history[len(counts) :]]
+            counts.extend(new_counts)
+            self._history_token_total += sum(new_counts)
+
+        return counts
+
+    def _enforce_history_budget(self) -> None:
+        """Drops or summarizes the oldest turns once the history exceeds the budget."""
+        budget = self._get_history_budget()
+        if budget is None:
+            return
+
+        counts = self._count_history_tokens()
+        if self._history_token_total <= budget.max_tokens:
+            return
+
+        history = self._conversation_history
+        summary = getattr(self, "_history_summary", None)
+        start = 0
+        while start < len(history) and history[start].get("role") == "system" and history[start] is not summary:
+            start += 1
+
+        # The history is compacted below the limit, so the next compaction happens only after many more messages.
+        target = budget.max_tokens * budget.target_ratio
+        total = self._history_token_total
+        cut = start
+        while cut < len(history) - 1 and total > target:
+            total -= counts[cut]
+            cut += 1
+
+        # The tool results cannot be separated from the assistant message calling the tools.
+        while cut < len(history) and history[cut].get("role") == "tool":
+            cut += 1
+        if cut == len(history):
+            while cut > start and history[cut - 1].get("role") == "tool":
+                cut -= 1
+            cut = max(cut - 1, start)
+        if cut == start:
+            return
+
+        kept = history[:start]
+        kept_counts = counts[:start]
+        if budget.summarizer is not None:
+            summary = {
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{budget.summarizer(history[start:cut])}",
+            }
+            kept.append(summary)
+            kept_counts.append(budget.token_counter(summary))
+            self._history_summary = summary
+
+        history[:] = kept + history[cut:]
+        counts[:] = kept_counts + counts[cut:]
+        self._history_token_total = sum(counts)
+        # The compacted history is compared with the fingerprinted messages on the next fingerprinting.
+        self._prefix_hashed_chat = None
     
 
 
@@ -174,9 +378,11 @@ class SinglePrompt(BasePrompt):
     """
 
     def __init__(self,content : str | ChatFormat) -> None:
+         # The chat is copied, so compacting the history to fit the budget does not modify the caller's list.
          self._conversation_history: list[dict[str, Any]] = (
-            [{"role": "user", "content": content}] if isinstance(content, str) else content
+            [{"role": "user", "content": content}] if isinstance(content, str) else list(content)
         )
+         self._enforce_history_budget()
 
 
          
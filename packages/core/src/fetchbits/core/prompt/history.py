@@ -0,0 +1,88 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+_CHARS_PER_TOKEN = 4
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens of the text, assuming about four characters per token.
+
+    Args:
+        text: The text.
+
+    Returns:
+        The estimated number of tokens.
+    """
+    return (len(text) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+
+
+def estimate_message_tokens(message: dict[str, Any]) -> int:
+    """
+    Estimates the number of tokens a chat message takes in the prompt, including the tool calls it makes.
+    Images count as their URL or base64 payload.
+
+    Args:
+        message: The message in the OpenAI chat format.
+
+    Returns:
+        The estimated number of tokens.
+    """
+    tokens = _MESSAGE_OVERHEAD_TOKENS
+    content = message.get("content")
+    if isinstance(content, str):
+        tokens += estimate_tokens(content)
+    elif isinstance(content, list):
+        for part in content:
+            if isinstance(part, dict):
+                tokens += estimate_tokens(str(part.get("text") or part.get("image_url") or ""))
+    elif content is not None:
+        tokens += estimate_tokens(str(content))
+
+    for tool_call in message.get("tool_calls") or []:
+        function = tool_call.get("function", {})
+        tokens += estimate_tokens(function.get("name", "")) + estimate_tokens(str(function.get("arguments", "")))
+    return tokens
+
+
+@dataclass
+class HistoryBudget:
+    """
+    Limit of the tokens of the conversation history of a prompt. Once the history exceeds the limit, its oldest
+    turns are dropped, or summarized if a summarizer is given, until it shrinks to `target_ratio` of the limit.
+    Shrinking below the limit makes the compactions rare, so keeping the history in budget costs amortized
+    constant time per appended message. The leading system messages are never dropped.
+    """
+
+    max_tokens: int
+    """The number of tokens of the history triggering a compaction."""
+    target_ratio: float = 0.75
+    """The fraction of `max_tokens` the history is compacted to."""
+    max_tool_result_tokens: int | None = None
+    """The number of tokens the tool results are truncated to when added, None to keep them whole."""
+    summarizer: Callable[[list[dict[str, Any]]], str] | None = None
+    """Summarizes the dropped messages, the previous summary included. The dropped messages are lost if None."""
+    token_counter: Callable[[dict[str, Any]], int] = estimate_message_tokens
+    """Counts the tokens of a message."""
+
+    def shrink_tool_result(self, content: str) -> str:
+        """
+        Truncates the tool result to `max_tool_result_tokens`, noting how much of it was cut.
+
+        Args:
+            content: The tool result.
+
+        Returns:
+            The tool result fitting the limit.
+        """
+        if self.max_tool_result_tokens is None:
+            return content
+
+        tokens = estimate_tokens(content)
+        if tokens <= self.max_tool_result_tokens:
+            return content
+
+        kept = len(content) * self.max_tool_result_tokens // tokens
+        return f"{content[:kept]}... [truncated {len(content) - kept} characters]"
@@ -0,0 +1,37 @@
+import hashlib
+import json
+from typing import Any
+
+from pydantic import BaseModel
+
+PREFIX_HASH_SIZE = 16
+EMPTY_PREFIX_HASH = hashlib.blake2b(b"", digest_size=PREFIX_HASH_SIZE).digest()
+
+
+def _to_json(value: Any) -> Any:  # noqa: ANN401
+    """Serializes the pydantic models of the messages. Other values without a stable JSON form are rejected."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} cannot be fingerprinted, it is not JSON serializable")
+
+
+def _serialize_message(message: dict[str, Any]) -> bytes:
+    return json.dumps(message, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_to_json).encode()
+
+
+def extend_prefix_hash(prefix_hash: bytes, message: dict[str, Any]) -> bytes:
+    """
+    Computes the hash of a conversation prefix extended with one more message. The hash depends only
+    on the contents of the messages, not on the key order of their dicts, so it is stable across processes.
+
+    Args:
+        prefix_hash: The hash of the prefix, `EMPTY_PREFIX_HASH` for the empty one.
+        message: The next message in the OpenAI chat format.
+
+    Returns:
+        The hash of the extended prefix.
+
+    Raises:
+        TypeError: If the message holds values other than JSON types and pydantic models.
+    """
+    return hashlib.blake2b(prefix_hash + _serialize_message(message), digest_size=PREFIX_HASH_SIZE).digest()
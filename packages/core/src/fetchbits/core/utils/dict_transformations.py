@@ -1,3 +1,6 @@
+import sys
+from collections.abc import Iterable
+from functools import lru_cache
 from typing import Any
 
 SimpleTypes = str | int | float | bool | None
@@ -17,75 +20,138 @@ def flatten_dict(input_dict: dict[str, Any], parent_key: str = "", sep: str = ".
     Raises:
         ValueError: If the dictionary cannot be safely flattened due to the presence of the separator in the dict key.
     """
+    items: dict[str, SimpleTypes] = {}
+    _flatten_into(items, input_dict, parent_key, sep)
+    return items
 
-    items : dict[str, SimpleTypes] = {}
 
-    for k,v in input_dict.items():
-        if sep in k:
-             raise ValueError(f"Separator '{sep}' found in key '{parent_key}' Cannot flatten dictionary safely.")
-        
-        if "[" in k or "]" in k:
-             raise ValueError(f"Key '{k}' cannot consist '[]' characters. Cannot flatten dictionary safely.")
-        
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
+def flatten_many(input_dicts: Iterable[dict[str, Any]], sep: str = ".") -> list[dict[str, SimpleTypes]]:
+    """
+    Flatten a batch of nested dictionaries, see `flatten_dict`.
+
+    The keys of the batch are validated and joined once per distinct key path, and the joined keys are interned,
+    so the dictionaries of the batch share the same key strings.
+
+    Args:
+        input_dicts: The dictionaries to flatten
+        sep: The separator between nested keys
+
+    Returns:
+        The flattened dictionaries, in the order of the input
+
+    Raises:
+        ValueError: If any dictionary cannot be safely flattened due to the presence of the separator in the dict key.
+    """
+    key_paths: dict[tuple[str, str | int], str] = {}
+    flattened = []
+    for input_dict in input_dicts:
+        items: dict[str, SimpleTypes] = {}
+        _flatten_cached_into(items, input_dict, "", sep, key_paths)
+        flattened.append(items)
+    return flattened
+
+
+def _join_key(parent_key: str, k: str, sep: str) -> str:
+    """Join the key to its parent key, checking it can be split back."""
+    if sep in k:
+        raise ValueError(f"Separator '{sep}' found in key '{parent_key}' Cannot flatten dictionary safely.")
+
+    if "[" in k or "]" in k:
+        raise ValueError(f"Key '{k}' cannot consist '[]' characters. Cannot flatten dictionary safely.")
+
+    return f"{parent_key}{sep}{k}" if parent_key else k
+
+
+def _flatten_into(items: dict[str, SimpleTypes], input_dict: dict[str, Any], parent_key: str, sep: str) -> None:
+    """Flatten the dictionary into the shared accumulator."""
+    for k, v in input_dict.items():
+        new_key = _join_key(parent_key, k, sep)
 
         if isinstance(v, dict):
-             items = {**items, **flatten_dict(v, new_key, sep=sep)}
+            _flatten_into(items, v, new_key, sep)
 
         elif isinstance(v, list):
-             for i,item in enumerate(v):
-                  list_key = f"{new_key}[{i}]"
-                  if isinstance(item,dict):
-                         items = {**items, **flatten_dict(item, list_key, sep=sep)}
+            for i, item in enumerate(v):
+                list_key = f"{new_key}[{i}]"
+                if isinstance(item, dict):
+                    _flatten_into(items, item, list_key, sep)
 
-                  else:
-                        items[list_key] = item if isinstance(item, SimpleTypes) else str(item)
+                else:
+                    items[list_key] = item if isinstance(item, SimpleTypes) else str(item)
 
         else:
-             items[new_key] = v if isinstance(v, SimpleTypes) else str(v)
+            items[new_key] = v if isinstance(v, SimpleTypes) else str(v)
 
-        
-    return items
 
+def _flatten_cached_into(
+    items: dict[str, SimpleTypes],
+    input_dict: dict[str, Any],
+    parent_key: str,
+    sep: str,
+    key_paths: dict[tuple[str, str | int], str],
+) -> None:
+    """Flatten the dictionary into the shared accumulator, taking the joined keys from the key path cache."""
+    for k, v in input_dict.items():
+        new_key = key_paths.get((parent_key, k))
+        if new_key is None:
+            new_key = key_paths[parent_key, k] = sys.intern(_join_key(parent_key, k, sep))
+
+        if isinstance(v, dict):
+            _flatten_cached_into(items, v, new_key, sep, key_paths)
+
+        elif isinstance(v, list):
+            for i, item in enumerate(v):
+                list_key = key_paths.get((new_key, i))
+                if list_key is None:
+                    list_key = key_paths[new_key, i] = sys.intern(f"{new_key}[{i}]")
+                if isinstance(item, dict):
+                    _flatten_cached_into(items, item, list_key, sep, key_paths)
 
-def _parse_key(key : str) -> list[tuple[str,bool]]:
-       """Parse a key into parts, each part being (name, is_array_index)."""
-       parts = []
-       current = ""
-       i = 0
-       while i < len(key):
-            if key[i] == "[":
-                 if current:
-                      parts.append((current,False))
-                      current = ""
+                else:
+                    items[list_key] = item if isinstance(item, SimpleTypes) else str(item)
 
-                 i+=1
-                 start = i
-                 while i < len(key) and key[i] != "]":
-                      i +=1
-                
-                 parts.append((key[start:i],True))
-                 i += 1
-                 if i < len(key) and key[i] == ".":
-                  i += 1  # Skip .
+        else:
+            items[new_key] = v if isinstance(v, SimpleTypes) else str(v)
 
-            elif  key[i] == ".":
-                 if current:
-                        parts.append((current,False))
-                        current = ""
 
-                 i += 1
+@lru_cache(maxsize=4096)
+def _parse_key(key: str) -> tuple[tuple[str, bool], ...]:
+    """Parse a key into parts, each part being (name, is_array_index). The parsed keys are memoized."""
+    parts = []
+    current = ""
+    i = 0
+    while i < len(key):
+        if key[i] == "[":
+            if current:
+                parts.append((current, False))
+                current = ""
 
+            i += 1
+            start = i
+            while i < len(key) and key[i] != "]":
+                i += 1
 
-            else:
-                 current += key[i]
-                 i += 1
+            parts.append((key[start:i], True))
+            i += 1
+            if i < len(key) and key[i] == ".":
+                i += 1  # Skip .
 
+        elif key[i] == ".":
             if current:
-                 parts.append((current,False))
+                parts.append((current, False))
+                current = ""
+
+            i += 1
+
+        else:
+            current += key[i]
+            i += 1
+
+    if current:
+        parts.append((current, False))
+
+    return tuple(parts)
 
-            return parts
-       
 
 def _ensure_array(obj : dict[str,Any] | list[Any],key : str) -> list[Any]:
      
@@ -187,7 +253,7 @@ def _handle_last_array_part(
           current_obj: DictOrList,
           last_part : str,
           value: SimpleTypes,
-          parts : list[tuple[str, bool]],
+          parts: tuple[tuple[str, bool], ...],
 ) -> None:
       """Handle the last part of the key when it's an array index."""
 
@@ -212,7 +278,7 @@ def _handle_last_dict_part(
      current_obj: DictOrList,
     last_part: str,
     value: SimpleTypes,
-    parts: list[tuple[str, bool]],
+    parts: tuple[tuple[str, bool], ...],
 
 ) -> None:
       """Handle the last part of the key when it's a dictionary key."""
@@ -237,7 +303,7 @@ def _handle_last_dict_part(
            raise TypeError("Expected dict but got list")
       
 
-def _set_value(current : dict[str,Any],parts : list[tuple[str,bool]],value : SimpleTypes) -> None:
+def _set_value(current : dict[str,Any],parts: tuple[tuple[str, bool], ...],value : SimpleTypes) -> None:
     """Set a value in the dictionary based on the parsed key parts."""
     current_obj: DictOrList = current
 
@@ -292,7 +358,7 @@ def unflatten_dict(input_dict : dict[str,Any]) -> dict[str,Any]:
      
      new_dict: dict[str, Any] = {}
 
-     field_keys = sorted(input_dict.keys()),
+     field_keys = sorted(input_dict.keys())
     
      for key in field_keys:
           parts = _parse_key(key)
@@ -312,4 +378,99 @@ def unflatten_dict(input_dict : dict[str,Any]) -> dict[str,Any]:
                _set_value(new_dict, parts, input_dict[key])
 
 
-     return new_dict
\ No newline at end of file
+     return new_dict
+
+class _KeyTrieNode:
+    """A node of the trie of parsed key paths: a leaf taking the value of a flattened key, a dict or a list."""
+
+    __slots__ = ("children", "elements", "is_list", "key")
+
+    def __init__(self, is_list: bool = False) -> None:
+        self.key: str | None = None
+        self.is_list = is_list
+        self.children: dict[Any, _KeyTrieNode] = {}
+        self.elements: list[_KeyTrieNode | None] = []
+
+    def reset(self, is_list: bool) -> None:
+        """Turn the node into an empty container, dropping what the previous keys put there."""
+        self.key = None
+        self.is_list = is_list
+        self.children = {}
+
+    def freeze(self) -> None:
+        """Lay out the elements of the lists, filling the gaps the same way `unflatten_dict` does."""
+        if not self.is_list or self.key is not None:
+            for child in self.children.values():
+                child.freeze()
+            return
+
+        size = max(self.children) + 1 if self.children else 0
+        self.elements = [None] * size
+        gap_start = 0
+        for idx in sorted(self.children):
+            child = self.children[idx]
+            child.freeze()
+            # The gaps before an element are filled with the empty value of its kind.
+            for gap in range(gap_start, idx):
+                self.elements[gap] = None if child.key is not None else _KeyTrieNode()
+            self.elements[idx] = child
+            gap_start = idx + 1
+
+    def build(self, row: dict[str, Any]) -> Any:  # noqa: ANN401
+        """Build the nested value of the node from the flattened row."""
+        if self.key is not None:
+            return row[self.key]
+        if self.is_list:
+            return [element.build(row) if element is not None else None for element in self.elements]
+        return {name: child.build(row) for name, child in self.children.items()}
+
+
+def _build_key_trie(keys: Iterable[str]) -> _KeyTrieNode:
+    """Build the trie of the key paths. Conflicting keys are resolved like in `unflatten_dict`, the last key wins."""
+    root = _KeyTrieNode()
+    for key in sorted(keys):
+        parts = _parse_key(key)
+        if not parts:
+            continue
+
+        node = root
+        for i, (part, is_array) in enumerate(parts):
+            # The root is always a dict, array parts at the top level are used as plain keys.
+            is_array = is_array and node is not root
+            if node.key is not None or node.is_list != is_array:
+                node.reset(is_list=is_array)
+            name = int(part) if is_array else part
+            child = node.children.get(name)
+            if child is None:
+                child = node.children[name] = _KeyTrieNode()
+            if i == len(parts) - 1:
+                child.reset(is_list=False)
+                child.key = key
+            node = child
+
+    root.freeze()
+    return root
+
+
+def unflatten_many(rows: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Converts a batch of flattened dictionaries into nested structures, see `unflatten_dict`.
+
+    The keys are parsed into a trie of key paths once per distinct set of keys, and the trie is reused
+    for all the rows having the same keys, which is the common case for rows read from flat column stores.
+
+    Args:
+        rows: The dictionaries with flattened keys.
+
+    Returns:
+        The nested dictionaries, in the order of the input.
+    """
+    tries: dict[tuple[str, ...], _KeyTrieNode] = {}
+    nested = []
+    for row in rows:
+        keys = tuple(row)
+        trie = tries.get(keys)
+        if trie is None:
+            trie = tries[keys] = _build_key_trie(keys)
+        nested.append(trie.build(row))
+    return nested
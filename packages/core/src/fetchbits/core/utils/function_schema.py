@@ -1,9 +1,12 @@
 import contextlib
+import copy
 import inspect
 import logging
+import weakref
 from collections.abc import Callable, Generator
 
 from typing import Any, get_args, get_origin, get_type_hints
+from griffe import Docstring, DocstringSectionKind
 from pydantic import BaseModel, create_model,Field
 
 
@@ -64,7 +67,7 @@ def _generate_func_documentation(func : Callable[...,Any]) -> dict:
 def convert_function_to_function_schema(func : Callable[...,Any]) -> dict:
     """
     Given a python function, extracts a `FuncSchema` from it, capturing the name, description,
-    parameter descriptions, and other metadata.
+    parameter descriptions, and other metadata. The schema is generated once per function.
 
     Args:
         func: The function to extract the schema from.
@@ -73,6 +76,47 @@ def convert_function_to_function_schema(func : Callable[...,Any]) -> dict:
         A dict containing the function's name, description, parameter descriptions,
         and other metadata.
     """
+    _, schema = _function_schema(func)
+    return copy.deepcopy(schema)
+
+
+def function_arguments_model(func : Callable[...,Any]) -> type[BaseModel]:
+    """
+    Returns the pydantic model of the function arguments, the one the function schema is generated from.
+    The model is built once per function.
+
+    Args:
+        func: The function to build the arguments model for.
+
+    Returns:
+        The model with a field for every parameter of the function.
+    """
+    model, _ = _function_schema(func)
+    return model
+
+
+# The built models and schemas, weakly keyed by the underlying function, so the cache keeps neither the functions
+# nor the instances of their bound methods alive. Every function maps (is bound method, code object) to its schema.
+_schemas: "weakref.WeakKeyDictionary[Callable, dict[tuple[bool, Any], tuple[type[BaseModel], dict]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _function_schema(func : Callable[...,Any]) -> tuple[type[BaseModel], dict]:
+    target = getattr(func, "__func__", func)
+    key = (inspect.ismethod(func), getattr(target, "__code__", None))
+    try:
+        schemas = _schemas.setdefault(target, {})
+    except TypeError:
+        # Callables which cannot be weakly referenced or hashed are not cached, their schema is generated on every call.
+        return _build_function_schema(func)
+
+    if key not in schemas:
+        schemas[key] = _build_function_schema(func)
+    return schemas[key]
+
+
+def _build_function_schema(func : Callable[...,Any]) -> tuple[type[BaseModel], dict]:
 
     #Grab docstring info
 
@@ -175,7 +219,7 @@ def convert_function_to_function_schema(func : Callable[...,Any]) -> dict:
 
     json_schema = dynamic_model.model_json_schema()
 
-    return {
+    return dynamic_model, {
         "type": "function",
         "function": {
             "name": func_name,
@@ -187,9 +231,3 @@ def convert_function_to_function_schema(func : Callable[...,Any]) -> dict:
             },
         },
     }
-
-    
-
-
-
-
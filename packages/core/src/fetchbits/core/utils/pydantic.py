@@ -1,26 +1,54 @@
+import base64
+import binascii
 from typing import Annotated, Any
 
-from pydantic import PlainSerializer, PlainValidator
+from pydantic import PlainSerializer, PlainValidator, SerializationInfo, ValidationInfo
 
-def _pydantic_hex_to_bytes(val: Any) -> bytes:  # noqa: ANN401
+# Name of the serialization/validation context key selecting the text encoding of bytes, "base64" or "hex".
+BYTES_ENCODING_CONTEXT_KEY = "bytes_encoding"
+# Prefix marking base64 encoded bytes. Hex digits never contain it, so unmarked strings are hex, as they always were.
+BASE64_PREFIX = "base64:"
+
+
+def _bytes_encoding(context: Any) -> str | None:  # noqa: ANN401
+    if isinstance(context, dict):
+        return context.get(BYTES_ENCODING_CONTEXT_KEY)
+    return None
+
+
+def _pydantic_str_to_bytes(val: Any, info: ValidationInfo) -> bytes:  # noqa: ANN401
     """
-    Deserialize hex string to bytes.
+    Deserialize a string to bytes. Strings marked with the base64 prefix are decoded from base64, the others
+    from hex, unless the validation context requests another encoding.
     """
     if isinstance(val, bytes):
         return val
-    elif isinstance(val, bytearray):
+    elif isinstance(val, bytearray | memoryview):
         return bytes(val)
     elif isinstance(val, str):
+        encoding = _bytes_encoding(info.context)
+        if val.startswith(BASE64_PREFIX):
+            val, encoding = val[len(BASE64_PREFIX) :], "base64"
+        if encoding == "base64":
+            try:
+                return base64.b64decode(val, validate=True)
+            except binascii.Error as e:
+                raise ValueError(f"Cannot decode base64 bytes: {e}") from e
         return bytes.fromhex(val)
     raise ValueError(f"Cannot convert {val} to bytes.")
 
 
-def _pydantic_bytes_to_hex(val: bytes) -> str:
+def _pydantic_bytes_to_str(val: bytes, info: SerializationInfo) -> str:
     """
-    Serialize bytes to hex string.
+    Serialize bytes to a hex string, or to a base64 string marked with the base64 prefix when the serialization
+    context requests base64. Hex stays the default, so the dumps are still readable by the older readers.
     """
+    encoding = _bytes_encoding(info.context) or "hex"
+    if encoding == "base64":
+        return BASE64_PREFIX + base64.b64encode(val).decode("ascii")
     return val.hex()
 
+
 SerializableBytes = Annotated[
-    bytes, PlainValidator(_pydantic_hex_to_bytes), PlainSerializer(_pydantic_bytes_to_hex, return_type=str)
-]
\ No newline at end of file
+    bytes, PlainValidator(_pydantic_str_to_bytes), PlainSerializer(_pydantic_bytes_to_str, return_type=str)
+]
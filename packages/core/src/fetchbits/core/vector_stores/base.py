@@ -1,20 +1,42 @@
+import asyncio
+import dataclasses
+import heapq
 from abc import ABC,abstractmethod
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Coroutine, Iterable, Mapping
+from dataclasses import dataclass
 from enum import Enum
-from typing import ClassVar,TypeVar,cast
+from typing import Any,ClassVar,TypeVar,cast
 from uuid import UUID
 
 import pydantic
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationInfo
+from pydantic_core import to_json
 from typing_extensions import Self
 
 from fetchbits.core import vector_stores
 from fetchbits.core.embeddings import DenseEmbedder, Embedder, SparseVector
 from fetchbits.core.options import Options
 from fetchbits.core.utils.config_handling import ConfigurableComponent, ObjectConstructionConfig
+from fetchbits.core.utils.helpers import batched
 from fetchbits.core.utils.pydantic import SerializableBytes
+from fetchbits.core.vector_stores.embedding_cache import EmbeddingCache, embed_with_cache, embedder_fingerprint
+from fetchbits.core.vector_stores.pagination import EntryPage, build_page, decode_cursor
 
 WHEREQUERY = dict[str, str | int | float | bool | dict]
 
+# Validation context key disabling the per-entry metadata check, used by `VectorStoreEntry.from_records`.
+_BATCH_METADATA_CHECK_CONTEXT_KEY = "batch_metadata_check"
+
+
+def _check_metadata_serializable(metadata: Any) -> None:  # noqa: ANN401
+    """
+    Checks that the metadata can be serialized to JSON, without serializing the rest of the entry.
+    """
+    try:
+        to_json(metadata)
+    except Exception as e:
+        raise ValueError(f"Metadata must be JSON serializable. Error: {str(e)}") from e
+
 
 class VectorStoreEntry(BaseModel):
     id : UUID
@@ -25,15 +47,13 @@ class VectorStoreEntry(BaseModel):
 
     @pydantic.model_validator(mode="after")
 
-    def validate_metadata_serializable(self) -> Self:
-
-
-        try:
-            self.model_dump_json()
+    def validate_metadata_serializable(self, info: ValidationInfo) -> Self:
 
-        except Exception as e :
-            raise ValueError(f"Metadata must be JSON serializable. Error: {str(e)}") from e
+        # Batches validated by `from_records` check the metadata of all entries at once.
+        if isinstance(info.context, dict) and info.context.get(_BATCH_METADATA_CHECK_CONTEXT_KEY):
+            return self
 
+        _check_metadata_serializable(self.metadata)
         return self
 
 
@@ -42,37 +62,162 @@ class VectorStoreEntry(BaseModel):
 
     def text_or_image_required(self) -> Self:
 
-        if not self.text or self.image_bytes:
+        if not self.text and not self.image_bytes:
             raise ValueError("Either text or image_bytes must be provided.")
         
 
         return self
-    
+
+    @classmethod
+    def from_records(cls, records: Iterable[Self | Mapping[str, Any]], trusted: bool = False) -> list[Self]:
+        """
+        Builds entries in bulk. The records are validated in a single pass and the metadata serializability
+        is checked once for the whole batch instead of once per entry.
+
+        Args:
+            records: The entries or raw dictionaries to build the entries from.
+            trusted: Whether the records come from a trusted source, e.g. a snapshot written by a vector store.
+                Trusted records skip validation entirely, so they have to hold values of the field types already
+                (UUID IDs and bytes images, as returned by `dict(entry)`).
+
+        Returns:
+            The entries, in the order of the records.
+
+        Raises:
+            ValidationError: If any record is not a valid entry.
+            ValueError: If the metadata of any record is not JSON serializable.
+        """
+        if trusted:
+            return [record if isinstance(record, cls) else cls.model_construct(**record) for record in records]
+
+        adapter = _ENTRIES_ADAPTER if cls is VectorStoreEntry else pydantic.TypeAdapter(list[cls])
+        entries = adapter.validate_python(list(records), context={_BATCH_METADATA_CHECK_CONTEXT_KEY: True})
+        try:
+            _check_metadata_serializable([entry.metadata for entry in entries])
+        except ValueError:
+            # Find the culprit only on failure, so the common path stays a single serialization.
+            for index, entry in enumerate(entries):
+                try:
+                    _check_metadata_serializable(entry.metadata)
+                except ValueError as e:
+                    raise ValueError(f"Record {index}: {e}") from e
+            raise
+        return entries
+
+
+_ENTRIES_ADAPTER = pydantic.TypeAdapter(list[VectorStoreEntry])
+
 
 class VectorStoreResult(BaseModel):
     
     entry : VectorStoreEntry
-    vector : list[float] | SparseVector
+    vector : list[float] | SparseVector | None = None
     score : float
 
     subresults : list["VectorStoreResult"] = []
 
 
+class ResultProjection(Enum):
+    """
+    Parts of the matching entries materialized in the query results.
+    """
+
+    FULL = "full"
+    """The whole entry and its vector."""
+    ENTRY = "entry"
+    """The entry ID, text and metadata, without the image and the vector."""
+    IDS = "ids"
+    """Only the entry ID (and the score)."""
+
+
 class VectorStoreOptions(Options):
 
     k : int = 5
     score_threshold : float | None = None
     where : WHEREQUERY | None = None
+    projection : ResultProjection = ResultProjection.FULL
+
+
+def project_result(
+    entry_id: UUID,
+    score: float,
+    projection: ResultProjection,
+    entry: Callable[[], VectorStoreEntry],
+    vector: Callable[[], list[float] | SparseVector],
+) -> VectorStoreResult:
+    """
+    Builds a query result, materializing only the parts requested by the projection. The entry and the vector
+    are fetched lazily and come from the vector store, so they are not validated again.
+
+    Args:
+        entry_id: The ID of the matching entry.
+        score: The score of the entry.
+        projection: The parts of the entry to include.
+        entry: Returns the stored entry.
+        vector: Returns the stored vector of the entry.
+
+    Returns:
+        The result.
+    """
+    if projection is ResultProjection.FULL:
+        return VectorStoreResult.model_construct(entry=entry(), vector=vector(), score=score, subresults=[])
+
+    if projection is ResultProjection.ENTRY:
+        stored = entry()
+        projected = VectorStoreEntry.model_construct(id=entry_id, text=stored.text, metadata=stored.metadata)
+    else:
+        projected = VectorStoreEntry.model_construct(id=entry_id)
+    return VectorStoreResult.model_construct(entry=projected, vector=None, score=score, subresults=[])
 
 
 VectorStoreOptionsT = TypeVar("VectorStoreOptionsT", bound = "VectorStoreOptions")
 
 
+@dataclass
+class IngestionProgress:
+    """
+    Progress of a batched ingestion, reported after every stored batch.
+    The totals are None while they are not known yet, e.g. when ingesting a stream.
+    """
+
+    batch_index: int = 0
+    batch_size: int = 0
+    completed_batches: int = 0
+    total_batches: int | None = None
+    completed_entries: int = 0
+    total_entries: int | None = None
+
+
+def _check_positive(**parameters: int) -> None:
+    """
+    Rejects the non-positive batching parameters, which would drop all the entries or never start a batch.
+    """
+    for name, value in parameters.items():
+        if value < 1:
+            raise ValueError(f"{name} must be at least 1, got {value}.")
+
+
+async def _run_all(coroutines: list[Coroutine[Any, Any, None]]) -> None:
+    """
+    Runs the coroutines concurrently. If any of them fails, the others are cancelled.
+    """
+    tasks = [asyncio.create_task(coroutine) for coroutine in coroutines]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
 class VectorStore(ConfigurableComponent[VectorStoreOptionsT],ABC):
 
     options_cls : type[VectorStoreOptionsT]
     default_module : ClassVar = vector_stores
     configuration_key : ClassVar = "vector_store"
+    generation : int = 0
+    """The number of writes made to the store, bumped by every `store` and `remove` of the implementations, so
+    the caches of query results can tell whether the results were computed before the last write."""
 
 
     @abstractmethod
@@ -96,6 +241,24 @@ class VectorStore(ConfigurableComponent[VectorStoreOptionsT],ABC):
             The entries.
         """
 
+    async def retrieve_many(
+        self, texts: list[str], options: VectorStoreOptionsT | None = None
+    ) -> list[list[VectorStoreResult]]:
+        """
+        Retrieve entries from the vector store most similar to each of the provided texts.
+
+        The default implementation runs `retreive` for every text concurrently. Stores able to embed all
+        the queries in one call and score them together should override it.
+
+        Args:
+            texts: The texts to query the vector store with.
+            options: The options for querying the vector store, shared by all the queries.
+
+        Returns:
+            The entries for every text, in the order of the texts.
+        """
+        return list(await asyncio.gather(*(self.retreive(text, options) for text in texts)))
+
 
     @abstractmethod
 
@@ -107,6 +270,165 @@ class VectorStore(ConfigurableComponent[VectorStoreOptionsT],ABC):
             ids: The list of entries' IDs to remove.
         """
 
+    async def _store_and_report(
+        self,
+        batch_index: int,
+        batch: list[VectorStoreEntry],
+        progress: IngestionProgress,
+        on_progress: Callable[[IngestionProgress], None] | None,
+    ) -> None:
+        """
+        Store a single batch of an ingestion and report the progress.
+        """
+        await self.store(batch)
+        progress.completed_batches += 1
+        progress.completed_entries += len(batch)
+        if on_progress:
+            on_progress(dataclasses.replace(progress, batch_index=batch_index, batch_size=len(batch)))
+
+    async def store_batched(
+        self,
+        entries: list[VectorStoreEntry],
+        batch_size: int = 100,
+        max_concurrency: int = 4,
+        on_progress: Callable[[IngestionProgress], None] | None = None,
+    ) -> None:
+        """
+        Store entries in batches, running up to `max_concurrency` `store` calls at once. While some batches wait
+        for the embedder, the finished ones are inserted into the index.
+
+        Batches may complete out of order, so if the same ID occurs in several batches, any of them may win.
+
+        Args:
+            entries: The entries to store.
+            batch_size: The number of entries embedded and stored together.
+            max_concurrency: The maximal number of batches being stored at the same time.
+            on_progress: Callback invoked after every stored batch.
+
+        Raises:
+            ValueError: If the batch size or the concurrency is not positive.
+        """
+        _check_positive(batch_size=batch_size, max_concurrency=max_concurrency)
+        batches = list(batched(entries, batch_size))
+        semaphore = asyncio.Semaphore(max_concurrency)
+        progress = IngestionProgress(total_batches=len(batches), total_entries=len(entries))
+
+        async def _store_batch(batch_index: int, batch: list[VectorStoreEntry]) -> None:
+            async with semaphore:
+                await self._store_and_report(batch_index, batch, progress, on_progress)
+
+        await _run_all([_store_batch(index, batch) for index, batch in enumerate(batches)])
+
+    async def store_stream(
+        self,
+        entries: AsyncIterable[VectorStoreEntry | dict],
+        window_size: int = 100,
+        max_concurrency: int = 4,
+        on_progress: Callable[[IngestionProgress], None] | None = None,
+    ) -> int:
+        """
+        Store entries consumed lazily from an async iterable. Entries are validated and stored in windows of
+        `window_size`, at most `max_concurrency` windows at once. The source is only read while a window slot
+        is free, so at most `2 * max_concurrency + 1` windows are held in memory and a faster producer waits.
+
+        Windows may complete out of order, so if the same ID occurs in several windows, any of them may win.
+
+        Args:
+            entries: The entries, or raw dictionaries validated as entries, to store.
+            window_size: The number of entries validated, embedded and stored together.
+            max_concurrency: The maximal number of windows being stored at the same time.
+            on_progress: Callback invoked after every stored window. The totals are known only once
+                the source is exhausted.
+
+        Returns:
+            The number of stored entries.
+
+        Raises:
+            ValueError: If the window size or the concurrency is not positive.
+        """
+        _check_positive(window_size=window_size, max_concurrency=max_concurrency)
+        queue: asyncio.Queue[tuple[int, list[VectorStoreEntry]] | None] = asyncio.Queue(maxsize=max_concurrency)
+        progress = IngestionProgress()
+
+        async def _produce() -> None:
+            window_index, window_count, window = 0, 0, []
+            async for entry in entries:
+                window.append(entry)
+                if len(window) >= window_size:
+                    await queue.put((window_index, VectorStoreEntry.from_records(window)))
+                    window_index, window_count, window = window_index + 1, window_count + len(window), []
+            if window:
+                await queue.put((window_index, VectorStoreEntry.from_records(window)))
+                window_index, window_count = window_index + 1, window_count + len(window)
+
+            progress.total_batches, progress.total_entries = window_index, window_count
+            for _ in range(max_concurrency):
+                await queue.put(None)
+
+        async def _consume() -> None:
+            while (item := await queue.get()) is not None:
+                await self._store_and_report(*item, progress, on_progress)
+
+        await _run_all([_produce(), *(_consume() for _ in range(max_concurrency))])
+        return progress.completed_entries
+
+    async def list_page(
+        self, where: WHEREQUERY | None = None, limit: int = 100, cursor: str | None = None
+    ) -> EntryPage:
+        """
+        List a page of entries in ascending ID order, continuing right after the cursor. Unlike with `offset`,
+        the entries before the cursor are not skipped one by one, so the pages deep into the store do not get
+        slower. The order is stable under concurrent writes: entries stored meanwhile are listed only if their
+        IDs sort after the cursor.
+
+        This implementation filters all the entries on every page, stores able to seek to the cursor override it.
+
+        Args:
+            where: The filter dictionary - the keys are the field names and the values are the values to filter by.
+                Not specifying the key means no filtering.
+            limit: The maximum number of entries of the page.
+            cursor: The `next_cursor` of the previous page, or None to start from the beginning.
+
+        Returns:
+            The page of entries with the cursor of the next page.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        after = decode_cursor(cursor)
+        entries = {entry.id: entry for entry in await self.list(where=where) if after is None or entry.id > after}
+        return build_page(iter(heapq.nsmallest(limit + 1, entries)), limit, entries.__getitem__)
+
+    async def iter_entries(
+        self, where: WHEREQUERY | None = None, batch_size: int = 100, cursor: str | None = None
+    ) -> AsyncIterator[VectorStoreEntry]:
+        """
+        Iterate over all the entries in ascending ID order, fetching them in pages with `list_page`.
+        An interrupted iteration can be resumed by passing `encode_cursor(last_entry.id)` as the cursor.
+
+        Args:
+            where: The filter dictionary - the keys are the field names and the values are the values to filter by.
+                Not specifying the key means no filtering.
+            batch_size: The number of entries fetched per page.
+            cursor: The cursor to start after, or None to start from the beginning.
+
+        Yields:
+            The entries.
+
+        Raises:
+            ValueError: If the batch size is not positive or the cursor is malformed.
+        """
+        if batch_size <= 0:
+            raise ValueError("The batch size has to be positive.")
+
+        while True:
+            page = await self.list_page(where=where, limit=batch_size, cursor=cursor)
+            for entry in page.entries:
+                yield entry
+            if page.next_cursor is None:
+                return
+            cursor = page.next_cursor
+
     async def list(self,where : WHEREQUERY | None = None,limit : int | None = None,offset : int = 0) -> list[VectorStoreEntry]:
         """
         List entries from the vector store. The entries can be filtered, limited and offset.
@@ -132,14 +454,30 @@ class VectorStoreWithDenseEmbedder(VectorStore[VectorStoreOptionsT]):
     Base class for vector stores that takes a dense embedder as an argument.
     """
 
-    def __init__(self,embedder : DenseEmbedder,embedding_type : EmbeddingType = EmbeddingType.TEXT,default_options : VectorStoreOptionsT | None = None) -> None:
+    def __init__(
+        self,
+        embedder: DenseEmbedder,
+        embedding_type: EmbeddingType = EmbeddingType.TEXT,
+        default_options: VectorStoreOptionsT | None = None,
+        embedding_cache: EmbeddingCache | None = None,
+    ) -> None:
+        """
+        Constructs a new VectorStore instance.
 
+        Args:
+            embedder: The embedder to use for converting entries to vectors.
+            embedding_type: Which part of the entry to embed, either text or image. The other part will be ignored.
+            default_options: The default options for querying the vector store.
+            embedding_cache: The cache of already computed embeddings. Without it, only the duplicates within
+                a single call are embedded once.
+        """
         super().__init__(default_options)
 
-        self.embedder = embedder
-        self.embedding_type = embedding_type
+        self._embedder = embedder
+        self._embedding_type = embedding_type
+        self._embedding_cache = embedding_cache
 
-        if self.embedding_type == EmbeddingType.IMAGE and not self._embedder.supports_image_embeddings:
+        if self._embedding_type == EmbeddingType.IMAGE and not self._embedder.supports_image_embeddings:
             raise ValueError("The embedder does not support image embeddings.")
         
 
@@ -153,15 +491,25 @@ class VectorStoreWithDenseEmbedder(VectorStore[VectorStoreOptionsT]):
         Returns:
             The embeddings mapped by entry ID
         """
-        if self.embedding_type == EmbeddingType.TEXT:
+        if self._embedding_type == EmbeddingType.TEXT:
             entries = [e for e in entries if e.text is not None]
 
-            embeddings = await self._embedder.embed_text([e.text for e in entries if e.text is not None])
+            embeddings = await embed_with_cache(
+                [e.text for e in entries if e.text is not None],
+                self._embedder.embed_text,
+                embedder_fingerprint(self._embedder, self._embedding_type.value),
+                self._embedding_cache,
+            )
             return {e.id : v for e,v in zip(entries,embeddings,strict = True)}
-        
-        elif self.embedding_type == EmbeddingType.IMAGE:
+
+        elif self._embedding_type == EmbeddingType.IMAGE:
              entries = [e for e in entries if e.image_bytes is not None]
-             embeddings = await self._embedder.embed_image([e.image_bytes for e in entries if e.image_bytes is not None])
+             embeddings = await embed_with_cache(
+                 [e.image_bytes for e in entries if e.image_bytes is not None],
+                 self._embedder.embed_image,
+                 embedder_fingerprint(self._embedder, self._embedding_type.value),
+                 self._embedding_cache,
+             )
              return {e.id: v for e, v in zip(entries, embeddings, strict=True)}
         
         else:
@@ -203,6 +551,7 @@ class VectorStoreWithEmbedder(VectorStore[VectorStoreOptionsT]):
         embedder: Embedder,
         embedding_type: EmbeddingType = EmbeddingType.TEXT,
         default_options: VectorStoreOptionsT | None = None,
+        embedding_cache: EmbeddingCache | None = None,
     ) -> None:
         """
         Constructs a new VectorStore instance.
@@ -212,10 +561,13 @@ class VectorStoreWithEmbedder(VectorStore[VectorStoreOptionsT]):
                      or a SparseEmbedder for sparse vectors.
             embedding_type: Which part of the entry to embed, either text or image. The other part will be ignored.
             default_options: The default options for querying the vector store.
+            embedding_cache: The cache of already computed embeddings. Without it, only the duplicates within
+                a single call are embedded once.
         """
         super().__init__(default_options=default_options)
         self._embedder = embedder
         self._embedding_type = embedding_type
+        self._embedding_cache = embedding_cache
 
         if self._embedding_type == EmbeddingType.IMAGE and not self._embedder.image_support():
             raise ValueError("Embedder does not support image embeddings")
@@ -233,11 +585,21 @@ class VectorStoreWithEmbedder(VectorStore[VectorStoreOptionsT]):
         """
         if self._embedding_type == EmbeddingType.TEXT:
             entries = [e for e in entries if e.text is not None]
-            embeddings = await self._embedder.embed_text([e.text for e in entries if e.text is not None])
+            embeddings = await embed_with_cache(
+                [e.text for e in entries if e.text is not None],
+                self._embedder.embed_text,
+                embedder_fingerprint(self._embedder, self._embedding_type.value),
+                self._embedding_cache,
+            )
             return {e.id: cast(SparseVector | list[float], v) for e, v in zip(entries, embeddings, strict=True)}
         elif self._embedding_type == EmbeddingType.IMAGE:
             entries = [e for e in entries if e.image_bytes is not None]
-            embeddings = await self._embedder.embed_image([e.image_bytes for e in entries if e.image_bytes is not None])
+            embeddings = await embed_with_cache(
+                [e.image_bytes for e in entries if e.image_bytes is not None],
+                self._embedder.embed_image,
+                embedder_fingerprint(self._embedder, self._embedding_type.value),
+                self._embedding_cache,
+            )
             return {e.id: cast(SparseVector | list[float], v) for e, v in zip(entries, embeddings, strict=True)}
         else:
             raise ValueError(f"Unsupported embedding type: {self._embedding_type}")
@@ -0,0 +1,281 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from uuid import UUID
+
+from fetchbits.core.vector_stores.base import (
+    WHEREQUERY,
+    VectorStore,
+    VectorStoreEntry,
+    VectorStoreOptions,
+    VectorStoreResult,
+)
+from fetchbits.core.vector_stores.pagination import EntryPage
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalizes the query text for the cache lookup by trimming it and collapsing runs of whitespace.
+
+    Args:
+        text: The query text.
+
+    Returns:
+        The normalized text.
+    """
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+@dataclass
+class QueryCacheStats:
+    """
+    Counters of the query result cache.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class QueryResultCache:
+    """
+    Cache of query results evicting the least recently used and expired results. Every result is tagged with
+    the generation of the store it was computed at and is discarded once the store has moved on.
+
+    The results are deep-copied both when cached and when returned, so callers modifying the results they got
+    cannot change what the later lookups return.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float | None = None) -> None:
+        """
+        Constructs a new QueryResultCache instance.
+
+        Args:
+            max_size: The maximal number of cached results.
+            ttl: The number of seconds the results are valid for. They expire only with writes if None.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = QueryCacheStats()
+        self._results: OrderedDict[Hashable, tuple[int, float, list[VectorStoreResult]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get(self, key: Hashable, generation: int) -> list[VectorStoreResult] | None:
+        """
+        Looks up the results.
+
+        Args:
+            key: The key of the query.
+            generation: The current generation of the store.
+
+        Returns:
+            The copies of the cached results, or None if they are missing, expired or computed at another generation.
+        """
+        cached = self._results.get(key)
+        if cached is None or cached[0] != generation or (cached[1] and cached[1] < time.monotonic()):
+            if cached is not None:
+                del self._results[key]
+            self.stats.misses += 1
+            return None
+
+        self._results.move_to_end(key)
+        self.stats.hits += 1
+        return [result.model_copy(deep=True) for result in cached[2]]
+
+    def set(self, key: Hashable, generation: int, results: list[VectorStoreResult]) -> None:
+        """
+        Caches the results.
+
+        Args:
+            key: The key of the query.
+            generation: The generation of the store the results were computed at.
+            results: The results.
+        """
+        expires = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+        self._results[key] = (generation, expires, [result.model_copy(deep=True) for result in results])
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Drops all the cached results.
+        """
+        self._results.clear()
+
+
+class CachedVectorStore(VectorStore[VectorStoreOptions]):
+    """
+    A vector store wrapping another one with a cache of query results, so repeated queries skip both the query
+    embedding and the search. The results are tagged with the generation of the wrapped store, which every
+    write bumps, whether it goes through the wrapper or to the wrapped store directly, invalidating all
+    the cached results at once.
+    """
+
+    options_cls = VectorStoreOptions
+
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        max_size: int = 1024,
+        ttl: float | None = None,
+        normalize: Callable[[str], str] = normalize_query,
+    ) -> None:
+        """
+        Constructs a new CachedVectorStore instance.
+
+        Args:
+            vector_store: The vector store to wrap. Its default options are used.
+            max_size: The maximal number of cached query results.
+            ttl: The number of seconds the results are valid for. They expire only with writes if None.
+            normalize: Normalizes the query texts before they are used as cache keys.
+        """
+        super().__init__(vector_store.default_options)
+        self.vector_store = vector_store
+        self.cache = QueryResultCache(max_size=max_size, ttl=ttl)
+        self.normalize = normalize
+        self._pending: dict[tuple[Hashable, int], asyncio.Future[list[VectorStoreResult]]] = {}
+
+    def _key(self, text: str, options: VectorStoreOptions | None) -> Hashable:
+        merged_options = (self.default_options | options) if options else self.default_options
+        # The options are hashable, equal options share the cache entries.
+        return self.normalize(text), merged_options
+
+    async def store(self, entries: list[VectorStoreEntry]) -> None:
+        """
+        Store entries in the wrapped vector store, which invalidates the cached results.
+
+        Args:
+            entries: The entries to store.
+        """
+        try:
+            await self.vector_store.store(entries)
+        finally:
+            self.generation += 1
+
+    async def retreive(self, text: str, options: VectorStoreOptions | None = None) -> list[VectorStoreResult]:
+        """
+        Retrieve entries most similar to the provided text, from the cache if the same normalized query
+        with the same options was answered since the last write. Concurrent identical queries share one search,
+        each of them getting its own copies of the results.
+
+        Args:
+            text: The text to query the vector store with.
+            options: The options for querying the vector store.
+
+        Returns:
+            The entries, sorted from the most to the least similar.
+        """
+        key = self._key(text, options)
+        generation = self.vector_store.generation
+        if (cached := self.cache.get(key, generation)) is not None:
+            return cached
+        # Searches started before a write are not shared with the queries made after it.
+        if (pending := self._pending.get((key, generation))) is not None:
+            try:
+                return [result.model_copy(deep=True) for result in await asyncio.shield(pending)]
+            except asyncio.CancelledError:
+                # Only the cancellation of this call is propagated, a cancelled search is run again.
+                if not pending.cancelled():
+                    raise
+
+        future: asyncio.Future[list[VectorStoreResult]] = asyncio.get_running_loop().create_future()
+        self._pending[key, generation] = future
+        try:
+            results = await self.vector_store.retreive(text, options)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # The waiters, if any, retrieve the exception, otherwise it must not be reported as never retrieved.
+            future.exception()
+            raise
+        finally:
+            del self._pending[key, generation]
+
+        # The waiters copy the results from a snapshot, which the caller modifying its results cannot change.
+        future.set_result([result.model_copy(deep=True) for result in results])
+        if self.vector_store.generation == generation:
+            self.cache.set(key, generation, results)
+        return list(results)
+
+    async def retrieve_many(
+        self, texts: list[str], options: VectorStoreOptions | None = None
+    ) -> list[list[VectorStoreResult]]:
+        """
+        Retrieve entries most similar to each of the provided texts. Only the texts missing in the cache
+        are sent to the wrapped vector store, in one call.
+
+        Args:
+            texts: The texts to query the vector store with.
+            options: The options for querying the vector store, shared by all the queries.
+
+        Returns:
+            The entries for every text, each sorted from the most to the least similar.
+        """
+        generation = self.vector_store.generation
+        keys = [self._key(text, options) for text in texts]
+        results: list[list[VectorStoreResult] | None] = [self.cache.get(key, generation) for key in keys]
+        missing = [index for index, cached in enumerate(results) if cached is None]
+        if missing:
+            computed = await self.vector_store.retrieve_many([texts[index] for index in missing], options)
+            for index, text_results in zip(missing, computed, strict=True):
+                results[index] = text_results
+                if self.vector_store.generation == generation:
+                    self.cache.set(keys[index], generation, text_results)
+        return results  # type: ignore[return-value]
+
+    async def remove(self, ids: list[UUID]) -> None:
+        """
+        Remove entries from the wrapped vector store, which invalidates the cached results.
+
+        Args:
+            ids: The list of entries' IDs to remove.
+        """
+        try:
+            await self.vector_store.remove(ids)
+        finally:
+            self.generation += 1
+
+    async def list_page(
+        self, where: WHEREQUERY | None = None, limit: int = 100, cursor: str | None = None
+    ) -> EntryPage:
+        """
+        List a page of entries of the wrapped vector store in ascending ID order.
+
+        Args:
+            where: The filter dictionary - the keys are the field names and the values are the values to filter by.
+                Not specifying the key means no filtering.
+            limit: The maximum number of entries of the page.
+            cursor: The `next_cursor` of the previous page, or None to start from the beginning.
+
+        Returns:
+            The page of entries with the cursor of the next page.
+        """
+        return await self.vector_store.list_page(where=where, limit=limit, cursor=cursor)
+
+    async def list(
+        self, where: WHEREQUERY | None = None, limit: int | None = None, offset: int = 0
+    ) -> list[VectorStoreEntry]:
+        """
+        List entries of the wrapped vector store. The entries can be filtered, limited and offset.
+
+        Args:
+            where: The filter dictionary - the keys are the field names and the values are the values to filter by.
+                Not specifying the key means no filtering.
+            limit: The maximum number of entries to return.
+            offset: The number of entries to skip.
+
+        Returns:
+            The entries.
+        """
+        return await self.vector_store.list(where=where, limit=limit, offset=offset)
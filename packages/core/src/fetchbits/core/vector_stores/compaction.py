@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CompactionPolicy:
+    """
+    Thresholds deciding when the tombstoned entries of a store are physically removed in the background.
+    A compaction starts as soon as any of the thresholds is exceeded.
+    """
+
+    max_tombstones: int = 10_000
+    """The number of tombstoned entries triggering a compaction."""
+    max_tombstone_ratio: float = 0.1
+    """The fraction of all the physically present entries being tombstones triggering a compaction."""
+    chunk_size: int = 256
+    """The number of entries removed before the compaction yields to the other tasks of the event loop."""
+
+    def should_compact(self, tombstones: int, total: int) -> bool:
+        """
+        Checks whether the thresholds are exceeded.
+
+        Args:
+            tombstones: The number of tombstoned entries.
+            total: The number of physically present entries, tombstoned ones included.
+
+        Returns:
+            True if a compaction should start, otherwise False.
+        """
+        return tombstones > 0 and (tombstones >= self.max_tombstones or tombstones > self.max_tombstone_ratio * total)
+
+
+@dataclass
+class CompactionMetrics:
+    """
+    Counters of the tombstones and compactions of a store.
+    """
+
+    tombstones: int = 0
+    compactions: int = 0
+    compacted_entries: int = 0
+    last_compaction_seconds: float = 0.0
+    total_compaction_seconds: float = 0.0
+
+
+class Tombstones:
+    """
+    IDs of the removed entries still occupying the index structures of a store. Removing an entry only
+    marks it here, the store filters the marked entries out of the searches and the compaction purges them
+    from the structures in a background task, in chunks, so the event loop is never blocked for long.
+    """
+
+    def __init__(self, purge: Callable[[UUID], None], policy: CompactionPolicy | None = None) -> None:
+        """
+        Constructs a new Tombstones instance.
+
+        Args:
+            purge: Physically removes the entry with the given ID from the index structures of the store.
+            policy: The thresholds triggering the compaction.
+        """
+        self.policy = policy or CompactionPolicy()
+        self.metrics = CompactionMetrics()
+        self._purge = purge
+        self._ids: set[UUID] = set()
+        self._task: asyncio.Task | None = None
+        self._error: BaseException | None = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, entry_id: object) -> bool:
+        return entry_id in self._ids
+
+    def __iter__(self) -> Iterator[UUID]:
+        return iter(self._ids)
+
+    def add(self, ids: Iterable[UUID], total: int) -> None:
+        """
+        Marks the entries as removed and starts a background compaction if the policy thresholds are exceeded.
+        Has to be called from a running event loop.
+
+        Args:
+            ids: The IDs of the removed entries.
+            total: The number of physically present entries, tombstoned ones included.
+        """
+        self._ids.update(ids)
+        self.metrics.tombstones = len(self._ids)
+        if self._task is None and self.policy.should_compact(len(self._ids), total):
+            self._task = asyncio.get_running_loop().create_task(self._compact())
+            self._task.add_done_callback(self._on_done)
+
+    def discard(self, ids: Iterable[UUID]) -> None:
+        """
+        Unmarks the entries, e.g. because they were stored again before being purged.
+
+        Args:
+            ids: The IDs of the entries.
+        """
+        self._ids.difference_update(ids)
+        self.metrics.tombstones = len(self._ids)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._task = None
+        if task.cancelled() or (error := task.exception()) is None:
+            return
+        logger.error("The background compaction failed.", exc_info=error)
+        self._error = error
+
+    async def compact(self) -> None:
+        """
+        Purges all the tombstoned entries, waiting for the running background compaction first.
+
+        Raises:
+            Exception: The error of the last failed background compaction, raised once. The entries it did not
+                purge stay tombstoned and are purged by the next compaction.
+        """
+        if self._task is not None:
+            await asyncio.wait([self._task])
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+        await self._compact()
+
+    async def _compact(self) -> None:
+        start = time.perf_counter()
+        pending = list(self._ids)
+        purged = 0
+        for chunk_start in range(0, len(pending), self.policy.chunk_size):
+            for entry_id in pending[chunk_start : chunk_start + self.policy.chunk_size]:
+                # Entries stored again in the meantime are no longer tombstones.
+                if entry_id in self._ids:
+                    self._purge(entry_id)
+                    self._ids.discard(entry_id)
+                    purged += 1
+            self.metrics.tombstones = len(self._ids)
+            await asyncio.sleep(0)
+
+        elapsed = time.perf_counter() - start
+        self.metrics.compactions += 1
+        self.metrics.compacted_entries += purged
+        self.metrics.last_compaction_seconds = elapsed
+        self.metrics.total_compaction_seconds += elapsed
@@ -0,0 +1,275 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
+from enum import Enum
+from pathlib import Path
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+
+from fetchbits.core.embeddings import SparseVector
+from fetchbits.core.options import Options
+from fetchbits.core.types import NotGiven
+
+Embedding = list[float] | SparseVector
+EmbeddingT = TypeVar("EmbeddingT", bound=Embedding)
+
+
+def _option_value_to_json(value: Any) -> Any:  # noqa: ANN401
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Option values of type {type(value).__name__} cannot be fingerprinted")
+
+
+def _options_fingerprint(options: Any) -> str:  # noqa: ANN401
+    """
+    Serializes the resolved values of the options, leaving the unset ones out, so equal options always give
+    equal fingerprints. Anything else than options is left out of the fingerprint.
+    """
+    if not isinstance(options, Options):
+        return ""
+    values = {
+        key: value
+        for key, value in options.dict().items()
+        if value is not None and value is not options._not_given and not isinstance(value, NotGiven)
+    }
+    return json.dumps(values, sort_keys=True, separators=(",", ":"), default=_option_value_to_json)
+
+
+def embedder_fingerprint(embedder: Any, embedding_type: str) -> str:  # noqa: ANN401
+    """
+    Builds the identity of an embedder used to namespace its cached embeddings. It consists of the embedder class,
+    its model name, the resolved values of its default options (if it has them) and the type of the embedded content.
+
+    Args:
+        embedder: The embedder.
+        embedding_type: The type of the embedded content, e.g. "text" or "image".
+
+    Returns:
+        The fingerprint of the embedder.
+
+    Raises:
+        TypeError: If an option value is neither a JSON type, an enum nor a pydantic model.
+    """
+    parts = [
+        f"{type(embedder).__module__}.{type(embedder).__qualname__}",
+        str(getattr(embedder, "model_name", "")),
+        _options_fingerprint(getattr(embedder, "default_options", None)),
+        embedding_type,
+    ]
+    return "\x00".join(parts)
+
+
+def content_key(fingerprint: str, content: str | bytes) -> str:
+    """
+    Builds the content-addressed cache key of the content embedded by the embedder with the given fingerprint.
+
+    Args:
+        fingerprint: The fingerprint of the embedder, see `embedder_fingerprint`.
+        content: The embedded text or image.
+
+    Returns:
+        The hex digest identifying the embedding.
+    """
+    digest = hashlib.sha256(fingerprint.encode())
+    digest.update(b"\x00")
+    digest.update(content.encode() if isinstance(content, str) else content)
+    return digest.hexdigest()
+
+
+class EmbeddingCache(ABC):
+    """
+    Base class for caches of embeddings, keyed by `content_key`.
+    """
+
+    @abstractmethod
+    async def get_many(self, keys: Sequence[str]) -> dict[str, Embedding]:
+        """
+        Looks up the embeddings.
+
+        Args:
+            keys: The keys to look up.
+
+        Returns:
+            The cached embeddings mapped by key. Missing keys are omitted.
+        """
+
+    @abstractmethod
+    async def set_many(self, embeddings: dict[str, Embedding]) -> None:
+        """
+        Stores the embeddings.
+
+        Args:
+            embeddings: The embeddings mapped by key.
+        """
+
+
+class InMemoryEmbeddingCache(EmbeddingCache):
+    """
+    In-process cache evicting the least recently used embeddings.
+    """
+
+    def __init__(self, max_size: int = 100_000) -> None:
+        """
+        Constructs a new InMemoryEmbeddingCache instance.
+
+        Args:
+            max_size: The maximal number of cached embeddings.
+        """
+        self.max_size = max_size
+        self._embeddings: OrderedDict[str, Embedding] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._embeddings)
+
+    async def get_many(self, keys: Sequence[str]) -> dict[str, Embedding]:
+        found = {}
+        for key in keys:
+            if (embedding := self._embeddings.get(key)) is not None:
+                self._embeddings.move_to_end(key)
+                found[key] = embedding
+        return found
+
+    async def set_many(self, embeddings: dict[str, Embedding]) -> None:
+        for key, embedding in embeddings.items():
+            self._embeddings[key] = embedding
+            self._embeddings.move_to_end(key)
+        while len(self._embeddings) > self.max_size:
+            self._embeddings.popitem(last=False)
+
+
+class SQLiteEmbeddingCache(EmbeddingCache):
+    """
+    On-disk cache keeping the embeddings in a SQLite database. Dense vectors are stored as raw float32 arrays,
+    the precision the vector stores search at, sparse vectors as JSON. Database access runs in a worker thread,
+    so it does not block the event loop.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Constructs a new SQLiteEmbeddingCache instance.
+
+        Args:
+            path: The path of the database file. It is created if it does not exist.
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, kind TEXT NOT NULL, value BLOB NOT NULL)"
+            )
+
+    @staticmethod
+    def _encode(embedding: Embedding) -> tuple[str, bytes]:
+        if isinstance(embedding, SparseVector):
+            return "sparse", embedding.model_dump_json().encode()
+        return "dense32", array("f", embedding).tobytes()
+
+    @staticmethod
+    def _decode(kind: str, value: bytes) -> Embedding:
+        if kind == "sparse":
+            return SparseVector(**json.loads(value))
+        return array("f", value).tolist()
+
+    def _get_many(self, keys: Sequence[str]) -> dict[str, Embedding]:
+        found = {}
+        with self._lock:
+            # Stay below the default SQLite limit of host parameters per statement.
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                rows = self._connection.execute(
+                    f"SELECT key, kind, value FROM embeddings WHERE key IN ({', '.join('?' * len(chunk))})",  # noqa: S608
+                    chunk,
+                )
+                found.update({key: self._decode(kind, value) for key, kind, value in rows})
+        return found
+
+    def _set_many(self, embeddings: dict[str, Embedding]) -> None:
+        rows = [(key, *self._encode(embedding)) for key, embedding in embeddings.items()]
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+
+    async def get_many(self, keys: Sequence[str]) -> dict[str, Embedding]:
+        return await asyncio.to_thread(self._get_many, list(keys))
+
+    async def set_many(self, embeddings: dict[str, Embedding]) -> None:
+        await asyncio.to_thread(self._set_many, embeddings)
+
+    def close(self) -> None:
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+
+class TieredEmbeddingCache(EmbeddingCache):
+    """
+    Cache checking a fast tier (usually in-process) first and a slow tier (usually on-disk) for the remaining keys.
+    Embeddings found in the slow tier are promoted to the fast one.
+    """
+
+    def __init__(self, fast: EmbeddingCache, slow: EmbeddingCache) -> None:
+        """
+        Constructs a new TieredEmbeddingCache instance.
+
+        Args:
+            fast: The tier checked first.
+            slow: The tier checked for the keys missing in the fast one.
+        """
+        self.fast = fast
+        self.slow = slow
+
+    async def get_many(self, keys: Sequence[str]) -> dict[str, Embedding]:
+        found = await self.fast.get_many(keys)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            promoted = await self.slow.get_many(missing)
+            if promoted:
+                await self.fast.set_many(promoted)
+                found.update(promoted)
+        return found
+
+    async def set_many(self, embeddings: dict[str, Embedding]) -> None:
+        await asyncio.gather(self.fast.set_many(embeddings), self.slow.set_many(embeddings))
+
+
+async def embed_with_cache(
+    contents: Sequence[str | bytes],
+    embed: Callable[[list[Any]], Awaitable[Sequence[EmbeddingT]]],
+    fingerprint: str,
+    cache: EmbeddingCache | None = None,
+) -> list[EmbeddingT]:
+    """
+    Embeds the contents, sending every distinct content that is not cached yet to the embedder exactly once.
+
+    Args:
+        contents: The texts or images to embed.
+        embed: The embedding function, e.g. `embedder.embed_text`.
+        fingerprint: The fingerprint of the embedder, see `embedder_fingerprint`.
+        cache: The cache to use. Without it, only the duplicates within the batch are skipped.
+
+    Returns:
+        The embeddings, in the order of the contents.
+    """
+    keys = [content_key(fingerprint, content) for content in contents]
+    unique = dict(zip(keys, contents, strict=True))
+
+    embeddings: dict[str, Any] = await cache.get_many(list(unique)) if cache is not None else {}
+    missing = [key for key in unique if key not in embeddings]
+    if missing:
+        computed = dict(zip(missing, await embed([unique[key] for key in missing]), strict=True))
+        if cache is not None:
+            await cache.set_many(computed)
+        embeddings.update(computed)
+
+    return [embeddings[key] for key in keys]
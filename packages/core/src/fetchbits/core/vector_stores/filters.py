@@ -0,0 +1,168 @@
+from collections.abc import Hashable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from fetchbits.core.utils.dict_transformations import SimpleTypes, flatten_dict, flatten_many
+from fetchbits.core.vector_stores.base import WHEREQUERY
+
+
+def _posting_key(value: SimpleTypes) -> tuple[bool, SimpleTypes]:
+    """
+    Builds the posting list key of a value. Booleans are tagged, so `True` does not match `1`.
+    """
+    return isinstance(value, bool), value
+
+
+@dataclass(frozen=True)
+class WhereFilter:
+    """
+    A `WHEREQUERY` compiled to the flattened key-value pairs the metadata has to contain.
+    """
+
+    conditions: tuple[tuple[str, SimpleTypes], ...]
+
+    def __bool__(self) -> bool:
+        return bool(self.conditions)
+
+    def __call__(self, metadata: dict[str, Any]) -> bool:
+        """
+        Checks whether the metadata matches the filter.
+
+        Args:
+            metadata: The (nested) metadata to check.
+
+        Returns:
+            True if the metadata matches the filter, otherwise False.
+        """
+        return self.matches_flat(flatten_dict(metadata))
+
+    def matches_flat(self, metadata: dict[str, SimpleTypes]) -> bool:
+        """
+        Checks whether already flattened metadata matches the filter.
+
+        Args:
+            metadata: The flattened metadata to check.
+
+        Returns:
+            True if the metadata matches the filter, otherwise False.
+        """
+        return all(
+            key in metadata and _posting_key(metadata[key]) == _posting_key(value) for key, value in self.conditions
+        )
+
+
+def compile_where(where: WHEREQUERY | WhereFilter | None) -> WhereFilter:
+    """
+    Compiles the filter dictionary into a reusable predicate.
+
+    Args:
+        where: The filter dictionary - the keys are the field names and the values are the values to filter by.
+            Nested dictionaries are flattened the same way as the metadata is.
+
+    Returns:
+        The compiled filter.
+    """
+    if isinstance(where, WhereFilter):
+        return where
+    return WhereFilter(conditions=tuple(flatten_dict(where or {}).items()))
+
+
+class MetadataIndex:
+    """
+    Inverted index over the flattened metadata of the entries. For every flattened key and value it keeps
+    the IDs of the entries having that value, in the order they were added.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[str, dict[tuple[bool, SimpleTypes], dict[Hashable, None]]] = {}
+        self._documents: dict[Hashable, dict[str, SimpleTypes]] = {}
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, entry_id: Hashable, metadata: dict[str, Any]) -> None:
+        """
+        Indexes the metadata of the entry, replacing the previously indexed metadata of the same entry.
+
+        Args:
+            entry_id: The ID of the entry.
+            metadata: The (nested) metadata of the entry.
+        """
+        self._add_flat(entry_id, flatten_dict(metadata))
+
+    def add_many(self, items: Iterable[tuple[Hashable, dict[str, Any]]]) -> None:
+        """
+        Indexes the metadata of multiple entries. The metadata are flattened in one batch, so the entries
+        share the key strings of their common fields.
+
+        Args:
+            items: The (entry ID, metadata) pairs to index.
+        """
+        pairs = list(items)
+        for (entry_id, _), flat in zip(pairs, flatten_many(metadata for _, metadata in pairs), strict=True):
+            self._add_flat(entry_id, flat)
+
+    def _add_flat(self, entry_id: Hashable, flat: dict[str, SimpleTypes]) -> None:
+        self.remove(entry_id)
+        self._documents[entry_id] = flat
+        for key, value in flat.items():
+            self._postings.setdefault(key, {}).setdefault(_posting_key(value), {})[entry_id] = None
+
+    def remove(self, entry_id: Hashable) -> None:
+        """
+        Removes the entry from the index. Unknown IDs are ignored.
+
+        Args:
+            entry_id: The ID of the entry.
+        """
+        flat = self._documents.pop(entry_id, None)
+        if flat is None:
+            return
+
+        for key, value in flat.items():
+            values = self._postings[key]
+            posting = values[_posting_key(value)]
+            del posting[entry_id]
+            if not posting:
+                del values[_posting_key(value)]
+                if not values:
+                    del self._postings[key]
+
+    def matches(self, entry_id: Hashable, where: WHEREQUERY | WhereFilter) -> bool:
+        """
+        Checks whether the indexed metadata of the entry matches the filter.
+
+        Args:
+            entry_id: The ID of the entry.
+            where: The filter dictionary or a compiled filter.
+
+        Returns:
+            True if the entry is indexed and matches the filter, otherwise False.
+        """
+        flat = self._documents.get(entry_id)
+        return flat is not None and compile_where(where).matches_flat(flat)
+
+    def match(self, where: WHEREQUERY | WhereFilter) -> list[Hashable]:
+        """
+        Finds the entries matching the filter by intersecting the posting lists, starting with the shortest one.
+
+        Args:
+            where: The filter dictionary or a compiled filter.
+
+        Returns:
+            The IDs of the matching entries, in the order they were added. All entries if the filter is empty.
+        """
+        conditions = compile_where(where).conditions
+        if not conditions:
+            return list(self._documents)
+
+        postings = []
+        for key, value in conditions:
+            posting = self._postings.get(key, {}).get(_posting_key(value))
+            if not posting:
+                return []
+            postings.append(posting)
+
+        postings.sort(key=len)
+        shortest, *rest = postings
+        return [entry_id for entry_id in shortest if all(entry_id in posting for posting in rest)]
@@ -0,0 +1,547 @@
+import heapq
+import math
+import random
+from collections.abc import Callable, Hashable, Iterator
+from itertools import islice
+from uuid import UUID
+
+import numpy as np
+import pydantic
+from typing_extensions import Self
+
+from fetchbits.core.embeddings import DenseEmbedder
+from fetchbits.core.vector_stores.base import (
+    WHEREQUERY,
+    EmbeddingType,
+    VectorStoreEntry,
+    VectorStoreOptions,
+    VectorStoreResult,
+    VectorStoreWithDenseEmbedder,
+    project_result,
+)
+from fetchbits.core.vector_stores.compaction import CompactionMetrics, CompactionPolicy, Tombstones
+from fetchbits.core.vector_stores.embedding_cache import EmbeddingCache
+from fetchbits.core.vector_stores.filters import MetadataIndex, compile_where
+from fetchbits.core.vector_stores.pagination import EntryPage, SortedIds, build_page, decode_cursor
+
+_GRAPH_PARAMETERS = {"m", "ef_construction"}
+
+
+class HNSWVectorStoreOptions(VectorStoreOptions):
+    """
+    Options for the HNSW vector store.
+
+    `ef` is the size of the dynamic candidate list used at query time. The parameters shaping the graph are
+    passed to the store constructor instead, as they cannot change once the graph is built.
+    """
+
+    ef: int = 64
+
+    @pydantic.model_validator(mode="after")
+    def reject_graph_parameters(self) -> Self:
+        # Graph parameters passed as options would be kept as extra fields and silently ignored.
+        given = sorted(_GRAPH_PARAMETERS & set(self.__pydantic_extra__ or {}))
+        if given:
+            raise ValueError(f"{', '.join(given)} must be passed to the HNSWVectorStore constructor, not as options.")
+        return self
+
+
+class HNSWIndex:
+    """
+    Hierarchical Navigable Small World graph over dense vectors, using the cosine distance.
+
+    See: Malkov & Yashunin, "Efficient and robust approximate nearest neighbor search using
+    Hierarchical Navigable Small World graphs".
+    """
+
+    def __init__(self, m: int = 16, ef_construction: int = 200, seed: int | None = None) -> None:
+        """
+        Constructs a new HNSWIndex instance.
+
+        Args:
+            m: The number of links created for every node on the upper layers. The bottom layer allows `2 * m` links.
+            ef_construction: The size of the dynamic candidate list used when inserting nodes.
+            seed: The seed of the random generator drawing node levels.
+        """
+        if m < 2:  # noqa: PLR2004
+            raise ValueError("m must be at least 2.")
+
+        self.m = m
+        self.ef_construction = ef_construction
+        self._level_multiplier = 1 / math.log(m)
+        self._random = random.Random(seed)  # noqa: S311
+
+        # The vectors are kept as stored, next to their norms, so they are returned unchanged.
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._norms = np.empty(0, dtype=np.float32)
+        self._keys: list[Hashable | None] = []
+        self._nodes: dict[Hashable, int] = {}
+        self._free: list[int] = []
+        self._levels: list[int] = []
+        self._links: list[list[list[int]]] = []
+        self._incoming: list[list[set[int]]] = []
+        self._entry_point: int | None = None
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._nodes
+
+    def vector(self, key: Hashable) -> np.ndarray:
+        """
+        Returns the vector stored under the key, as it was added.
+
+        Args:
+            key: The key of the vector.
+
+        Returns:
+            The vector.
+        """
+        return self._vectors[self._nodes[key]]
+
+    def _unit(self, node: int) -> np.ndarray:
+        return self._vectors[node] / self._norms[node]
+
+    def _max_links(self, level: int) -> int:
+        return 2 * self.m if level == 0 else self.m
+
+    def _allocate(self, vector: np.ndarray, norm: float) -> int:
+        """
+        Reserves a node slot for the vector, reusing slots of removed nodes.
+
+        Args:
+            vector: The vector of the node.
+            norm: The norm the vector is divided by in the distances, one for zero vectors.
+
+        Returns:
+            The node number.
+        """
+        if self._vectors.shape[1] not in (0, vector.shape[0]) and self._nodes:
+            raise ValueError(f"Expected vectors of dimension {self._vectors.shape[1]}, got {vector.shape[0]}.")
+
+        if self._free:
+            node = self._free.pop()
+        else:
+            node = len(self._keys)
+            self._keys.append(None)
+            self._levels.append(0)
+            self._links.append([])
+            self._incoming.append([])
+
+        if node >= self._vectors.shape[0] or self._vectors.shape[1] != vector.shape[0]:
+            vectors = np.empty((max(2 * self._vectors.shape[0], 16), vector.shape[0]), dtype=np.float32)
+            norms = np.empty(vectors.shape[0], dtype=np.float32)
+            if self._nodes:
+                vectors[: self._vectors.shape[0]] = self._vectors
+                norms[: self._norms.shape[0]] = self._norms
+            self._vectors = vectors
+            self._norms = norms
+
+        self._vectors[node] = vector
+        self._norms[node] = norm
+        return node
+
+    def _distances(self, query: np.ndarray, nodes: list[int]) -> np.ndarray:
+        return 1 - (self._vectors[nodes] @ query) / self._norms[nodes]
+
+    def _set_links(self, node: int, level: int, neighbors: list[int]) -> None:
+        """
+        Replaces the outgoing links of the node on the given level, keeping the reverse links in sync.
+        """
+        for neighbor in self._links[node][level]:
+            self._incoming[neighbor][level].discard(node)
+        for neighbor in neighbors:
+            self._incoming[neighbor][level].add(node)
+        self._links[node][level] = neighbors
+
+    def _search_layer(
+        self,
+        query: np.ndarray,
+        entry_points: list[int],
+        ef: int,
+        level: int,
+        allowed: Callable[[int], bool] | None = None,
+    ) -> list[tuple[float, int]]:
+        """
+        Greedy best-first search of a single layer of the graph.
+
+        Args:
+            query: The normalized query vector.
+            entry_points: The nodes the search starts from.
+            ef: The size of the dynamic candidate list.
+            level: The layer to search.
+            allowed: Optional predicate over nodes. Rejected nodes are traversed, but never returned.
+
+        Returns:
+            Up to `ef` (distance, node) pairs closest to the query, sorted by ascending distance.
+        """
+        visited = set(entry_points)
+        candidates = list(zip(self._distances(query, entry_points).tolist(), entry_points, strict=True))
+        heapq.heapify(candidates)
+        results = [(-distance, node) for distance, node in candidates if allowed is None or allowed(node)]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            distance, node = heapq.heappop(candidates)
+            if len(results) >= ef and distance > -results[0][0]:
+                break
+
+            neighbors = [neighbor for neighbor in self._links[node][level] if neighbor not in visited]
+            if not neighbors:
+                continue
+
+            visited.update(neighbors)
+            for neighbor_distance, neighbor in zip(self._distances(query, neighbors).tolist(), neighbors, strict=True):
+                if len(results) < ef or neighbor_distance < -results[0][0]:
+                    heapq.heappush(candidates, (neighbor_distance, neighbor))
+                    if allowed is None or allowed(neighbor):
+                        heapq.heappush(results, (-neighbor_distance, neighbor))
+                        if len(results) > ef:
+                            heapq.heappop(results)
+
+        return sorted((-distance, node) for distance, node in results)
+
+    def _select_neighbors(self, candidates: list[tuple[float, int]], m: int) -> list[int]:
+        """
+        Picks up to `m` neighbors with the heuristic keeping links that point in diverse directions.
+
+        Args:
+            candidates: The (distance, node) pairs to choose from, sorted by ascending distance.
+            m: The maximal number of neighbors.
+
+        Returns:
+            The selected nodes.
+        """
+        selected: list[int] = []
+        for distance, node in candidates:
+            if len(selected) >= m:
+                break
+            if not selected or bool((distance < self._distances(self._unit(node), selected)).all()):
+                selected.append(node)
+        return selected
+
+    def _shrink(self, node: int, level: int, neighbors: set[int]) -> None:
+        """
+        Re-selects the links of the node on the given level out of the provided neighbors.
+        """
+        neighbors.discard(node)
+        ordered = list(neighbors)
+        candidates = sorted(zip(self._distances(self._unit(node), ordered).tolist(), ordered, strict=True))
+        self._set_links(node, level, self._select_neighbors(candidates, self._max_links(level)))
+
+    def add(self, key: Hashable, vector: list[float] | np.ndarray) -> None:
+        """
+        Inserts the vector into the graph. A vector already stored under the same key is replaced.
+
+        Args:
+            key: The key identifying the vector.
+            vector: The vector to insert.
+        """
+        if key in self._nodes:
+            self.remove(key)
+
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(vector)) or 1.0
+        query = vector / norm
+
+        node = self._allocate(vector, norm)
+        level = int(-math.log(1 - self._random.random()) * self._level_multiplier)
+        self._keys[node] = key
+        self._nodes[key] = node
+        self._levels[node] = level
+        self._links[node] = [[] for _ in range(level + 1)]
+        self._incoming[node] = [set() for _ in range(level + 1)]
+
+        if self._entry_point is None:
+            self._entry_point = node
+            return
+
+        top_level = self._levels[self._entry_point]
+        entry_points = [self._entry_point]
+        for current_level in range(top_level, level, -1):
+            entry_points = [self._search_layer(query, entry_points, 1, current_level)[0][1]]
+
+        for current_level in range(min(level, top_level), -1, -1):
+            candidates = self._search_layer(query, entry_points, self.ef_construction, current_level)
+            neighbors = self._select_neighbors(candidates, self.m)
+            self._set_links(node, current_level, neighbors)
+            for neighbor in neighbors:
+                links = self._links[neighbor][current_level]
+                if len(links) < self._max_links(current_level):
+                    links.append(node)
+                    self._incoming[node][current_level].add(neighbor)
+                else:
+                    self._shrink(neighbor, current_level, {*links, node})
+            entry_points = [candidate for _, candidate in candidates]
+
+        if level > top_level:
+            self._entry_point = node
+
+    def remove(self, key: Hashable) -> None:
+        """
+        Removes the vector from the graph, reconnecting the nodes that linked to it.
+
+        Args:
+            key: The key of the vector to remove. Unknown keys are ignored.
+        """
+        node = self._nodes.pop(key, None)
+        if node is None:
+            return
+
+        for level in range(self._levels[node] + 1):
+            links = self._links[node][level]
+            for neighbor in list(self._incoming[node][level]):
+                self._shrink(neighbor, level, {*self._links[neighbor][level], *links} - {node})
+            self._set_links(node, level, [])
+
+        self._keys[node] = None
+        self._links[node] = []
+        self._incoming[node] = []
+        self._free.append(node)
+
+        if node == self._entry_point:
+            self._entry_point = max(self._nodes.values(), key=self._levels.__getitem__, default=None)
+
+    def search(
+        self,
+        vector: list[float] | np.ndarray,
+        k: int,
+        ef: int | None = None,
+        allowed: Callable[[Hashable], bool] | None = None,
+    ) -> list[tuple[Hashable, float]]:
+        """
+        Finds the approximate nearest neighbors of the vector.
+
+        Args:
+            vector: The query vector.
+            k: The number of neighbors to return.
+            ef: The size of the dynamic candidate list, raised to `k` if smaller.
+            allowed: Optional predicate over keys. Rejected nodes are still traversed, but never returned.
+
+        Returns:
+            Up to `k` (key, cosine similarity) pairs, sorted by descending similarity.
+        """
+        if self._entry_point is None or k <= 0:
+            return []
+
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        entry_points = [self._entry_point]
+        for level in range(self._levels[self._entry_point], 0, -1):
+            entry_points = [self._search_layer(query, entry_points, 1, level)[0][1]]
+
+        node_allowed = None
+        if allowed is not None:
+            node_allowed = lambda node: allowed(self._keys[node])  # noqa: E731
+
+        candidates = self._search_layer(query, entry_points, max(ef or k, k), 0, node_allowed)
+        return [(self._keys[node], 1 - distance) for distance, node in candidates[:k]]
+
+
+class HNSWVectorStore(VectorStoreWithDenseEmbedder[HNSWVectorStoreOptions]):
+    """
+    In-memory vector store answering queries approximately with an HNSW graph, in sub-linear time.
+    Scores are cosine similarities, so the higher the score, the more similar the entry is to the query.
+    """
+
+    options_cls = HNSWVectorStoreOptions
+
+    def __init__(
+        self,
+        embedder: DenseEmbedder,
+        embedding_type: EmbeddingType = EmbeddingType.TEXT,
+        default_options: HNSWVectorStoreOptions | None = None,
+        embedding_cache: EmbeddingCache | None = None,
+        m: int = 16,
+        ef_construction: int = 200,
+        seed: int | None = None,
+        compaction_policy: CompactionPolicy | None = None,
+    ) -> None:
+        """
+        Constructs a new HNSWVectorStore instance.
+
+        Args:
+            embedder: The embedder to use for converting entries to vectors.
+            embedding_type: Which part of the entry to embed, either text or image. The other part will be ignored.
+            default_options: The default options for querying the vector store.
+            embedding_cache: The cache of already computed embeddings.
+            m: The number of links created for every node of the graph, see `HNSWIndex`.
+            ef_construction: The size of the dynamic candidate list used when inserting nodes.
+            seed: The seed of the random generator drawing node levels.
+            compaction_policy: The thresholds triggering the background removal of the removed nodes from the graph.
+        """
+        super().__init__(
+            embedder=embedder,
+            embedding_type=embedding_type,
+            default_options=default_options,
+            embedding_cache=embedding_cache,
+        )
+        self._entries: dict[UUID, VectorStoreEntry] = {}
+        self._sorted_ids = SortedIds()
+        self._metadata_index = MetadataIndex()
+        self._index = HNSWIndex(m=m, ef_construction=ef_construction, seed=seed)
+        self._tombstones = Tombstones(self._index.remove, compaction_policy)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def compaction_metrics(self) -> CompactionMetrics:
+        """
+        The counters of the removed entries and of the compactions of the graph.
+        """
+        return self._tombstones.metrics
+
+    async def compact(self) -> None:
+        """
+        Removes all the removed entries from the graph now, instead of waiting for the background compaction.
+
+        Raises:
+            Exception: The error of the last failed background compaction, see `Tombstones.compact`.
+        """
+        await self._tombstones.compact()
+
+    async def store(self, entries: list[VectorStoreEntry]) -> None:
+        """
+        Store entries in the vector store. Entries with already stored IDs are overwritten.
+
+        Args:
+            entries: The entries to store.
+        """
+        embeddings = await self._create_embeddings(entries)
+        self.generation += 1
+        for entry_id, vector in embeddings.items():
+            self._index.add(entry_id, vector)
+
+        stored = {entry.id: entry for entry in entries if entry.id in embeddings}
+        self._tombstones.discard(stored)
+        self._entries.update(stored)
+        self._sorted_ids.add(stored)
+        self._metadata_index.add_many((entry_id, entry.metadata) for entry_id, entry in stored.items())
+
+    async def retreive(self, text: str, options: HNSWVectorStoreOptions | None = None) -> list[VectorStoreResult]:
+        """
+        Retrieve entries from the vector store most similar to the provided text.
+
+        Args:
+            text: The text to query the vector store with.
+            options: The options for querying the vector store.
+
+        Returns:
+            The entries, sorted from the most to the least similar.
+        """
+        return (await self.retrieve_many([text], options))[0]
+
+    async def retrieve_many(
+        self, texts: list[str], options: HNSWVectorStoreOptions | None = None
+    ) -> list[list[VectorStoreResult]]:
+        """
+        Retrieve entries most similar to each of the provided texts. All the texts are embedded in one call.
+
+        Args:
+            texts: The texts to query the vector store with.
+            options: The options for querying the vector store, shared by all the queries.
+
+        Returns:
+            The entries for every text, each sorted from the most to the least similar.
+        """
+        merged_options = (self.default_options | options) if options else self.default_options
+        if not texts:
+            return []
+
+        allowed = None
+        if merged_options.where:
+            # Removed entries are dropped from the metadata index right away, so they never match.
+            matching = set(self._metadata_index.match(merged_options.where))
+            if not matching:
+                return [[] for _ in texts]
+            allowed = matching.__contains__
+        elif self._tombstones:
+            allowed = self._entries.__contains__
+
+        results = []
+        for query_vector in await self._embedder.embed_text(texts):
+            hits = self._index.search(query_vector, merged_options.k, merged_options.ef, allowed)
+            results.append(
+                [
+                    project_result(
+                        entry_id,  # type: ignore[arg-type]
+                        score,
+                        merged_options.projection,
+                        entry=lambda entry_id=entry_id: self._entries[entry_id],  # type: ignore[misc]
+                        vector=lambda entry_id=entry_id: self._index.vector(entry_id).tolist(),  # type: ignore[misc]
+                    )
+                    for entry_id, score in hits
+                    if merged_options.score_threshold is None or score >= merged_options.score_threshold
+                ]
+            )
+        return results
+
+    async def remove(self, ids: list[UUID]) -> None:
+        """
+        Remove entries from the vector store. The entries disappear from the results right away, while their nodes
+        stay in the graph as tombstones, still routing the searches, until the background compaction removes them.
+
+        Args:
+            ids: The list of entries' IDs to remove.
+        """
+        self.generation += 1
+        removed = [entry_id for entry_id in ids if self._entries.pop(entry_id, None) is not None]
+        self._sorted_ids.remove(removed)
+        for entry_id in removed:
+            self._metadata_index.remove(entry_id)
+        self._tombstones.add(removed, total=len(self._index))
+
+    async def list_page(
+        self, where: WHEREQUERY | None = None, limit: int = 100, cursor: str | None = None
+    ) -> EntryPage:
+        """
+        List a page of entries in ascending ID order, continuing right after the cursor. The cursor is found
+        with a binary search over the sorted IDs, so the pages deep into the store are as fast as the first one.
+
+        Args:
+            where: The filter dictionary - the keys are the field names and the values are the values to filter by.
+                Not specifying the key means no filtering.
+            limit: The maximum number of entries of the page.
+            cursor: The `next_cursor` of the previous page, or None to start from the beginning.
+
+        Returns:
+            The page of entries with the cursor of the next page.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        ids = self._sorted_ids.after(decode_cursor(cursor))
+        if where:
+            where_filter, metadata_index = compile_where(where), self._metadata_index
+            ids = (entry_id for entry_id in ids if metadata_index.matches(entry_id, where_filter))
+        return build_page(ids, limit, self._entries.__getitem__)
+
+    async def list(
+        self, where: WHEREQUERY | None = None, limit: int | None = None, offset: int = 0
+    ) -> list[VectorStoreEntry]:
+        """
+        List entries from the vector store. The entries can be filtered, limited and offset.
+
+        Args:
+            where: The filter dictionary - the keys are the field names and the values are the values to filter by.
+                Not specifying the key means no filtering.
+            limit: The maximum number of entries to return.
+            offset: The number of entries to skip.
+
+        Returns:
+            The entries.
+        """
+        entries: Iterator[VectorStoreEntry] = iter(self._entries.values())
+        if where:
+            entries = (self._entries[entry_id] for entry_id in self._metadata_index.match(where))
+
+        stop = offset + limit if limit is not None else None
+        return list(islice(entries, offset, stop))
+
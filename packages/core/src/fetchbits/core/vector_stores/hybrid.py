@@ -0,0 +1,134 @@
+import asyncio
+from uuid import UUID
+
+from fetchbits.core.vector_stores.base import (
+    WHEREQUERY,
+    VectorStore,
+    VectorStoreEntry,
+    VectorStoreOptions,
+    VectorStoreResult,
+)
+from fetchbits.core.vector_stores.hybrid_strategies import HybridRetrivalStrategy, ReciprocalRankFusion
+from fetchbits.core.vector_stores.pagination import EntryPage
+
+
+class HybridSearchVectorStore(VectorStore[VectorStoreOptions]):
+    """
+    A vector store that wraps several vector stores, typically one dense and one sparse, and queries them
+    concurrently, so a search costs the latency of the slowest store instead of the sum of all of them.
+    The results are joined with the retrieval strategy.
+    """
+
+    options_cls = VectorStoreOptions
+
+    def __init__(
+        self,
+        *vector_stores: VectorStore,
+        retrieval_strategy: HybridRetrivalStrategy | None = None,
+        default_options: VectorStoreOptions | None = None,
+    ) -> None:
+        """
+        Constructs a new HybridSearchVectorStore instance.
+
+        Args:
+            vector_stores: The vector stores to wrap.
+            retrieval_strategy: The strategy joining the results of the stores, Reciprocal Rank Fusion by default.
+            default_options: The default options for querying the vector stores.
+        """
+        super().__init__(default_options)
+        self.vector_stores = vector_stores
+        self.retrieval_strategy = retrieval_strategy or ReciprocalRankFusion()
+
+    async def store(self, entries: list[VectorStoreEntry]) -> None:
+        """
+        Store entries in all the vector stores.
+
+        Args:
+            entries: The entries to store.
+        """
+        try:
+            await asyncio.gather(*(vector_store.store(entries) for vector_store in self.vector_stores))
+        finally:
+            self.generation += 1
+
+    async def retreive(self, text: str, options: VectorStoreOptions | None = None) -> list[VectorStoreResult]:
+        """
+        Retrieve entries from all the vector stores concurrently and join the results.
+
+        Args:
+            text: The text to query the vector stores with.
+            options: The options for querying the vector stores. The score threshold is applied by every store
+                to its own scores, not to the joined ones.
+
+        Returns:
+            The joined entries, with the hits of the individual stores kept as subresults.
+        """
+        return (await self.retrieve_many([text], options))[0]
+
+    async def retrieve_many(
+        self, texts: list[str], options: VectorStoreOptions | None = None
+    ) -> list[list[VectorStoreResult]]:
+        """
+        Retrieve entries for all the texts from all the vector stores concurrently and join the results per text.
+
+        Args:
+            texts: The texts to query the vector stores with.
+            options: The options for querying the vector stores, shared by all the queries.
+
+        Returns:
+            The joined entries for every text, in the order of the texts.
+        """
+        merged_options = (self.default_options | options) if options else self.default_options
+        store_results = await asyncio.gather(
+            *(vector_store.retrieve_many(texts, merged_options) for vector_store in self.vector_stores)
+        )
+        return [
+            self.retrieval_strategy.join([results[index] for results in store_results])[: merged_options.k]
+            for index in range(len(texts))
+        ]
+
+    async def remove(self, ids: list[UUID]) -> None:
+        """
+        Remove entries from all the vector stores.
+
+        Args:
+            ids: The list of entries' IDs to remove.
+        """
+        try:
+            await asyncio.gather(*(vector_store.remove(ids) for vector_store in self.vector_stores))
+        finally:
+            self.generation += 1
+
+    async def list_page(
+        self, where: WHEREQUERY | None = None, limit: int = 100, cursor: str | None = None
+    ) -> EntryPage:
+        """
+        List a page of entries in ascending ID order. All the stores hold the same entries, so the first one is listed.
+
+        Args:
+            where: The filter dictionary - the keys are the field names and the values are the values to filter by.
+                Not specifying the key means no filtering.
+            limit: The maximum number of entries of the page.
+            cursor: The `next_cursor` of the previous page, or None to start from the beginning.
+
+        Returns:
+            The page of entries with the cursor of the next page.
+        """
+        return await self.vector_stores[0].list_page(where=where, limit=limit, cursor=cursor)
+
+    async def list(
+        self, where: WHEREQUERY | None = None, limit: int | None = None, offset: int = 0
+    ) -> list[VectorStoreEntry]:
+        """
+        List entries from the vector store. All the stores hold the same entries, so the first one is listed.
+
+        Args:
+            where: The filter dictionary - the keys are the field names and the values are the values to filter by.
+                Not specifying the key means no filtering.
+            limit: The maximum number of entries to return.
+            offset: The number of entries to skip.
+
+        Returns:
+            The entries.
+        """
+        return await self.vector_stores[0].list(where=where, limit=limit, offset=offset)
@@ -0,0 +1,104 @@
+from abc import ABC, abstractmethod
+from uuid import UUID
+
+from fetchbits.core.vector_stores.base import VectorStoreResult
+
+
+class HybridRetrivalStrategy(ABC):
+    """
+    A class that can join vectors retrieved from different vector stores into a single list,
+    allowing for different strategies for combining results.
+    """
+
+    @abstractmethod
+    def join(self, results: list[list[VectorStoreResult]]) -> list[VectorStoreResult]:
+        """
+        Joins the multiple lists of results into a single list.
+
+        Args:
+            results: The lists of results to join, one list per vector store, each sorted by descending score.
+
+        Returns:
+            The joined results, sorted by descending score. Every result keeps the hits it was built from
+            in its subresults.
+        """
+
+    @staticmethod
+    def _fuse(results: list[list[VectorStoreResult]], scores: dict[UUID, float]) -> list[VectorStoreResult]:
+        """
+        Builds one result per entry with the given fused score, keeping the underlying hits as subresults.
+        """
+        hits: dict[UUID, list[VectorStoreResult]] = {}
+        for store_results in results:
+            for result in store_results:
+                hits.setdefault(result.entry.id, []).append(result)
+
+        # The hits come from the vector stores, possibly projected, so they are not validated again.
+        fused = [
+            VectorStoreResult.model_construct(
+                entry=entry_hits[0].entry,
+                vector=entry_hits[0].vector,
+                score=scores[entry_id],
+                subresults=entry_hits,
+            )
+            for entry_id, entry_hits in hits.items()
+        ]
+        fused.sort(key=lambda result: result.score, reverse=True)
+        return fused
+
+
+class ReciprocalRankFusion(HybridRetrivalStrategy):
+    """
+    A class that joins the results using the Reciprocal Rank Fusion: every entry gets the sum of `1 / (k + rank)`
+    over the lists it appears in. Only the ranks are used, so the scores of the stores do not have to be comparable.
+
+    See: Cormack et al., "Reciprocal Rank Fusion outperforms Condorcet and individual Rank Learning Methods".
+    """
+
+    def __init__(self, k_constant: float = 60.0, weights: list[float] | None = None) -> None:
+        """
+        Constructs a new ReciprocalRankFusion instance.
+
+        Args:
+            k_constant: The constant dampening the impact of the top ranks.
+            weights: The weights of the vector stores, all equal to 1 if not provided.
+        """
+        self.k_constant = k_constant
+        self.weights = weights
+
+    def join(self, results: list[list[VectorStoreResult]]) -> list[VectorStoreResult]:
+        weights = self.weights or [1.0] * len(results)
+        scores: dict[UUID, float] = {}
+        for weight, store_results in zip(weights, results, strict=True):
+            for rank, result in enumerate(store_results, start=1):
+                scores[result.entry.id] = scores.get(result.entry.id, 0.0) + weight / (self.k_constant + rank)
+        return self._fuse(results, scores)
+
+
+class WeightedScoreFusion(HybridRetrivalStrategy):
+    """
+    A class that joins the results by min-max normalizing the scores of every store to the [0, 1] range
+    and summing the normalized scores with the weights of the stores.
+    """
+
+    def __init__(self, weights: list[float] | None = None) -> None:
+        """
+        Constructs a new WeightedScoreFusion instance.
+
+        Args:
+            weights: The weights of the vector stores, all equal to 1 if not provided.
+        """
+        self.weights = weights
+
+    def join(self, results: list[list[VectorStoreResult]]) -> list[VectorStoreResult]:
+        weights = self.weights or [1.0] * len(results)
+        scores: dict[UUID, float] = {}
+        for weight, store_results in zip(weights, results, strict=True):
+            if not store_results:
+                continue
+            low = min(result.score for result in store_results)
+            spread = max(result.score for result in store_results) - low
+            for result in store_results:
+                normalized = (result.score - low) / spread if spread else 1.0
+                scores[result.entry.id] = scores.get(result.entry.id, 0.0) + weight * normalized
+        return self._fuse(results, scores)
@@ -0,0 +1,681 @@
+import heapq
+import tempfile
+from collections.abc import Iterator, MutableMapping
+from itertools import islice
+from pathlib import Path
+from uuid import UUID
+
+import numpy as np
+from typing_extensions import Self
+
+from fetchbits.core.embeddings import DenseEmbedder
+from fetchbits.core.vector_stores.base import (
+    WHEREQUERY,
+    EmbeddingType,
+    VectorStoreEntry,
+    VectorStoreOptions,
+    VectorStoreResult,
+    VectorStoreWithDenseEmbedder,
+    project_result,
+)
+from fetchbits.core.vector_stores.compaction import CompactionMetrics, CompactionPolicy, Tombstones
+from fetchbits.core.vector_stores.embedding_cache import EmbeddingCache
+from fetchbits.core.vector_stores.filters import MetadataIndex, compile_where
+from fetchbits.core.vector_stores.pagination import EntryPage, SortedIds, build_page, decode_cursor
+from fetchbits.core.vector_stores.quantization import Quantizer
+from fetchbits.core.vector_stores.scoring import top_k
+from fetchbits.core.vector_stores.segment import SegmentEntries, VectorSegment
+
+
+# The number of scores computed at once, bounding the memory of the score matrix of a batch of queries.
+_SCORE_CHUNK_ELEMENTS = 1 << 24
+# The smallest capacity of the delta matrix.
+_MIN_CAPACITY = 16
+
+
+class InMemoryVectorStoreOptions(VectorStoreOptions):
+    """
+    Options for the in-memory vector store.
+
+    `rescore_factor` applies to quantized stores only: `k * rescore_factor` candidates found over the codes
+    are rescored with the full-precision vectors. Zero disables rescoring.
+    """
+
+    rescore_factor: int = 4
+
+
+class InMemoryVectorStore(VectorStoreWithDenseEmbedder[InMemoryVectorStoreOptions]):
+    """
+    In-memory vector store keeping all the dense vectors in a single contiguous float32 matrix.
+
+    Retrieval is a matrix product of the queries with the stored vectors followed by an `argpartition` based
+    top-k selection, chunked over the queries so the score matrix stays bounded.
+    Scores are cosine similarities, so the higher the score, the more similar the entry is to the query.
+
+    With a quantizer, the store keeps compact codes of the normalized vectors and searches over the codes,
+    touching only the rescored candidates' rows of the matrix. The matrix is then moved to a memory-mapped
+    temporary file, or served from the memory-mapped segment after `load`, so only the codes have to stay
+    resident while the vectors are paged in on demand.
+
+    A loaded store serves the saved segment as an immutable base and keeps the entries stored afterwards in
+    an append-only in-memory delta. Rows are numbered across both, the base rows first. Removed or overwritten
+    base rows are masked out until the store is saved again, only the delta rows are compacted.
+    """
+
+    options_cls = InMemoryVectorStoreOptions
+
+    def __init__(
+        self,
+        embedder: DenseEmbedder,
+        embedding_type: EmbeddingType = EmbeddingType.TEXT,
+        default_options: InMemoryVectorStoreOptions | None = None,
+        embedding_cache: EmbeddingCache | None = None,
+        quantizer: Quantizer | None = None,
+        compaction_policy: CompactionPolicy | None = None,
+    ) -> None:
+        """
+        Constructs a new InMemoryVectorStore instance.
+
+        Args:
+            embedder: The embedder to use for converting entries to vectors.
+            embedding_type: Which part of the entry to embed, either text or image. The other part will be ignored.
+            default_options: The default options for querying the vector store.
+            embedding_cache: The cache of already computed embeddings.
+            quantizer: The quantizer compressing the vectors searched over, see `quantize`.
+            compaction_policy: The thresholds triggering the background removal of the removed rows from the matrix.
+        """
+        super().__init__(
+            embedder=embedder,
+            embedding_type=embedding_type,
+            default_options=default_options,
+            embedding_cache=embedding_cache,
+        )
+        self._entries: MutableMapping[UUID, VectorStoreEntry] = {}
+        self._segment: VectorSegment | None = None
+        self._base_count = 0
+        # The mask of the removed or overwritten base rows, allocated on the first one.
+        self._base_dead: np.ndarray | None = None
+        self._base_dead_count = 0
+        self._base_codes: np.ndarray | None = None
+        # The IDs, rows, vectors, norms and codes of the delta, its rows counted from zero.
+        self._sorted_ids = SortedIds()
+        self._ids: list[UUID] = []
+        self._rows: dict[UUID, int] = {}
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._norms = np.empty(0, dtype=np.float32)
+        self._codes: np.ndarray | None = None
+        self._metadata_index: MetadataIndex | None = MetadataIndex()
+        self._quantizer = quantizer
+        self._tombstones = Tombstones(self._purge, compaction_policy)
+
+    def __len__(self) -> int:
+        return self._base_count - self._base_dead_count + len(self._ids) - len(self._tombstones)
+
+    @property
+    def compaction_metrics(self) -> CompactionMetrics:
+        """
+        The counters of the removed rows and of the compactions of the matrix.
+        """
+        return self._tombstones.metrics
+
+    async def compact(self) -> None:
+        """
+        Removes all the removed rows from the matrix now, instead of waiting for the background compaction.
+
+        Raises:
+            Exception: The error of the last failed background compaction, see `Tombstones.compact`.
+        """
+        await self._tombstones.compact()
+
+    @classmethod
+    def load(
+        cls,
+        path: str | Path,
+        embedder: DenseEmbedder,
+        embedding_type: EmbeddingType = EmbeddingType.TEXT,
+        default_options: InMemoryVectorStoreOptions | None = None,
+        embedding_cache: EmbeddingCache | None = None,
+        quantizer: Quantizer | None = None,
+        compaction_policy: CompactionPolicy | None = None,
+    ) -> Self:
+        """
+        Opens a store saved with `save`. The vectors are memory-mapped, the entries are decoded and their IDs
+        resolved lazily, so opening takes constant time. The segment is never modified, see the class description.
+
+        Args:
+            path: The directory of the saved segment.
+            embedder: The embedder to use for converting entries to vectors.
+            embedding_type: Which part of the entry to embed, either text or image. The other part will be ignored.
+            default_options: The default options for querying the vector store.
+            embedding_cache: The cache of already computed embeddings.
+            quantizer: The quantizer compressing the vectors searched over, see `quantize`. If the segment was saved
+                quantized, the quantizer saved with it and its codes are used instead.
+            compaction_policy: The thresholds triggering the background removal of the removed rows from the matrix.
+
+        Returns:
+            The vector store serving the saved entries.
+        """
+        store = cls(
+            embedder=embedder,
+            embedding_type=embedding_type,
+            default_options=default_options,
+            embedding_cache=embedding_cache,
+            quantizer=quantizer,
+            compaction_policy=compaction_policy,
+        )
+        segment = VectorSegment(path)
+        store._segment = segment
+        store._base_count = len(segment)
+        store._entries = SegmentEntries(segment)
+        if segment.quantizer is not None and segment.codes is not None:
+            store._quantizer = segment.quantizer
+            store._base_codes = segment.codes
+            store._codes = np.empty((0, segment.codes.shape[1]), dtype=segment.codes.dtype)
+        # The metadata index is built on the first filtered query, so loading does not decode the entries.
+        store._metadata_index = None
+        return store
+
+    def save(self, path: str | Path) -> None:
+        """
+        Saves the entries and their vectors as a memory-mappable segment, see `VectorSegment`.
+        Quantized stores save their codes and the trained quantizer as well.
+
+        Args:
+            path: The directory to save the segment to.
+        """
+        rows = self._live_rows()
+        entries = [self._entries[self._id_at(row)] for row in rows.tolist()]
+        if self._codes is None or self._quantizer is None:
+            VectorSegment.write(path, entries, self._take(rows)[0])
+        else:
+            VectorSegment.write(path, entries, self._take(rows)[0], self._take_codes(rows), self._quantizer)
+
+    def _live_rows(self) -> np.ndarray:
+        """
+        Returns the rows of the stored entries, without the removed or overwritten ones.
+        """
+        base = np.arange(self._base_count)
+        if self._base_dead is not None:
+            base = base[~self._base_dead]
+        delta = np.fromiter(
+            (row for row, entry_id in enumerate(self._ids) if entry_id not in self._tombstones), dtype=np.intp
+        )
+        return np.concatenate([base, self._base_count + delta])
+
+    def _id_at(self, row: int) -> UUID:
+        """
+        Returns the ID of the entry stored in the given row of the base or the delta.
+        """
+        if row < self._base_count:
+            return self._segment.id_at(row)  # type: ignore[union-attr]
+        return self._ids[row - self._base_count]
+
+    def _row_of(self, entry_id: UUID) -> int | None:
+        """
+        Returns the row of the entry, or None if the store does not contain it.
+        """
+        row = self._rows.get(entry_id)
+        if row is not None:
+            return self._base_count + row
+        if self._segment is not None and (row := self._segment.row_of(entry_id)) is not None:
+            if self._base_dead is None or not self._base_dead[row]:
+                return row
+        return None
+
+    def _dim(self) -> int:
+        if self._segment is not None and self._base_count:
+            return self._segment.dim
+        return self._vectors.shape[1]
+
+    def _take(self, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Gathers the vectors and the norms of the given rows from the base and the delta.
+        """
+        base = self._base_count
+        if not base:
+            return self._vectors[rows], self._norms[rows]
+
+        in_base = rows < base
+        if in_base.all():
+            return self._segment.vectors[rows], self._segment.norms[rows]  # type: ignore[union-attr]
+        vectors = np.empty((rows.shape[0], self._dim()), dtype=np.float32)
+        norms = np.empty(rows.shape[0], dtype=np.float32)
+        vectors[in_base] = self._segment.vectors[rows[in_base]]  # type: ignore[union-attr]
+        norms[in_base] = self._segment.norms[rows[in_base]]  # type: ignore[union-attr]
+        vectors[~in_base] = self._vectors[rows[~in_base] - base]
+        norms[~in_base] = self._norms[rows[~in_base] - base]
+        return vectors, norms
+
+    def _take_codes(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Gathers the codes of the given rows from the base and the delta.
+        """
+        delta = self._codes[: len(self._ids)]  # type: ignore[index]
+        if self._base_codes is None:
+            return delta[rows]
+        in_base = rows < self._base_count
+        codes = np.empty((rows.shape[0], delta.shape[1]), dtype=delta.dtype)
+        codes[in_base] = self._base_codes[rows[in_base]]
+        codes[~in_base] = delta[rows[~in_base] - self._base_count]
+        return codes
+
+    def quantize(self, sample_size: int | None = 100_000, seed: int | None = None) -> None:
+        """
+        Encodes all the stored vectors with the quantizer, training it first on a random sample of the vectors
+        if it is not trained yet. From then on, searches run over the codes and new vectors are encoded on store,
+        while the full-precision vectors are moved out of memory to a memory-mapped temporary file.
+
+        Args:
+            sample_size: The maximal number of vectors to train on. All the vectors are used if None.
+            seed: The seed of the random generator drawing the training sample.
+
+        Raises:
+            ValueError: If the store has no quantizer or no vectors.
+        """
+        if self._quantizer is None:
+            raise ValueError("The store has no quantizer.")
+        count = self._base_count + len(self._ids)
+        if not count:
+            raise ValueError("The store has no vectors to quantize.")
+
+        if not self._quantizer.is_trained:
+            sample = np.arange(count)
+            if sample_size is not None and sample_size < count:
+                sample = np.sort(np.random.default_rng(seed).choice(count, sample_size, replace=False))
+            self._quantizer.train(self._normalized(sample))
+
+        codes = np.concatenate(
+            [
+                self._quantizer.encode(self._normalized(np.arange(start, min(start + 65536, count))))
+                for start in range(0, count, 65536)
+            ]
+        )
+        self._base_codes = codes[: self._base_count] if self._base_count else None
+        self._codes = np.empty((self._vectors.shape[0], codes.shape[1]), dtype=codes.dtype)
+        self._codes[: len(self._ids)] = codes[self._base_count :]
+        if self._vectors.shape[0] and not isinstance(self._vectors, np.memmap):
+            vectors = self._allocate(*self._vectors.shape)
+            vectors[: len(self._ids)] = self._vectors[: len(self._ids)]
+            self._vectors = vectors
+
+    def _allocate(self, capacity: int, dim: int) -> np.ndarray:
+        """
+        Allocates the delta matrix. Quantized stores read the vectors only to rescore the candidates, so they keep
+        the matrix in a memory-mapped temporary file, which the OS pages out instead of holding it resident.
+        """
+        if self._codes is None:
+            return np.empty((capacity, dim), dtype=np.float32)
+        with tempfile.TemporaryFile() as file:
+            return np.memmap(file, dtype=np.float32, mode="w+", shape=(capacity, dim))
+
+    def _normalized(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Returns the stored vectors of the given rows scaled to unit length.
+        """
+        vectors, norms = self._take(rows)
+        return vectors / np.where(norms > 0, norms, 1)[:, None]
+
+    def _get_metadata_index(self) -> MetadataIndex:
+        """
+        Returns the inverted metadata index, building it first if it was not built yet.
+        """
+        if self._metadata_index is None:
+            self._metadata_index = MetadataIndex()
+            self._metadata_index.add_many((entry_id, entry.metadata) for entry_id, entry in self._entries.items())
+        return self._metadata_index
+
+    def _reserve(self, size: int, dim: int) -> None:
+        """
+        Makes sure the delta matrix can hold `size` rows, growing its capacity geometrically.
+
+        Args:
+            size: The number of rows that has to fit into the matrix.
+            dim: The dimensionality of the vectors.
+
+        Raises:
+            ValueError: If the dimensionality does not match the vectors already in the store.
+        """
+        if self._dim() not in (0, dim) and (self._ids or self._base_count):
+            raise ValueError(f"Expected vectors of dimension {self._dim()}, got {dim}.")
+
+        capacity = self._vectors.shape[0]
+        if size <= capacity and self._vectors.shape[1] == dim:
+            return
+        self._resize(max(size, 2 * capacity, _MIN_CAPACITY), dim)
+
+    def _resize(self, capacity: int, dim: int) -> None:
+        """
+        Moves the delta rows to matrices of the given capacity.
+        """
+        count = len(self._ids)
+        vectors = self._allocate(capacity, dim)
+        norms = np.empty(capacity, dtype=np.float32)
+        if count:
+            vectors[:count] = self._vectors[:count]
+            norms[:count] = self._norms[:count]
+        self._vectors = vectors
+        self._norms = norms
+        if self._codes is not None:
+            codes = np.empty((capacity, self._codes.shape[1]), dtype=self._codes.dtype)
+            codes[:count] = self._codes[:count]
+            self._codes = codes
+
+    async def store(self, entries: list[VectorStoreEntry]) -> None:
+        """
+        Store entries in the vector store. Entries with already stored IDs are overwritten.
+
+        Args:
+            entries: The entries to store.
+        """
+        embeddings = await self._create_embeddings(entries)
+        if not embeddings:
+            return
+
+        self.generation += 1
+        ids = list(embeddings)
+        matrix = np.asarray([embeddings[entry_id] for entry_id in ids], dtype=np.float32)
+        self._reserve(len(self._ids) + len(ids), matrix.shape[1])
+        norms = np.linalg.norm(matrix, axis=1)
+        codes = None
+        if self._codes is not None and self._quantizer is not None:
+            codes = self._quantizer.encode(matrix / np.where(norms > 0, norms, 1)[:, None])
+
+        for index, (entry_id, vector, norm) in enumerate(zip(ids, matrix, norms, strict=True)):
+            row = self._rows.get(entry_id)
+            if row is None:
+                self._mask_base_row(entry_id)
+                row = len(self._ids)
+                self._ids.append(entry_id)
+                self._rows[entry_id] = row
+            self._vectors[row] = vector
+            self._norms[row] = norm
+            if codes is not None:
+                self._codes[row] = codes[index]  # type: ignore[index]
+
+        stored = {entry.id: entry for entry in entries if entry.id in embeddings}
+        self._tombstones.discard(stored)
+        self._entries.update(stored)
+        self._sorted_ids.add(stored)
+        if self._metadata_index is not None:
+            self._metadata_index.add_many((entry_id, entry.metadata) for entry_id, entry in stored.items())
+
+    def _mask_base_row(self, entry_id: UUID) -> bool:
+        """
+        Masks out the base row of the entry, if the base holds a live one.
+
+        Returns:
+            True if a row was masked, otherwise False.
+        """
+        if self._segment is None or (row := self._segment.row_of(entry_id)) is None:
+            return False
+        if self._base_dead is None:
+            self._base_dead = np.zeros(self._base_count, dtype=np.bool_)
+        elif self._base_dead[row]:
+            return False
+        self._base_dead[row] = True
+        self._base_dead_count += 1
+        return True
+
+    async def retreive(self, text: str, options: InMemoryVectorStoreOptions | None = None) -> list[VectorStoreResult]:
+        """
+        Retrieve entries from the vector store most similar to the provided text.
+
+        Args:
+            text: The text to query the vector store with.
+            options: The options for querying the vector store.
+
+        Returns:
+            The entries, sorted from the most to the least similar.
+        """
+        return (await self.retrieve_many([text], options))[0]
+
+    async def retrieve_many(
+        self, texts: list[str], options: InMemoryVectorStoreOptions | None = None
+    ) -> list[list[VectorStoreResult]]:
+        """
+        Retrieve entries most similar to each of the provided texts. All the texts are embedded in one call
+        and scored against the stored vectors with matrix-matrix products, in chunks of queries.
+
+        Args:
+            texts: The texts to query the vector store with.
+            options: The options for querying the vector store, shared by all the queries.
+
+        Returns:
+            The entries for every text, each sorted from the most to the least similar.
+        """
+        merged_options = (self.default_options | options) if options else self.default_options
+        if not texts or not len(self) or merged_options.k <= 0:
+            return [[] for _ in texts]
+
+        query_vectors = await self._embedder.embed_text(texts)
+        rows = None
+        if merged_options.where:
+            matching = self._get_metadata_index().match(merged_options.where)
+            rows = np.fromiter((self._row_of(entry_id) for entry_id in matching), dtype=np.intp, count=len(matching))
+
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        results = []
+        for selected, scores in self._search(queries, rows, merged_options):
+            results.append(
+                [
+                    project_result(
+                        self._id_at(row),
+                        float(score),
+                        merged_options.projection,
+                        entry=lambda row=row: self._entries[self._id_at(row)],
+                        vector=lambda row=row: self._take(np.array([row]))[0][0].tolist(),
+                    )
+                    for row, score in zip(selected.tolist(), scores, strict=True)
+                ]
+            )
+        return results
+
+    def _search(
+        self, queries: np.ndarray, rows: np.ndarray | None, options: InMemoryVectorStoreOptions
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        """
+        Finds the top-k rows for every query, over the full-precision vectors or over the codes if quantized.
+
+        Args:
+            queries: The query vectors, one per row.
+            rows: The rows to search. All the rows are searched if not provided.
+            options: The options of the query.
+
+        Returns:
+            The selected rows and their scores for every query, sorted by descending score.
+        """
+        # Removed entries leave the metadata index right away, so only the unfiltered searches see tombstones.
+        dead = None
+        if rows is None and (self._tombstones or self._base_dead_count):
+            delta_dead = np.fromiter((self._rows[entry_id] for entry_id in self._tombstones), dtype=np.intp)
+            base_dead = np.flatnonzero(self._base_dead) if self._base_dead_count else np.empty(0, dtype=np.intp)
+            dead = np.concatenate([base_dead, self._base_count + delta_dead])
+
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms > 0, norms, 1)
+        quantized = self._codes is not None and self._quantizer is not None
+        rescore = quantized and options.rescore_factor > 0
+        blocks = self._blocks(rows, quantized)
+        columns = sum(block.shape[0] for block, _ in blocks)
+
+        # Queries are scored in chunks, so the score matrix stays bounded however many queries are given.
+        chunk_size = max(1, _SCORE_CHUNK_ELEMENTS // max(columns, 1))
+        hits = []
+        for chunk_start in range(0, queries.shape[0], chunk_size):
+            chunk = queries[chunk_start : chunk_start + chunk_size]
+            scores = self._score(chunk, blocks, quantized)
+            if dead is not None:
+                scores[:, dead] = -np.inf
+            for index, query_scores in enumerate(scores):
+                if not rescore:
+                    top = top_k(query_scores, options.k, options.score_threshold)
+                    hits.append((top if rows is None else rows[top], query_scores[top]))
+                    continue
+
+                candidates = top_k(query_scores, options.k * options.rescore_factor)
+                # Sorted rows make the gather from a memory-mapped matrix sequential.
+                candidate_rows = np.sort(candidates if rows is None else rows[candidates])
+                exact = self._score(chunk[index : index + 1], self._blocks(candidate_rows, False), False)[0]
+                top = top_k(exact, options.k, options.score_threshold)
+                hits.append((candidate_rows[top], exact[top]))
+        return hits
+
+    def _blocks(self, rows: np.ndarray | None, quantized: bool) -> list[tuple[np.ndarray, np.ndarray | None]]:
+        """
+        Returns the consecutive blocks of the scored columns: the base and the delta rows if all the rows are
+        scored, so neither is copied, otherwise the gathered rows.
+
+        Args:
+            rows: The rows to score. All the rows are scored if not provided.
+            quantized: Whether to return the codes instead of the vectors.
+
+        Returns:
+            The vectors and their norms, or the codes and None, of every block.
+        """
+        count = len(self._ids)
+        if quantized:
+            if rows is not None:
+                return [(self._take_codes(rows), None)]
+            delta = self._codes[:count]  # type: ignore[index]
+            return [(codes, None) for codes in (self._base_codes, delta) if codes is not None and len(codes)]
+
+        if rows is not None:
+            return [self._take(rows)]
+        blocks = []
+        if self._segment is not None and self._base_count:
+            blocks.append((self._segment.vectors, self._segment.norms))
+        if count:
+            blocks.append((self._vectors[:count], self._norms[:count]))
+        return blocks
+
+    def _score(
+        self, queries: np.ndarray, blocks: list[tuple[np.ndarray, np.ndarray | None]], quantized: bool
+    ) -> np.ndarray:
+        """
+        Computes the cosine similarity between every query and the vectors of the blocks, or its approximation
+        over the codes. The products are written into a single matrix and divided by the norms in place.
+
+        Args:
+            queries: The unit-length query vectors, one per row.
+            blocks: The blocks of the scored columns, see `_blocks`.
+            quantized: Whether the blocks hold codes.
+
+        Returns:
+            The similarity matrix with one row per query and one column per scored vector, in the order of the blocks.
+        """
+        scores = np.empty((queries.shape[0], sum(block.shape[0] for block, _ in blocks)), dtype=np.float32)
+        start = 0
+        for block, norms in blocks:
+            columns = scores[:, start : start + block.shape[0]]
+            if quantized:
+                columns[:] = self._quantizer.score(queries, block)  # type: ignore[union-attr]
+            else:
+                np.matmul(queries, block.T, out=columns)
+                # Zero vectors have zero products, which are kept as their scores.
+                np.divide(columns, norms, out=columns, where=norms > 0)
+            start += block.shape[0]
+        return scores
+
+    async def remove(self, ids: list[UUID]) -> None:
+        """
+        Remove entries from the vector store. The entries disappear from the results right away, while their rows
+        stay in the matrix as tombstones until the background compaction removes them, see `CompactionPolicy`.
+
+        Args:
+            ids: The list of entries' IDs to remove.
+        """
+        self.generation += 1
+        removed = [entry_id for entry_id in ids if entry_id in self._rows and entry_id not in self._tombstones]
+        masked = [entry_id for entry_id in ids if entry_id not in self._rows and self._mask_base_row(entry_id)]
+        for entry_id in removed + masked:
+            del self._entries[entry_id]
+            if self._metadata_index is not None:
+                self._metadata_index.remove(entry_id)
+        self._sorted_ids.remove(removed)
+        self._tombstones.add(removed, total=len(self._ids))
+
+    def _purge(self, entry_id: UUID) -> None:
+        """
+        Removes the row of the entry from the delta matrix, moving the last row into the freed slot,
+        so the matrix stays contiguous. The capacity is halved once a quarter of it is used, which frees
+        the memory of the removed rows in amortized constant time.
+        """
+        row = self._rows.pop(entry_id, None)
+        if row is None:
+            return
+
+        last = len(self._ids) - 1
+        last_id = self._ids.pop()
+        if row != last:
+            self._vectors[row] = self._vectors[last]
+            self._norms[row] = self._norms[last]
+            if self._codes is not None:
+                self._codes[row] = self._codes[last]
+            self._ids[row] = last_id
+            self._rows[last_id] = row
+
+        capacity = self._vectors.shape[0]
+        if capacity > _MIN_CAPACITY and len(self._ids) < capacity // 4:
+            self._resize(max(capacity // 2, _MIN_CAPACITY), self._vectors.shape[1])
+
+    async def list_page(
+        self, where: WHEREQUERY | None = None, limit: int = 100, cursor: str | None = None
+    ) -> EntryPage:
+        """
+        List a page of entries in ascending ID order, continuing right after the cursor. The cursor is found
+        with a binary search over the sorted IDs, so the pages deep into the store are as fast as the first one.
+
+        Args:
+            where: The filter dictionary - the keys are the field names and the values are the values to filter by.
+                Not specifying the key means no filtering.
+            limit: The maximum number of entries of the page.
+            cursor: The `next_cursor` of the previous page, or None to start from the beginning.
+
+        Returns:
+            The page of entries with the cursor of the next page.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        ids = self._ids_after(decode_cursor(cursor))
+        if where:
+            where_filter, metadata_index = compile_where(where), self._get_metadata_index()
+            ids = (entry_id for entry_id in ids if metadata_index.matches(entry_id, where_filter))
+        return build_page(ids, limit, self._entries.__getitem__)
+
+    def _ids_after(self, entry_id: UUID | None) -> Iterator[UUID]:
+        """
+        Iterates over the IDs greater than the given one in ascending order, merging the sorted IDs of the base
+        with the ones of the delta. The overwritten base rows are masked, so every ID is listed once.
+        """
+        ids = self._sorted_ids.after(entry_id)
+        if self._segment is None:
+            return ids
+        segment, dead = self._segment, self._base_dead
+        base = (
+            segment.id_at(row) for row in segment.rows_after(entry_id) if dead is None or not dead[row]
+        )
+        return heapq.merge(base, ids)
+
+    async def list(
+        self, where: WHEREQUERY | None = None, limit: int | None = None, offset: int = 0
+    ) -> list[VectorStoreEntry]:
+        """
+        List entries from the vector store. The entries can be filtered, limited and offset.
+
+        Args:
+            where: The filter dictionary - the keys are the field names and the values are the values to filter by.
+                Not specifying the key means no filtering.
+            limit: The maximum number of entries to return.
+            offset: The number of entries to skip.
+
+        Returns:
+            The entries.
+        """
+        entries: Iterator[VectorStoreEntry] = iter(self._entries.values())
+        if where:
+            entries = (self._entries[entry_id] for entry_id in self._get_metadata_index().match(where))
+
+        stop = offset + limit if limit is not None else None
+        return list(islice(entries, offset, stop))
+
@@ -0,0 +1,146 @@
+import heapq
+from bisect import bisect_right
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+if TYPE_CHECKING:
+    from fetchbits.core.vector_stores.base import VectorStoreEntry
+
+
+@dataclass
+class EntryPage:
+    """
+    A page of entries listed in ascending ID order, with the cursor to continue from.
+    """
+
+    entries: "list[VectorStoreEntry]" = field(default_factory=list)
+    next_cursor: str | None = None
+    """The cursor of the next page, None if this is the last one."""
+
+
+def encode_cursor(entry_id: UUID) -> str:
+    """
+    Builds the opaque continuation token pointing right after the given entry.
+
+    Args:
+        entry_id: The ID of the last entry of a page.
+
+    Returns:
+        The cursor.
+    """
+    return entry_id.hex
+
+
+def decode_cursor(cursor: str | None) -> UUID | None:
+    """
+    Reads the ID of the last listed entry from a continuation token.
+
+    Args:
+        cursor: The cursor returned with the previous page, or None to start from the beginning.
+
+    Returns:
+        The ID of the last listed entry, or None to start from the beginning.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    if cursor is None:
+        return None
+    try:
+        return UUID(hex=cursor)
+    except ValueError as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def build_page(ids: Iterator[UUID], limit: int, fetch: Callable[[UUID], "VectorStoreEntry"]) -> EntryPage:
+    """
+    Takes up to `limit` IDs and fetches their entries. One more ID is peeked, so the last page has no cursor.
+
+    Args:
+        ids: The IDs of the matching entries after the cursor, in ascending order.
+        limit: The maximal number of entries of the page.
+        fetch: Returns the entry with the given ID.
+
+    Returns:
+        The page.
+    """
+    selected = list(islice(ids, limit + 1))
+    next_cursor = encode_cursor(selected[limit - 1]) if len(selected) > limit > 0 else None
+    return EntryPage(entries=[fetch(entry_id) for entry_id in selected[:limit]], next_cursor=next_cursor)
+
+
+class SortedIds:
+    """
+    The IDs of the entries of a store in ascending order, for keyset pagination. Additions and removals
+    are buffered and merged in linear time on the next read, instead of re-sorting all the IDs.
+    """
+
+    def __init__(self, ids: Iterable[UUID] = ()) -> None:
+        """
+        Constructs a new SortedIds instance.
+
+        Args:
+            ids: The initial IDs, in any order.
+        """
+        self._sorted: list[UUID] = sorted(ids)
+        self._added: set[UUID] = set()
+        self._removed: set[UUID] = set()
+
+    def __len__(self) -> int:
+        self._merge()
+        return len(self._sorted)
+
+    def add(self, ids: Iterable[UUID]) -> None:
+        """
+        Adds the IDs. Already present IDs are ignored.
+
+        Args:
+            ids: The IDs to add.
+        """
+        for entry_id in ids:
+            self._removed.discard(entry_id)
+            self._added.add(entry_id)
+
+    def remove(self, ids: Iterable[UUID]) -> None:
+        """
+        Removes the IDs. Unknown IDs are ignored.
+
+        Args:
+            ids: The IDs to remove.
+        """
+        for entry_id in ids:
+            self._added.discard(entry_id)
+            self._removed.add(entry_id)
+
+    def _merge(self) -> None:
+        if not self._added and not self._removed:
+            return
+
+        kept: Iterable[UUID] = self._sorted
+        if self._removed:
+            kept = (entry_id for entry_id in self._sorted if entry_id not in self._removed)
+        merged: list[UUID] = []
+        for entry_id in heapq.merge(kept, sorted(self._added)):
+            if not merged or merged[-1] != entry_id:
+                merged.append(entry_id)
+        self._sorted = merged
+        self._added.clear()
+        self._removed.clear()
+
+    def after(self, entry_id: UUID | None = None) -> Iterator[UUID]:
+        """
+        Iterates over the IDs greater than the given one, found with a binary search.
+
+        Args:
+            entry_id: The last already listed ID, or None to start from the smallest ID.
+
+        Returns:
+            The iterator over the IDs, in ascending order.
+        """
+        self._merge()
+        ids = self._sorted
+        start = 0 if entry_id is None else bisect_right(ids, entry_id)
+        return (ids[position] for position in range(start, len(ids)))
@@ -0,0 +1,272 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+# Number of rows decoded or looked up at once, bounding the temporary memory of scoring.
+_CHUNK_SIZE = 4096
+
+
+class Quantizer(ABC):
+    """
+    Base class for vector quantizers, compressing float32 vectors to compact codes and scoring
+    full-precision queries against the codes directly (asymmetric distance computation).
+    """
+
+    @property
+    @abstractmethod
+    def is_trained(self) -> bool:
+        """
+        Whether the quantizer is trained and able to encode vectors.
+        """
+
+    @abstractmethod
+    def train(self, vectors: np.ndarray) -> None:
+        """
+        Fits the quantizer parameters to the vectors.
+
+        Args:
+            vectors: The training vectors, one per row.
+        """
+
+    @abstractmethod
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Compresses the vectors.
+
+        Args:
+            vectors: The vectors to encode, one per row.
+
+        Returns:
+            The codes, one row per vector.
+        """
+
+    @abstractmethod
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Reconstructs approximate vectors from the codes.
+
+        Args:
+            codes: The codes, one row per vector.
+
+        Returns:
+            The reconstructed float32 vectors.
+        """
+
+    @abstractmethod
+    def get_state(self) -> dict[str, np.ndarray]:
+        """
+        Returns the trained parameters of the quantizer, so it can be saved along with its codes.
+
+        Returns:
+            The parameters by name.
+        """
+
+    @abstractmethod
+    def set_state(self, state: dict[str, np.ndarray]) -> None:
+        """
+        Restores the trained parameters returned by `get_state`.
+
+        Args:
+            state: The parameters by name.
+        """
+
+    @abstractmethod
+    def score(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """
+        Approximates the inner products between the full-precision queries and the encoded vectors.
+
+        Args:
+            queries: The query vectors, one per row.
+            codes: The codes of the vectors, one per row.
+
+        Returns:
+            The approximate inner product matrix with one row per query and one column per code.
+        """
+
+
+class ScalarQuantizer(Quantizer):
+    """
+    Quantizer mapping every dimension linearly onto the 256 values of an int8, using the per-dimension
+    minimum and maximum seen during training. Codes take 4 times less memory than float32 vectors.
+    """
+
+    def __init__(self) -> None:
+        self._low: np.ndarray | None = None
+        self._step: np.ndarray | None = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self._low is not None
+
+    def train(self, vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self._low = vectors.min(axis=0)
+        high = vectors.max(axis=0)
+        self._step = np.maximum(high - self._low, np.finfo(np.float32).eps) / 255
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        if self._low is None or self._step is None:
+            raise ValueError("The quantizer has to be trained before encoding.")
+        levels = np.rint((np.asarray(vectors, dtype=np.float32) - self._low) / self._step)
+        return (np.clip(levels, 0, 255) - 128).astype(np.int8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        if self._low is None or self._step is None:
+            raise ValueError("The quantizer has to be trained before decoding.")
+        return self._low + (codes.astype(np.float32) + 128) * self._step
+
+    def get_state(self) -> dict[str, np.ndarray]:
+        if self._low is None or self._step is None:
+            raise ValueError("The quantizer has to be trained before saving.")
+        return {"low": self._low, "step": self._step}
+
+    def set_state(self, state: dict[str, np.ndarray]) -> None:
+        self._low = np.asarray(state["low"], dtype=np.float32)
+        self._step = np.asarray(state["step"], dtype=np.float32)
+
+    def score(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        if self._low is None or self._step is None:
+            raise ValueError("The quantizer has to be trained before scoring.")
+
+        # q . x = q . (low + 128 * step) + (q * step) . code
+        offsets = queries @ (self._low + 128 * self._step)
+        weights = (queries * self._step).T
+        scores = np.empty((queries.shape[0], codes.shape[0]), dtype=np.float32)
+        for start in range(0, codes.shape[0], _CHUNK_SIZE):
+            chunk = codes[start : start + _CHUNK_SIZE].astype(np.float32)
+            scores[:, start : start + _CHUNK_SIZE] = (chunk @ weights).T
+        scores += offsets[:, None]
+        return scores
+
+
+class ProductQuantizer(Quantizer):
+    """
+    Quantizer splitting vectors into `subspaces` equal chunks and replacing every chunk with the index of its
+    nearest centroid in a codebook trained with k-means. Every vector takes `subspaces` bytes.
+
+    See: Jégou et al., "Product quantization for nearest neighbor search".
+    """
+
+    def __init__(self, subspaces: int = 8, centroids: int = 256, iterations: int = 20, seed: int | None = None) -> None:
+        """
+        Constructs a new ProductQuantizer instance.
+
+        Args:
+            subspaces: The number of chunks every vector is split into. It has to divide the dimensionality.
+            centroids: The number of centroids of every codebook, at most 256 so the codes fit in a byte.
+            iterations: The number of k-means iterations.
+            seed: The seed of the random generator initializing the centroids.
+        """
+        if not 1 <= centroids <= 256:  # noqa: PLR2004
+            raise ValueError("The number of centroids has to be between 1 and 256.")
+
+        self.subspaces = subspaces
+        self.centroids = centroids
+        self.iterations = iterations
+        self._random = np.random.default_rng(seed)
+        self._codebooks: np.ndarray | None = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self._codebooks is not None
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Reshapes the vectors to (subspace, vector, chunk).
+        """
+        if vectors.shape[1] % self.subspaces:
+            raise ValueError(f"The dimensionality {vectors.shape[1]} is not divisible by {self.subspaces} subspaces.")
+        return np.asarray(vectors, dtype=np.float32).reshape(vectors.shape[0], self.subspaces, -1).transpose(1, 0, 2)
+
+    @staticmethod
+    def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """
+        Finds the nearest centroid of every vector in the Euclidean distance.
+        """
+        centroid_norms = (centroids**2).sum(axis=1)
+        nearest = np.empty(vectors.shape[0], dtype=np.intp)
+        for start in range(0, vectors.shape[0], _CHUNK_SIZE):
+            chunk = vectors[start : start + _CHUNK_SIZE]
+            nearest[start : start + _CHUNK_SIZE] = np.argmin(centroid_norms - 2 * chunk @ centroids.T, axis=1)
+        return nearest
+
+    def _kmeans(self, vectors: np.ndarray) -> np.ndarray:
+        clusters = min(self.centroids, vectors.shape[0])
+        centroids = vectors[self._random.choice(vectors.shape[0], clusters, replace=False)].copy()
+        for _ in range(self.iterations):
+            assignment = self._nearest(vectors, centroids)
+            counts = np.bincount(assignment, minlength=clusters)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, vectors)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+            # Empty clusters are moved onto random vectors instead of being wasted.
+            empty = int((~filled).sum())
+            if empty:
+                centroids[~filled] = vectors[self._random.choice(vectors.shape[0], empty)]
+
+        if clusters < self.centroids:
+            centroids = np.concatenate([centroids, np.repeat(centroids[:1], self.centroids - clusters, axis=0)])
+        return centroids
+
+    def train(self, vectors: np.ndarray) -> None:
+        self._codebooks = np.stack([self._kmeans(chunks) for chunks in self._split(vectors)])
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        if self._codebooks is None:
+            raise ValueError("The quantizer has to be trained before encoding.")
+        chunks = self._split(vectors)
+        return np.stack(
+            [self._nearest(chunks[index], codebook) for index, codebook in enumerate(self._codebooks)], axis=1
+        ).astype(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        if self._codebooks is None:
+            raise ValueError("The quantizer has to be trained before decoding.")
+        subspaces = np.arange(self.subspaces)
+        return self._codebooks[subspaces, codes].reshape(codes.shape[0], -1)
+
+    def get_state(self) -> dict[str, np.ndarray]:
+        if self._codebooks is None:
+            raise ValueError("The quantizer has to be trained before saving.")
+        return {"codebooks": self._codebooks}
+
+    def set_state(self, state: dict[str, np.ndarray]) -> None:
+        self._codebooks = np.asarray(state["codebooks"], dtype=np.float32)
+        self.subspaces, self.centroids = self._codebooks.shape[:2]
+
+    def score(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        if self._codebooks is None:
+            raise ValueError("The quantizer has to be trained before scoring.")
+
+        # Lookup tables of the inner products between every query chunk and every centroid: (query, subspace, centroid)
+        tables = np.einsum("sqd,scd->qsc", self._split(queries), self._codebooks)
+        subspaces = np.arange(self.subspaces)
+        scores = np.empty((queries.shape[0], codes.shape[0]), dtype=np.float32)
+        for start in range(0, codes.shape[0], _CHUNK_SIZE):
+            chunk = codes[start : start + _CHUNK_SIZE]
+            for query, table in enumerate(tables):
+                scores[query, start : start + _CHUNK_SIZE] = table[subspaces, chunk].sum(axis=1)
+        return scores
+
+
+def load_quantizer(name: str, state: dict[str, np.ndarray]) -> Quantizer:
+    """
+    Constructs a trained quantizer from the parameters saved with `Quantizer.get_state`.
+
+    Args:
+        name: The class name of the quantizer.
+        state: The parameters by name.
+
+    Returns:
+        The quantizer.
+
+    Raises:
+        ValueError: If the quantizer class is unknown.
+    """
+    quantizers: dict[str, type[Quantizer]] = {"ScalarQuantizer": ScalarQuantizer, "ProductQuantizer": ProductQuantizer}
+    if name not in quantizers:
+        raise ValueError(f"Unknown quantizer: {name}")
+    quantizer = quantizers[name]()
+    quantizer.set_state(state)
+    return quantizer
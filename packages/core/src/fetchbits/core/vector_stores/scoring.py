@@ -0,0 +1,25 @@
+import numpy as np
+
+
+def top_k(scores: np.ndarray, k: int, score_threshold: float | None = None) -> np.ndarray:
+    """
+    Selects the rows with the `k` highest scores without sorting the whole score array.
+
+    Args:
+        scores: The score of every row.
+        k: The number of rows to select.
+        score_threshold: The minimal score of the selected rows.
+
+    Returns:
+        The selected rows, sorted by descending score. Rows with non-finite scores are never selected.
+    """
+    if k < scores.shape[0]:
+        rows = np.argpartition(-scores, k - 1)[:k]
+    else:
+        rows = np.arange(scores.shape[0])
+
+    rows = rows[np.argsort(-scores[rows], kind="stable")]
+    rows = rows[np.isfinite(scores[rows])]
+    if score_threshold is not None:
+        rows = rows[scores[rows] >= score_threshold]
+    return rows
@@ -0,0 +1,283 @@
+import json
+import mmap
+import os
+import shutil
+import tempfile
+from collections.abc import Iterator, MutableMapping
+from pathlib import Path
+from uuid import UUID
+
+import numpy as np
+
+from fetchbits.core.vector_stores.base import VectorStoreEntry
+from fetchbits.core.vector_stores.quantization import Quantizer, load_quantizer
+from fetchbits.core.vector_stores.serialization import decode_entry, encode_entry
+
+SEGMENT_FORMAT_VERSION = 1
+
+
+class VectorSegment:
+    """
+    Immutable on-disk segment of a vector store, opened through memory maps without deserializing anything.
+
+    A segment is a directory with the following files:
+        - `header.json`: the format version, the number of rows and the dimensionality of the vectors.
+        - `vectors.f32`: the raw row-major float32 vector matrix.
+        - `norms.f32`: the precomputed L2 norm of every vector.
+        - `ids.bin`: the 16-byte entry IDs, one per row. Rows are sorted by ID, so lookups are binary searches.
+        - `offsets.i64`: `rows + 1` offsets of the rows' records in the entries blob.
+        - `entries.bin`: the concatenated binary records of the entries (text, raw image and metadata),
+          see `fetchbits.core.vector_stores.serialization`.
+        - `codes.bin` and `quantizer.npz`: the codes of the rows and the trained parameters of the quantizer that
+          encoded them, written for quantized stores only. The header names the quantizer and the shape of its codes.
+
+    The files are mapped read-only, so opening a segment takes constant time and worker processes opening
+    the same segment share its pages through the OS page cache.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Opens the segment stored in the given directory.
+
+        Args:
+            path: The directory of the segment.
+
+        Raises:
+            ValueError: If the segment was written in an unsupported format version.
+        """
+        self.path = Path(path)
+        header = json.loads((self.path / "header.json").read_text())
+        if header["version"] != SEGMENT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported segment format version: {header['version']}")
+
+        self.count: int = header["count"]
+        self.dim: int = header["dim"]
+        self.vectors = self._map("vectors.f32", np.float32, (self.count, self.dim))
+        self.norms = self._map("norms.f32", np.float32, (self.count,))
+        self.ids = self._map("ids.bin", np.dtype("S16"), (self.count,))
+        self.offsets = self._map("offsets.i64", np.int64, (self.count + 1,))
+        self.codes: np.ndarray | None = None
+        self.quantizer: Quantizer | None = None
+        if quantization := header.get("quantizer"):
+            self.codes = self._map("codes.bin", np.dtype(quantization["dtype"]), (self.count, quantization["size"]))
+            with np.load(self.path / "quantizer.npz") as state:
+                self.quantizer = load_quantizer(quantization["type"], dict(state))
+        self._blob: mmap.mmap | bytes = b""
+        if self.offsets[-1] > 0:
+            with open(self.path / "entries.bin", "rb") as file:
+                self._blob = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _map(self, name: str, dtype: np.dtype | type, shape: tuple[int, ...]) -> np.ndarray:
+        if not all(shape):
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self.path / name, dtype=dtype, mode="r", shape=shape)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def id_at(self, row: int) -> UUID:
+        """
+        Returns the ID of the entry stored in the given row.
+
+        Args:
+            row: The row number.
+
+        Returns:
+            The entry ID.
+        """
+        return UUID(bytes=self.ids[row].ljust(16, b"\x00"))
+
+    def row_of(self, entry_id: UUID) -> int | None:
+        """
+        Finds the row of the entry with a binary search over the sorted ID table.
+
+        Args:
+            entry_id: The entry ID.
+
+        Returns:
+            The row number, or None if the segment does not contain the entry.
+        """
+        key = np.array(entry_id.bytes, dtype="S16")
+        row = int(np.searchsorted(self.ids, key))
+        if row < self.count and self.ids[row] == key:
+            return row
+        return None
+
+    def rows_after(self, entry_id: UUID | None = None) -> range:
+        """
+        Finds the rows of the entries with IDs greater than the given one, with a binary search.
+
+        Args:
+            entry_id: The last already listed ID, or None to start from the smallest ID.
+
+        Returns:
+            The rows, in ascending ID order.
+        """
+        if entry_id is None:
+            return range(self.count)
+        return range(int(np.searchsorted(self.ids, np.array(entry_id.bytes, dtype="S16"), side="right")), self.count)
+
+    def entry(self, row: int) -> VectorStoreEntry:
+        """
+        Decodes the entry stored in the given row.
+
+        Args:
+            row: The row number.
+
+        Returns:
+            The entry.
+        """
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        with memoryview(self._blob) as blob:
+            return decode_entry(blob[start:end])
+
+    def close(self) -> None:
+        """
+        Releases the memory map of the entries blob. The vector maps are released once no array references them.
+        """
+        if isinstance(self._blob, mmap.mmap):
+            self._blob.close()
+
+    @classmethod
+    def write(
+        cls,
+        path: str | Path,
+        entries: list[VectorStoreEntry],
+        vectors: np.ndarray,
+        codes: np.ndarray | None = None,
+        quantizer: Quantizer | None = None,
+    ) -> "VectorSegment":
+        """
+        Writes the entries and their vectors as a new segment and opens it. The segment is written to a staging
+        directory next to the target one and moved into place once complete, so an existing segment at the path is
+        replaced as a whole and a failed write leaves it untouched.
+
+        Args:
+            path: The directory to write the segment to. Its parent is created if it does not exist.
+            entries: The entries to write.
+            vectors: The vectors of the entries, one row per entry.
+            codes: The codes of the vectors, one row per entry, saved along with the quantizer.
+            quantizer: The trained quantizer that encoded the codes.
+
+        Returns:
+            The opened segment.
+
+        Raises:
+            ValueError: If the number of entries and vectors or codes differ, or only one of codes and quantizer
+                is given.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[0] != len(entries):  # noqa: PLR2004
+            raise ValueError(f"Expected a matrix of {len(entries)} vectors, got an array of shape {vectors.shape}.")
+        if (codes is None) != (quantizer is None):
+            raise ValueError("The codes have to be saved along with their quantizer.")
+        if codes is not None and (codes.ndim != 2 or codes.shape[0] != len(entries)):  # noqa: PLR2004
+            raise ValueError(f"Expected a matrix of {len(entries)} codes, got an array of shape {codes.shape}.")
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{path.name}.", dir=path.parent))
+        try:
+            cls._write_files(staging, entries, vectors, codes, quantizer)
+            cls._replace(staging, path)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return cls(path)
+
+    @staticmethod
+    def _write_files(
+        path: Path,
+        entries: list[VectorStoreEntry],
+        vectors: np.ndarray,
+        codes: np.ndarray | None,
+        quantizer: Quantizer | None,
+    ) -> None:
+        ids = np.array([entry.id.bytes for entry in entries], dtype="S16")
+        order = np.argsort(ids, kind="stable")
+        vectors = vectors[order]
+        records = [encode_entry(entries[row]) for row in order]
+
+        offsets = np.zeros(len(records) + 1, dtype=np.int64)
+        np.cumsum([len(record) for record in records], out=offsets[1:])
+
+        vectors.tofile(path / "vectors.f32")
+        np.linalg.norm(vectors, axis=1).astype(np.float32).tofile(path / "norms.f32")
+        ids[order].tofile(path / "ids.bin")
+        offsets.tofile(path / "offsets.i64")
+        with open(path / "entries.bin", "wb") as file:
+            file.writelines(records)
+
+        header: dict = {"version": SEGMENT_FORMAT_VERSION, "count": len(entries), "dim": int(vectors.shape[1])}
+        if codes is not None and quantizer is not None:
+            codes[order].tofile(path / "codes.bin")
+            np.savez(path / "quantizer.npz", **quantizer.get_state())
+            header["quantizer"] = {"type": type(quantizer).__name__, "dtype": codes.dtype.str, "size": codes.shape[1]}
+
+        # The header is written last, so a half-written segment cannot be opened.
+        (path / "header.json").write_text(json.dumps(header))
+
+    @staticmethod
+    def _replace(staging: Path, path: Path) -> None:
+        """
+        Moves the staged segment to the path. A directory cannot be renamed over a non-empty one, so an existing
+        segment is moved aside first and deleted once the new one is in place. Segments opened from the old
+        directory keep working, their memory maps outlive the deleted files.
+        """
+        if not path.exists():
+            os.replace(staging, path)
+            return
+
+        backup = staging.with_name(f"{staging.name}.old")
+        os.replace(path, backup)
+        try:
+            os.replace(staging, path)
+        except BaseException:
+            os.replace(backup, path)
+            raise
+        shutil.rmtree(backup, ignore_errors=True)
+
+
+class SegmentEntries(MutableMapping[UUID, VectorStoreEntry]):
+    """
+    Mapping of entry IDs to entries, decoding entries from a segment lazily on access.
+    Modifications are kept in memory and shadow the segment, which is never written to.
+    """
+
+    def __init__(self, segment: VectorSegment) -> None:
+        self._segment = segment
+        self._overrides: dict[UUID, VectorStoreEntry] = {}
+        self._hidden: set[UUID] = set()
+
+    def _in_segment(self, entry_id: UUID) -> bool:
+        return self._segment.row_of(entry_id) is not None
+
+    def __getitem__(self, entry_id: UUID) -> VectorStoreEntry:
+        if entry_id in self._overrides:
+            return self._overrides[entry_id]
+        if entry_id not in self._hidden and (row := self._segment.row_of(entry_id)) is not None:
+            return self._segment.entry(row)
+        raise KeyError(entry_id)
+
+    def __setitem__(self, entry_id: UUID, entry: VectorStoreEntry) -> None:
+        if self._in_segment(entry_id):
+            self._hidden.add(entry_id)
+        self._overrides[entry_id] = entry
+
+    def __delitem__(self, entry_id: UUID) -> None:
+        if entry_id in self._overrides:
+            del self._overrides[entry_id]
+        elif entry_id not in self._hidden and self._in_segment(entry_id):
+            self._hidden.add(entry_id)
+        else:
+            raise KeyError(entry_id)
+
+    def __iter__(self) -> Iterator[UUID]:
+        for row in range(len(self._segment)):
+            entry_id = self._segment.id_at(row)
+            if entry_id not in self._hidden:
+                yield entry_id
+        yield from self._overrides
+
+    def __len__(self) -> int:
+        return len(self._segment) - len(self._hidden) + len(self._overrides)
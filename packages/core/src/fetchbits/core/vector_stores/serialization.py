@@ -0,0 +1,214 @@
+import struct
+from uuid import UUID
+
+import numpy as np
+from pydantic_core import from_json, to_json
+
+from fetchbits.core.embeddings import SparseVector
+from fetchbits.core.vector_stores.base import VectorStoreEntry, VectorStoreResult
+
+# Batches start with the magic number, the format version, the record kind and the number of records.
+_MAGIC = b"FBVS"
+_FORMAT_VERSION = 1
+_BATCH_HEADER = struct.Struct("<4sBcI")
+_ENTRIES_KIND = b"E"
+_RESULTS_KIND = b"R"
+
+# Entry record: ID, presence flags, then the lengths of the UTF-8 text, the raw image and the JSON metadata.
+_ENTRY_HEADER = struct.Struct("<16sBIII")
+_HAS_TEXT = 1
+_HAS_IMAGE = 2
+
+# Result record (after its entry record): score, vector kind and vector length.
+_RESULT_HEADER = struct.Struct("<dBI")
+_DENSE = 0
+_SPARSE = 1
+_NO_VECTOR = 2
+_COUNT = struct.Struct("<I")
+
+
+def _write_entry(parts: list[bytes | memoryview], entry: VectorStoreEntry) -> None:
+    text = entry.text.encode() if entry.text is not None else b""
+    image = memoryview(entry.image_bytes) if entry.image_bytes is not None else memoryview(b"")
+    metadata = to_json(entry.metadata) if entry.metadata else b""
+    flags = (_HAS_TEXT if entry.text is not None else 0) | (_HAS_IMAGE if entry.image_bytes is not None else 0)
+    parts.append(_ENTRY_HEADER.pack(entry.id.bytes, flags, len(text), len(image), len(metadata)))
+    parts.extend((text, image, metadata))
+
+
+def _write_result(parts: list[bytes | memoryview], result: VectorStoreResult) -> None:
+    _write_entry(parts, result.entry)
+    if isinstance(result.vector, SparseVector):
+        parts.append(_RESULT_HEADER.pack(result.score, _SPARSE, len(result.vector.indices)))
+        parts.append(np.asarray(result.vector.indices, dtype="<u4").tobytes())
+        parts.append(np.asarray(result.vector.values, dtype="<f4").tobytes())
+    elif result.vector is None:
+        parts.append(_RESULT_HEADER.pack(result.score, _NO_VECTOR, 0))
+    else:
+        parts.append(_RESULT_HEADER.pack(result.score, _DENSE, len(result.vector)))
+        parts.append(np.asarray(result.vector, dtype="<f4").tobytes())
+    parts.append(_COUNT.pack(len(result.subresults)))
+    for subresult in result.subresults:
+        _write_result(parts, subresult)
+
+
+class _Reader:
+    """
+    Sequential reader of a binary buffer, slicing it without copying.
+    """
+
+    def __init__(self, buffer: bytes | bytearray | memoryview, zero_copy: bool) -> None:
+        self.view = memoryview(buffer).cast("B")
+        self.position = 0
+        self.zero_copy = zero_copy
+
+    def unpack(self, layout: struct.Struct) -> tuple:
+        try:
+            values = layout.unpack_from(self.view, self.position)
+        except struct.error as e:
+            raise ValueError("Truncated buffer.") from e
+        self.position += layout.size
+        return values
+
+    def take(self, size: int) -> memoryview:
+        if self.position + size > len(self.view):
+            raise ValueError("Truncated buffer.")
+        chunk = self.view[self.position : self.position + size]
+        self.position += size
+        return chunk
+
+    def array(self, dtype: str, count: int) -> np.ndarray:
+        return np.frombuffer(self.take(count * np.dtype(dtype).itemsize), dtype=dtype)
+
+    def entry(self) -> VectorStoreEntry:
+        entry_id, flags, text_size, image_size, metadata_size = self.unpack(_ENTRY_HEADER)
+        text = str(self.take(text_size), "utf-8") if flags & _HAS_TEXT else None
+        image: bytes | memoryview | None = self.take(image_size) if flags & _HAS_IMAGE else None
+        if image is not None and not self.zero_copy:
+            image = bytes(image)
+        metadata = from_json(bytes(self.take(metadata_size))) if metadata_size else {}
+        # The records were validated when they were encoded, so the validators are not run again.
+        return VectorStoreEntry.model_construct(
+            id=UUID(bytes=entry_id), text=text, image_bytes=image, metadata=metadata
+        )
+
+    def result(self) -> VectorStoreResult:
+        entry = self.entry()
+        score, kind, size = self.unpack(_RESULT_HEADER)
+        vector: list[float] | SparseVector | None = None
+        if kind == _SPARSE:
+            indices = self.array("<u4", size).tolist()
+            vector = SparseVector(indices=indices, values=self.array("<f4", size).tolist())
+        elif kind == _DENSE:
+            vector = self.array("<f4", size).tolist()
+        elif kind != _NO_VECTOR:
+            raise ValueError(f"Unknown vector kind: {kind}")
+        (count,) = self.unpack(_COUNT)
+        subresults = [self.result() for _ in range(count)]
+        return VectorStoreResult.model_construct(entry=entry, vector=vector, score=score, subresults=subresults)
+
+    def batch(self, kind: bytes) -> int:
+        magic, version, batch_kind, count = self.unpack(_BATCH_HEADER)
+        if magic != _MAGIC or version != _FORMAT_VERSION or batch_kind != kind:
+            raise ValueError("The buffer is not a supported batch of the expected kind.")
+        return count
+
+
+def encode_entry(entry: VectorStoreEntry) -> bytes:
+    """
+    Encodes a single entry into its binary record. Image bytes are written raw, without any text encoding.
+
+    Args:
+        entry: The entry to encode.
+
+    Returns:
+        The binary record.
+    """
+    parts: list[bytes | memoryview] = []
+    _write_entry(parts, entry)
+    return b"".join(parts)
+
+
+def decode_entry(buffer: bytes | bytearray | memoryview, zero_copy: bool = False) -> VectorStoreEntry:
+    """
+    Decodes a single entry from its binary record.
+
+    Args:
+        buffer: The binary record, see `encode_entry`.
+        zero_copy: Whether to keep the image as a `memoryview` into the buffer instead of copying it to bytes.
+            The buffer then has to outlive the entry and must not be modified.
+
+    Returns:
+        The entry.
+    """
+    return _Reader(buffer, zero_copy).entry()
+
+
+def encode_entries(entries: list[VectorStoreEntry]) -> bytes:
+    """
+    Encodes the entries into a binary batch, e.g. to send them to another process or to store them on disk.
+
+    Args:
+        entries: The entries to encode.
+
+    Returns:
+        The binary batch.
+    """
+    parts: list[bytes | memoryview] = [_BATCH_HEADER.pack(_MAGIC, _FORMAT_VERSION, _ENTRIES_KIND, len(entries))]
+    for entry in entries:
+        _write_entry(parts, entry)
+    return b"".join(parts)
+
+
+def decode_entries(buffer: bytes | bytearray | memoryview, zero_copy: bool = False) -> list[VectorStoreEntry]:
+    """
+    Decodes the entries from a binary batch.
+
+    Args:
+        buffer: The binary batch, see `encode_entries`.
+        zero_copy: Whether to keep the images as `memoryview`s into the buffer instead of copying them to bytes.
+            The buffer then has to outlive the entries and must not be modified.
+
+    Returns:
+        The entries.
+
+    Raises:
+        ValueError: If the buffer is not a batch of entries.
+    """
+    reader = _Reader(buffer, zero_copy)
+    return [reader.entry() for _ in range(reader.batch(_ENTRIES_KIND))]
+
+
+def encode_results(results: list[VectorStoreResult]) -> bytes:
+    """
+    Encodes the results, including their subresults, into a binary batch. Vectors are stored as float32.
+
+    Args:
+        results: The results to encode.
+
+    Returns:
+        The binary batch.
+    """
+    parts: list[bytes | memoryview] = [_BATCH_HEADER.pack(_MAGIC, _FORMAT_VERSION, _RESULTS_KIND, len(results))]
+    for result in results:
+        _write_result(parts, result)
+    return b"".join(parts)
+
+
+def decode_results(buffer: bytes | bytearray | memoryview, zero_copy: bool = False) -> list[VectorStoreResult]:
+    """
+    Decodes the results from a binary batch.
+
+    Args:
+        buffer: The binary batch, see `encode_results`.
+        zero_copy: Whether to keep the images as `memoryview`s into the buffer instead of copying them to bytes.
+            The buffer then has to outlive the results and must not be modified.
+
+    Returns:
+        The results.
+
+    Raises:
+        ValueError: If the buffer is not a batch of results.
+    """
+    reader = _Reader(buffer, zero_copy)
+    return [reader.result() for _ in range(reader.batch(_RESULTS_KIND))]
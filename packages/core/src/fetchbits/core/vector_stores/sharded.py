@@ -0,0 +1,389 @@
+import asyncio
+import heapq
+import multiprocessing
+import os
+import weakref
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+from typing_extensions import Self
+
+from fetchbits.core.embeddings import DenseEmbedder
+from fetchbits.core.vector_stores.base import (
+    WHEREQUERY,
+    EmbeddingType,
+    ResultProjection,
+    VectorStoreEntry,
+    VectorStoreOptions,
+    VectorStoreResult,
+    VectorStoreWithDenseEmbedder,
+    project_result,
+)
+from fetchbits.core.vector_stores.embedding_cache import EmbeddingCache
+from fetchbits.core.vector_stores.filters import MetadataIndex, WhereFilter, compile_where
+from fetchbits.core.vector_stores.pagination import EntryPage, SortedIds, build_page, decode_cursor
+from fetchbits.core.vector_stores.scoring import top_k
+
+# The maximal number of shards by default. Every shard is a process, so more have to be asked for explicitly.
+_DEFAULT_MAX_SHARDS = 4
+
+# Hits of a single query in one shard: the IDs, their scores and, if requested, their vectors.
+_ShardHits = tuple[list[UUID], np.ndarray, np.ndarray | None]
+
+
+class _Shard:
+    """
+    The vectors and the flattened metadata of one partition of the entries, living in a worker process.
+    Searches are brute-force cosine similarity, like in `InMemoryVectorStore`.
+    """
+
+    def __init__(self) -> None:
+        self.ids: list[UUID] = []
+        self.rows: dict[UUID, int] = {}
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self.norms = np.empty(0, dtype=np.float32)
+        self.metadata_index = MetadataIndex()
+
+    def add(self, ids: list[UUID], vectors: np.ndarray, metadata: list[dict]) -> None:
+        count = len(self.ids)
+        if count + len(ids) > self.vectors.shape[0] or self.vectors.shape[1] != vectors.shape[1]:
+            if count and self.vectors.shape[1] != vectors.shape[1]:
+                raise ValueError(f"Expected vectors of dimension {self.vectors.shape[1]}, got {vectors.shape[1]}.")
+            capacity = max(count + len(ids), 2 * self.vectors.shape[0], 16)
+            grown = np.empty((capacity, vectors.shape[1]), dtype=np.float32)
+            grown_norms = np.empty(capacity, dtype=np.float32)
+            if count:
+                grown[:count] = self.vectors[:count]
+                grown_norms[:count] = self.norms[:count]
+            self.vectors, self.norms = grown, grown_norms
+
+        norms = np.linalg.norm(vectors, axis=1)
+        for entry_id, vector, norm, entry_metadata in zip(ids, vectors, norms, metadata, strict=True):
+            row = self.rows.get(entry_id)
+            if row is None:
+                row = len(self.ids)
+                self.ids.append(entry_id)
+                self.rows[entry_id] = row
+            self.vectors[row] = vector
+            self.norms[row] = norm
+            self.metadata_index.add(entry_id, entry_metadata)
+
+    def remove(self, ids: list[UUID]) -> None:
+        for entry_id in ids:
+            row = self.rows.pop(entry_id, None)
+            if row is None:
+                continue
+            self.metadata_index.remove(entry_id)
+            last = len(self.ids) - 1
+            last_id = self.ids.pop()
+            if row != last:
+                self.vectors[row] = self.vectors[last]
+                self.norms[row] = self.norms[last]
+                self.ids[row] = last_id
+                self.rows[last_id] = row
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        score_threshold: float | None,
+        where: WhereFilter | None,
+        with_vectors: bool,
+    ) -> list[_ShardHits]:
+        count = len(self.ids)
+        rows = np.arange(count)
+        vectors, norms = self.vectors[:count], self.norms[:count]
+        if where:
+            matching = self.metadata_index.match(where)
+            rows = np.fromiter((self.rows[entry_id] for entry_id in matching), dtype=np.intp, count=len(matching))
+            vectors, norms = self.vectors[rows], self.norms[rows]
+        if not len(rows):
+            return [([], np.empty(0, dtype=np.float32), None) for _ in queries]
+
+        dots = queries @ vectors.T
+        denominators = np.outer(np.linalg.norm(queries, axis=1), norms).astype(np.float32)
+        scores = np.divide(dots, denominators, out=np.zeros_like(dots), where=denominators > 0)
+
+        hits = []
+        for query_scores in scores:
+            top = top_k(query_scores, k, score_threshold)
+            selected = rows[top]
+            hits.append(
+                (
+                    [self.ids[row] for row in selected],
+                    query_scores[top],
+                    self.vectors[selected] if with_vectors else None,
+                )
+            )
+        return hits
+
+
+# The shard of the current worker process, every worker serves exactly one.
+_shard: _Shard | None = None
+
+
+def _init_worker() -> None:
+    global _shard  # noqa: PLW0603
+    _shard = _Shard()
+
+
+def _call_shard(method: str, *args: Any) -> Any:  # noqa: ANN401
+    return getattr(_shard, method)(*args)
+
+
+def _shutdown_workers(workers: list[ProcessPoolExecutor]) -> None:
+    for worker in workers:
+        worker.shutdown(cancel_futures=True)
+
+
+class ShardedVectorStore(VectorStoreWithDenseEmbedder[VectorStoreOptions]):
+    """
+    Vector store partitioning the vectors across worker processes by entry ID. Queries are embedded once,
+    searched by all the shards in parallel on separate cores and the per-shard top-k lists are merged with
+    a heap. The entries themselves stay in the main process, only the vectors and the metadata used for
+    filtering are sent to the workers.
+
+    The workers are released by `close`, on exiting the store used as a context manager, or at the latest
+    once the store is garbage collected or the interpreter exits.
+    """
+
+    options_cls = VectorStoreOptions
+
+    def __init__(
+        self,
+        embedder: DenseEmbedder,
+        embedding_type: EmbeddingType = EmbeddingType.TEXT,
+        default_options: VectorStoreOptions | None = None,
+        embedding_cache: EmbeddingCache | None = None,
+        shards: int | None = None,
+        start_method: str | None = None,
+    ) -> None:
+        """
+        Constructs a new ShardedVectorStore instance.
+
+        Args:
+            embedder: The embedder to use for converting entries to vectors.
+            embedding_type: Which part of the entry to embed, either text or image. The other part will be ignored.
+            default_options: The default options for querying the vector store.
+            embedding_cache: The cache of already computed embeddings.
+            shards: The number of shards, each served by its own process. Defaults to the number of CPUs,
+                at most 4.
+            start_method: The multiprocessing start method of the workers, e.g. "spawn" or "forkserver".
+                Defaults to the platform default.
+        """
+        super().__init__(
+            embedder=embedder,
+            embedding_type=embedding_type,
+            default_options=default_options,
+            embedding_cache=embedding_cache,
+        )
+        context = multiprocessing.get_context(start_method)
+        self._workers = [
+            ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_init_worker)
+            for _ in range(shards or min(os.cpu_count() or 1, _DEFAULT_MAX_SHARDS))
+        ]
+        self._finalizer = weakref.finalize(self, _shutdown_workers, self._workers)
+        self._entries: dict[UUID, VectorStoreEntry] = {}
+        self._sorted_ids = SortedIds()
+        self._metadata_index = MetadataIndex()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _shard_of(self, entry_id: UUID) -> int:
+        return entry_id.int % len(self._workers)
+
+    async def _call(self, shard: int, method: str, *args: Any) -> Any:  # noqa: ANN401
+        return await asyncio.get_running_loop().run_in_executor(self._workers[shard], _call_shard, method, *args)
+
+    def close(self) -> None:
+        """
+        Shuts the worker processes down.
+        """
+        self._finalizer()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.close()
+
+    async def store(self, entries: list[VectorStoreEntry]) -> None:
+        """
+        Store entries in the vector store. Entries with already stored IDs are overwritten.
+
+        Args:
+            entries: The entries to store.
+        """
+        embeddings = await self._create_embeddings(entries)
+        stored = {entry.id: entry for entry in entries if entry.id in embeddings}
+
+        partitions: dict[int, list[UUID]] = {}
+        for entry_id in stored:
+            partitions.setdefault(self._shard_of(entry_id), []).append(entry_id)
+        try:
+            await asyncio.gather(
+                *(
+                    self._call(
+                        shard,
+                        "add",
+                        ids,
+                        np.asarray([embeddings[entry_id] for entry_id in ids], dtype=np.float32),
+                        [stored[entry_id].metadata for entry_id in ids],
+                    )
+                    for shard, ids in partitions.items()
+                )
+            )
+
+            self._entries.update(stored)
+            self._sorted_ids.add(stored)
+            self._metadata_index.add_many((entry_id, entry.metadata) for entry_id, entry in stored.items())
+        finally:
+            # Searches running while the shards are written see them partially updated, so the bump comes last.
+            self.generation += 1
+
+    async def retreive(self, text: str, options: VectorStoreOptions | None = None) -> list[VectorStoreResult]:
+        """
+        Retrieve entries from the vector store most similar to the provided text.
+
+        Args:
+            text: The text to query the vector store with.
+            options: The options for querying the vector store.
+
+        Returns:
+            The entries, sorted from the most to the least similar.
+        """
+        return (await self.retrieve_many([text], options))[0]
+
+    async def retrieve_many(
+        self, texts: list[str], options: VectorStoreOptions | None = None
+    ) -> list[list[VectorStoreResult]]:
+        """
+        Retrieve entries most similar to each of the provided texts. The texts are embedded in one call
+        and every shard searches for all of them at once.
+
+        Args:
+            texts: The texts to query the vector store with.
+            options: The options for querying the vector store, shared by all the queries.
+
+        Returns:
+            The entries for every text, each sorted from the most to the least similar.
+        """
+        merged_options = (self.default_options | options) if options else self.default_options
+        if not texts or not self._entries or merged_options.k <= 0:
+            return [[] for _ in texts]
+
+        queries = np.asarray(await self._embedder.embed_text(texts), dtype=np.float32)
+        where = compile_where(merged_options.where) if merged_options.where else None
+        with_vectors = merged_options.projection is ResultProjection.FULL
+        search_args = (queries, merged_options.k, merged_options.score_threshold, where, with_vectors)
+        shard_hits: list[list[_ShardHits]] = await asyncio.gather(
+            *(self._call(shard, "search", *search_args) for shard in range(len(self._workers)))
+        )
+
+        results = []
+        for query in range(len(texts)):
+            merged = heapq.merge(
+                *(self._iter_hits(hits[query]) for hits in shard_hits),
+                key=lambda hit: hit[1],
+                reverse=True,
+            )
+            # Entries removed while the shards were searching are skipped.
+            merged = (hit for hit in merged if hit[0] in self._entries)
+            results.append(
+                [
+                    project_result(
+                        entry_id,
+                        score,
+                        merged_options.projection,
+                        entry=lambda entry_id=entry_id: self._entries[entry_id],  # type: ignore[misc]
+                        vector=vector,
+                    )
+                    for entry_id, score, vector in islice(merged, merged_options.k)
+                ]
+            )
+        return results
+
+    @staticmethod
+    def _iter_hits(hits: _ShardHits) -> Iterator[tuple[UUID, float, Callable[[], list[float]]]]:
+        """
+        Iterates over the hits of a shard, sorted by descending score, with lazy accessors of their vectors.
+        """
+        ids, scores, vectors = hits
+        for index, (entry_id, score) in enumerate(zip(ids, scores.tolist(), strict=True)):
+            yield entry_id, score, (lambda index=index: vectors[index].tolist())  # type: ignore[index, misc]
+
+    async def remove(self, ids: list[UUID]) -> None:
+        """
+        Remove entries from the vector store.
+
+        Args:
+            ids: The list of entries' IDs to remove.
+        """
+        removed = [entry_id for entry_id in ids if self._entries.pop(entry_id, None) is not None]
+        partitions: dict[int, list[UUID]] = {}
+        for entry_id in removed:
+            partitions.setdefault(self._shard_of(entry_id), []).append(entry_id)
+            self._metadata_index.remove(entry_id)
+        self._sorted_ids.remove(removed)
+        try:
+            await asyncio.gather(*(self._call(shard, "remove", shard_ids) for shard, shard_ids in partitions.items()))
+        finally:
+            self.generation += 1
+
+    async def list_page(
+        self, where: WHEREQUERY | None = None, limit: int = 100, cursor: str | None = None
+    ) -> EntryPage:
+        """
+        List a page of entries in ascending ID order, continuing right after the cursor. The cursor is found
+        with a binary search over the sorted IDs, so the pages deep into the store are as fast as the first one.
+
+        Args:
+            where: The filter dictionary - the keys are the field names and the values are the values to filter by.
+                Not specifying the key means no filtering.
+            limit: The maximum number of entries of the page.
+            cursor: The `next_cursor` of the previous page, or None to start from the beginning.
+
+        Returns:
+            The page of entries with the cursor of the next page.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        ids = self._sorted_ids.after(decode_cursor(cursor))
+        if where:
+            where_filter = compile_where(where)
+            ids = (entry_id for entry_id in ids if self._metadata_index.matches(entry_id, where_filter))
+        return build_page(ids, limit, self._entries.__getitem__)
+
+    async def list(
+        self, where: WHEREQUERY | None = None, limit: int | None = None, offset: int = 0
+    ) -> list[VectorStoreEntry]:
+        """
+        List entries from the vector store. The entries can be filtered, limited and offset.
+
+        Args:
+            where: The filter dictionary - the keys are the field names and the values are the values to filter by.
+                Not specifying the key means no filtering.
+            limit: The maximum number of entries to return.
+            offset: The number of entries to skip.
+
+        Returns:
+            The entries.
+        """
+        entries: Iterator[VectorStoreEntry] = iter(self._entries.values())
+        if where:
+            entries = (self._entries[entry_id] for entry_id in self._metadata_index.match(where))
+
+        stop = offset + limit if limit is not None else None
+        return list(islice(entries, offset, stop))
@@ -0,0 +1,435 @@
+import heapq
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from itertools import islice
+from uuid import UUID
+
+from fetchbits.core.embeddings import Embedder, SparseVector
+from fetchbits.core.vector_stores.base import (
+    WHEREQUERY,
+    EmbeddingType,
+    VectorStoreEntry,
+    VectorStoreOptions,
+    VectorStoreResult,
+    VectorStoreWithEmbedder,
+    project_result,
+)
+from fetchbits.core.vector_stores.compaction import CompactionMetrics, CompactionPolicy, Tombstones
+from fetchbits.core.vector_stores.embedding_cache import EmbeddingCache
+from fetchbits.core.vector_stores.filters import MetadataIndex, compile_where
+from fetchbits.core.vector_stores.pagination import EntryPage, SortedIds, build_page, decode_cursor
+
+
+class _PostingList:
+    """
+    Documents containing a term, in ascending document order, with the term weights and their maximum.
+    """
+
+    __slots__ = ("documents", "max_weight", "weights")
+
+    def __init__(self) -> None:
+        self.documents: list[int] = []
+        self.weights: list[float] = []
+        self.max_weight = 0.0
+
+    def append(self, document: int, weight: float) -> None:
+        self.documents.append(document)
+        self.weights.append(weight)
+        self.max_weight = max(self.max_weight, weight)
+
+
+class _Cursor:
+    """
+    Position of the WAND traversal in the posting list of one query term.
+    """
+
+    __slots__ = ("postings", "position", "query_weight", "upper_bound")
+
+    def __init__(self, postings: _PostingList, query_weight: float) -> None:
+        self.postings = postings
+        self.query_weight = query_weight
+        self.upper_bound = query_weight * postings.max_weight
+        self.position = 0
+
+    @property
+    def document(self) -> int | None:
+        if self.position < len(self.postings.documents):
+            return self.postings.documents[self.position]
+        return None
+
+    @property
+    def score(self) -> float:
+        return self.query_weight * self.postings.weights[self.position]
+
+    def seek(self, document: int) -> None:
+        """
+        Moves to the first posting of a document not smaller than the given one.
+        """
+        self.position = bisect_left(self.postings.documents, document, lo=self.position)
+
+
+class SparseInvertedIndex:
+    """
+    Inverted index over sparse vectors answering top-k dot product queries with WAND dynamic pruning.
+
+    Documents are numbered in insertion order, so posting lists are append-only and always sorted.
+    Removed documents are skipped until the index is compacted. Weights are assumed to be non-negative,
+    as produced by SPLADE and BM25-like models, otherwise the pruning bounds do not hold.
+
+    See: Broder et al., "Efficient query evaluation using a two-level retrieval process".
+    """
+
+    def __init__(self, compaction_ratio: float = 0.5) -> None:
+        """
+        Constructs a new SparseInvertedIndex instance.
+
+        Args:
+            compaction_ratio: The fraction of removed documents triggering a rebuild of the posting lists.
+        """
+        self.compaction_ratio = compaction_ratio
+        self._postings: dict[int, _PostingList] = {}
+        self._documents: dict[int, tuple[UUID, SparseVector]] = {}
+        self._numbers: dict[UUID, int] = {}
+        self._next_document = 0
+        self._removed = 0
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def vector(self, key: UUID) -> SparseVector:
+        """
+        Returns the sparse vector stored under the key.
+
+        Args:
+            key: The key of the vector.
+
+        Returns:
+            The vector.
+        """
+        return self._documents[self._numbers[key]][1]
+
+    def add(self, key: UUID, vector: SparseVector) -> None:
+        """
+        Indexes the vector. A vector already stored under the same key is replaced.
+
+        Args:
+            key: The key identifying the vector.
+            vector: The vector to index.
+        """
+        self.remove(key)
+        document = self._next_document
+        self._next_document += 1
+        self._numbers[key] = document
+        self._documents[document] = (key, vector)
+        for term, weight in zip(vector.indices, vector.values, strict=True):
+            if term not in self._postings:
+                self._postings[term] = _PostingList()
+            self._postings[term].append(document, weight)
+
+    def remove(self, key: UUID) -> None:
+        """
+        Removes the vector from the index. Unknown keys are ignored.
+
+        Args:
+            key: The key of the vector.
+        """
+        document = self._numbers.pop(key, None)
+        if document is None:
+            return
+
+        del self._documents[document]
+        self._removed += 1
+        if self._removed > self.compaction_ratio * (len(self._documents) + self._removed):
+            self._compact()
+
+    def _compact(self) -> None:
+        """
+        Rebuilds the posting lists without the removed documents, tightening the per-term bounds.
+        """
+        documents = list(self._documents.values())
+        self._postings.clear()
+        self._documents.clear()
+        self._numbers.clear()
+        self._next_document = 0
+        self._removed = 0
+        for key, vector in documents:
+            self.add(key, vector)
+
+    def search(
+        self,
+        vector: SparseVector,
+        k: int,
+        score_threshold: float | None = None,
+        allowed: Callable[[UUID], bool] | None = None,
+    ) -> list[tuple[UUID, float]]:
+        """
+        Finds the documents with the highest dot product with the query, skipping the documents whose score
+        upper bound cannot beat the current top-k.
+
+        Args:
+            vector: The query vector.
+            k: The number of documents to return.
+            score_threshold: The minimal score of the returned documents.
+            allowed: Optional predicate over keys. Rejected documents are never scored.
+
+        Returns:
+            Up to `k` (key, score) pairs, sorted by descending score.
+        """
+        if k <= 0:
+            return []
+
+        cursors = [
+            _Cursor(self._postings[term], weight)
+            for term, weight in zip(vector.indices, vector.values, strict=True)
+            if term in self._postings and weight > 0
+        ]
+        top: list[tuple[float, int]] = []
+        floor = float("-inf") if score_threshold is None else score_threshold
+
+        while cursors:
+            cursors = [cursor for cursor in cursors if cursor.document is not None]
+            cursors.sort(key=lambda cursor: cursor.document)  # type: ignore[arg-type, return-value]
+            threshold = top[0][0] if len(top) >= k else floor
+
+            pivot, bound = None, 0.0
+            for index, cursor in enumerate(cursors):
+                bound += cursor.upper_bound
+                if bound > threshold or (len(top) < k and bound >= threshold):
+                    pivot = index
+                    break
+            if pivot is None:
+                break
+
+            pivot_document = cursors[pivot].document
+            if cursors[0].document != pivot_document:
+                for cursor in cursors[:pivot]:
+                    cursor.seek(pivot_document)  # type: ignore[arg-type]
+                continue
+
+            entry = self._documents.get(pivot_document)  # type: ignore[arg-type]
+            admissible = entry is not None and (allowed is None or allowed(entry[0]))
+            score = 0.0
+            for cursor in cursors:
+                if cursor.document != pivot_document:
+                    break
+                if admissible:
+                    score += cursor.score
+                cursor.position += 1
+
+            if not admissible or score < floor:
+                continue
+            if len(top) < k:
+                heapq.heappush(top, (score, pivot_document))  # type: ignore[arg-type]
+            elif score > top[0][0]:
+                heapq.heapreplace(top, (score, pivot_document))  # type: ignore[arg-type]
+
+        return [(self._documents[document][0], score) for score, document in sorted(top, reverse=True)]
+
+
+class SparseVectorStore(VectorStoreWithEmbedder[VectorStoreOptions]):
+    """
+    In-memory vector store for sparse embeddings, built on posting lists with WAND top-k retrieval.
+    Scores are dot products, so the higher the score, the more similar the entry is to the query.
+    """
+
+    options_cls = VectorStoreOptions
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        embedding_type: EmbeddingType = EmbeddingType.TEXT,
+        default_options: VectorStoreOptions | None = None,
+        embedding_cache: EmbeddingCache | None = None,
+        compaction_ratio: float = 0.5,
+        compaction_policy: CompactionPolicy | None = None,
+    ) -> None:
+        """
+        Constructs a new SparseVectorStore instance.
+
+        Args:
+            embedder: The embedder to use for converting entries to sparse vectors.
+            embedding_type: Which part of the entry to embed, either text or image. The other part will be ignored.
+            default_options: The default options for querying the vector store.
+            embedding_cache: The cache of already computed embeddings.
+            compaction_ratio: The fraction of removed entries triggering a rebuild of the posting lists.
+            compaction_policy: The thresholds triggering the background removal of the removed entries from
+                the posting lists.
+        """
+        super().__init__(
+            embedder=embedder,
+            embedding_type=embedding_type,
+            default_options=default_options,
+            embedding_cache=embedding_cache,
+        )
+        self._entries: dict[UUID, VectorStoreEntry] = {}
+        self._sorted_ids = SortedIds()
+        self._metadata_index = MetadataIndex()
+        self._index = SparseInvertedIndex(compaction_ratio=compaction_ratio)
+        # The posting lists are rebuilt by the index while the tombstones are purged, so in the background too.
+        self._tombstones = Tombstones(self._index.remove, compaction_policy)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def compaction_metrics(self) -> CompactionMetrics:
+        """
+        The counters of the removed entries and of the compactions of the posting lists.
+        """
+        return self._tombstones.metrics
+
+    async def compact(self) -> None:
+        """
+        Removes all the removed entries from the posting lists now, instead of waiting for the background compaction.
+
+        Raises:
+            Exception: The error of the last failed background compaction, see `Tombstones.compact`.
+        """
+        await self._tombstones.compact()
+
+    async def store(self, entries: list[VectorStoreEntry]) -> None:
+        """
+        Store entries in the vector store. Entries with already stored IDs are overwritten.
+
+        Args:
+            entries: The entries to store.
+
+        Raises:
+            ValueError: If the embedder does not produce sparse vectors.
+        """
+        embeddings = await self._create_embeddings(entries)
+        self.generation += 1
+        for entry_id, vector in embeddings.items():
+            if not isinstance(vector, SparseVector):
+                raise ValueError("SparseVectorStore requires an embedder producing sparse vectors.")
+            self._index.add(entry_id, vector)
+
+        stored = {entry.id: entry for entry in entries if entry.id in embeddings}
+        self._tombstones.discard(stored)
+        self._entries.update(stored)
+        self._sorted_ids.add(stored)
+        self._metadata_index.add_many((entry_id, entry.metadata) for entry_id, entry in stored.items())
+
+    async def retreive(self, text: str, options: VectorStoreOptions | None = None) -> list[VectorStoreResult]:
+        """
+        Retrieve entries from the vector store most similar to the provided text.
+
+        Args:
+            text: The text to query the vector store with.
+            options: The options for querying the vector store.
+
+        Returns:
+            The entries, sorted from the most to the least similar.
+        """
+        return (await self.retrieve_many([text], options))[0]
+
+    async def retrieve_many(
+        self, texts: list[str], options: VectorStoreOptions | None = None
+    ) -> list[list[VectorStoreResult]]:
+        """
+        Retrieve entries most similar to each of the provided texts. All the texts are embedded in one call.
+
+        Args:
+            texts: The texts to query the vector store with.
+            options: The options for querying the vector store, shared by all the queries.
+
+        Returns:
+            The entries for every text, each sorted from the most to the least similar.
+
+        Raises:
+            ValueError: If the embedder does not produce sparse vectors.
+        """
+        merged_options = (self.default_options | options) if options else self.default_options
+        if not texts:
+            return []
+
+        allowed = None
+        if merged_options.where:
+            # Removed entries are dropped from the metadata index right away, so they never match.
+            matching = set(self._metadata_index.match(merged_options.where))
+            if not matching:
+                return [[] for _ in texts]
+            allowed = matching.__contains__
+        elif self._tombstones:
+            allowed = self._entries.__contains__
+
+        results = []
+        for query_vector in await self._embedder.embed_text(texts):
+            if not isinstance(query_vector, SparseVector):
+                raise ValueError("SparseVectorStore requires an embedder producing sparse vectors.")
+            hits = self._index.search(query_vector, merged_options.k, merged_options.score_threshold, allowed)
+            results.append(
+                [
+                    project_result(
+                        entry_id,
+                        score,
+                        merged_options.projection,
+                        entry=lambda entry_id=entry_id: self._entries[entry_id],  # type: ignore[misc]
+                        vector=lambda entry_id=entry_id: self._index.vector(entry_id),  # type: ignore[misc]
+                    )
+                    for entry_id, score in hits
+                ]
+            )
+        return results
+
+    async def remove(self, ids: list[UUID]) -> None:
+        """
+        Remove entries from the vector store. The entries disappear from the results right away, while their
+        postings stay in the index as tombstones until the background compaction removes them.
+
+        Args:
+            ids: The list of entries' IDs to remove.
+        """
+        self.generation += 1
+        removed = [entry_id for entry_id in ids if self._entries.pop(entry_id, None) is not None]
+        self._sorted_ids.remove(removed)
+        for entry_id in removed:
+            self._metadata_index.remove(entry_id)
+        self._tombstones.add(removed, total=len(self._index))
+
+    async def list_page(
+        self, where: WHEREQUERY | None = None, limit: int = 100, cursor: str | None = None
+    ) -> EntryPage:
+        """
+        List a page of entries in ascending ID order, continuing right after the cursor. The cursor is found
+        with a binary search over the sorted IDs, so the pages deep into the store are as fast as the first one.
+
+        Args:
+            where: The filter dictionary - the keys are the field names and the values are the values to filter by.
+                Not specifying the key means no filtering.
+            limit: The maximum number of entries of the page.
+            cursor: The `next_cursor` of the previous page, or None to start from the beginning.
+
+        Returns:
+            The page of entries with the cursor of the next page.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        ids = self._sorted_ids.after(decode_cursor(cursor))
+        if where:
+            where_filter, metadata_index = compile_where(where), self._metadata_index
+            ids = (entry_id for entry_id in ids if metadata_index.matches(entry_id, where_filter))
+        return build_page(ids, limit, self._entries.__getitem__)
+
+    async def list(
+        self, where: WHEREQUERY | None = None, limit: int | None = None, offset: int = 0
+    ) -> list[VectorStoreEntry]:
+        """
+        List entries from the vector store. The entries can be filtered, limited and offset.
+
+        Args:
+            where: The filter dictionary - the keys are the field names and the values are the values to filter by.
+                Not specifying the key means no filtering.
+            limit: The maximum number of entries to return.
+            offset: The number of entries to skip.
+
+        Returns:
+            The entries.
+        """
+        entries: Iterator[VectorStoreEntry] = iter(self._entries.values())
+        if where:
+            entries = (self._entries[entry_id] for entry_id in self._metadata_index.match(where))
+
+        stop = offset + limit if limit is not None else None
+        return list(islice(entries, offset, stop))
@@ -0,0 +1,130 @@
+from typing import Any
+
+from fetchbits.core.prompt.base import SinglePrompt
+from fetchbits.core.prompt.history import HistoryBudget, estimate_message_tokens, estimate_tokens
+
+
+def _count_messages(message: dict[str, Any]) -> int:
+    return 10
+
+
+def _chat(turns: int) -> list[dict[str, Any]]:
+    chat: list[dict[str, Any]] = [{"role": "system", "content": "You are helpful."}]
+    for turn in range(turns):
+        chat.append({"role": "user", "content": f"question {turn}"})
+        chat.append({"role": "assistant", "content": f"answer {turn}"})
+    return chat
+
+
+def _roles(prompt: SinglePrompt) -> list[str]:
+    return [message["role"] for message in prompt.chat]
+
+
+def test_estimate_message_tokens() -> None:
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("12345") == 2
+    assert estimate_message_tokens({"role": "user", "content": "1234"}) == 5
+    assert estimate_message_tokens({"role": "user", "content": [{"type": "text", "text": "12345678"}]}) == 6
+    tool_call = {"function": {"name": "tool", "arguments": "{}"}}
+    assert estimate_message_tokens({"role": "assistant", "content": None, "tool_calls": [tool_call]}) == 6
+
+
+def test_shrink_tool_result() -> None:
+    budget = HistoryBudget(max_tokens=100, max_tool_result_tokens=2)
+
+    assert budget.shrink_tool_result("1234") == "1234"
+    assert budget.shrink_tool_result("1234567890") == "123456... [truncated 4 characters]"
+    assert HistoryBudget(max_tokens=100).shrink_tool_result("1234567890") == "1234567890"
+
+
+def test_history_is_compacted_below_the_budget() -> None:
+    prompt = SinglePrompt(_chat(0)).set_history_budget(
+        HistoryBudget(max_tokens=100, target_ratio=0.5, token_counter=_count_messages)
+    )
+
+    for turn in range(5):
+        prompt.add_user_message(f"question {turn}").add_assistant_message(f"answer {turn}")
+
+    assert prompt.chat[0] == {"role": "system", "content": "You are helpful."}
+    assert prompt.chat[-1] == {"role": "assistant", "content": "answer 4"}
+    assert prompt.history_tokens == 10 * len(prompt.chat) <= 100
+    assert len(prompt.chat) == 5
+
+
+def test_tool_results_stay_with_their_calls() -> None:
+    prompt = SinglePrompt(_chat(0)).set_history_budget(
+        HistoryBudget(max_tokens=60, target_ratio=0.5, token_counter=_count_messages)
+    )
+
+    for turn in range(6):
+        prompt.add_user_message(f"question {turn}")
+        prompt.add_tool_use_message(f"call-{turn}", "search", {"query": turn}, f"result {turn}")
+
+        roles = _roles(prompt)
+        assert roles[0] == "system"
+        assert roles[1] != "tool"
+        for index, role in enumerate(roles):
+            if role == "tool":
+                call = prompt.chat[index - 1]
+                assert call["tool_calls"][0]["id"] == prompt.chat[index]["tool_call_id"]
+        assert prompt.history_tokens <= 60
+
+
+def test_trailing_tool_results_are_kept_whole() -> None:
+    prompt = SinglePrompt(
+        [{"role": "user", "content": "question"}, {"role": "assistant", "content": "answer"}]
+    ).set_history_budget(HistoryBudget(max_tokens=30, target_ratio=0.1, token_counter=_count_messages))
+
+    prompt.add_tool_use_message("call", "search", {}, "result")
+
+    assert _roles(prompt) == ["assistant", "tool"]
+
+
+def test_dropped_turns_are_summarized() -> None:
+    summarized: list[list[dict[str, Any]]] = []
+
+    def summarizer(messages: list[dict[str, Any]]) -> str:
+        summarized.append(messages)
+        return f"{len(messages)} messages"
+
+    prompt = SinglePrompt(_chat(0)).set_history_budget(
+        HistoryBudget(max_tokens=60, target_ratio=0.5, summarizer=summarizer, token_counter=_count_messages)
+    )
+    for turn in range(6):
+        prompt.add_user_message(f"question {turn}").add_assistant_message(f"answer {turn}")
+
+    assert len(summarized) >= 2
+    # The previous summary is summarized again along with the next dropped messages, and replaced.
+    assert summarized[1][0] == {
+        "role": "system",
+        "content": f"Summary of the earlier conversation:\n{len(summarized[0])} messages",
+    }
+    assert [message for message in prompt.chat if message["role"] == "system"] == [
+        {"role": "system", "content": "You are helpful."},
+        {"role": "system", "content": f"Summary of the earlier conversation:\n{len(summarized[-1])} messages"},
+    ]
+    assert _roles(prompt)[:2] == ["system", "system"]
+
+
+def test_constructor_copies_the_chat() -> None:
+    class BudgetedPrompt(SinglePrompt):
+        history_budget = HistoryBudget(max_tokens=50, target_ratio=0.5, token_counter=_count_messages)
+
+    chat = _chat(5)
+
+    prompt = BudgetedPrompt(chat)
+
+    assert len(chat) == 11
+    assert prompt.chat is not chat
+    assert len(prompt.chat) <= 5
+    assert prompt.chat[0] == chat[0]
+    assert prompt.chat[-1] == chat[-1]
+
+
+def test_prompt_without_budget_is_not_compacted() -> None:
+    chat = _chat(50)
+
+    prompt = SinglePrompt(chat).add_user_message("question")
+
+    assert len(prompt.chat) == 102
+    assert prompt.history_tokens == sum(estimate_message_tokens(message) for message in prompt.chat)
@@ -0,0 +1,81 @@
+import pytest
+from pydantic import BaseModel
+
+from fetchbits.core.prompt.base import SinglePrompt
+from fetchbits.core.prompt.history import HistoryBudget
+from fetchbits.core.prompt.prefix_hash import EMPTY_PREFIX_HASH, extend_prefix_hash
+
+SYSTEM = {"role": "system", "content": "You are helpful."}
+
+
+class Answer(BaseModel):
+    text: str
+
+
+def test_hash_ignores_key_order() -> None:
+    first = extend_prefix_hash(EMPTY_PREFIX_HASH, {"role": "user", "content": "question"})
+    second = extend_prefix_hash(EMPTY_PREFIX_HASH, {"content": "question", "role": "user"})
+
+    assert first == second
+    assert first != extend_prefix_hash(EMPTY_PREFIX_HASH, {"role": "user", "content": "other"})
+    assert extend_prefix_hash(first, SYSTEM) != extend_prefix_hash(EMPTY_PREFIX_HASH, SYSTEM)
+
+
+def test_hash_of_pydantic_models() -> None:
+    message = {"role": "assistant", "content": Answer(text="answer")}
+
+    assert extend_prefix_hash(EMPTY_PREFIX_HASH, message) == extend_prefix_hash(
+        EMPTY_PREFIX_HASH, {"role": "assistant", "content": {"text": "answer"}}
+    )
+    with pytest.raises(TypeError):
+        extend_prefix_hash(EMPTY_PREFIX_HASH, {"role": "user", "content": object()})
+
+
+def test_prefix_hashes() -> None:
+    prompt = SinglePrompt([SYSTEM]).add_user_message("question")
+    hashes = prompt.prefix_hashes()
+
+    prompt.add_assistant_message("answer")
+
+    assert prompt.prefix_hashes()[:2] == hashes
+    assert len(prompt.prefix_hashes()) == 3
+    assert prompt.prefix_hash() == prompt.prefix_hashes()[-1]
+    assert prompt.prefix_hash(1) == hashes[0]
+    assert prompt.prefix_hash(0) == EMPTY_PREFIX_HASH.hex()
+    with pytest.raises(ValueError):
+        prompt.prefix_hash(4)
+
+
+def test_equal_prefixes_have_equal_hashes() -> None:
+    first = SinglePrompt([SYSTEM, {"role": "user", "content": "question"}]).add_assistant_message("one answer")
+    second = SinglePrompt([SYSTEM, {"role": "user", "content": "question"}]).add_assistant_message("other answer")
+
+    assert first.prefix_hashes()[:2] == second.prefix_hashes()[:2]
+    assert first.prefix_hash() != second.prefix_hash()
+    assert first.shared_prefix_length(second.prefix_hashes()) == 2
+    assert first.shared_prefix_length(first.prefix_hashes()) == 3
+    assert first.shared_prefix_length([]) == 0
+
+
+def test_replaced_chat_is_hashed_again() -> None:
+    prompt = SinglePrompt([SYSTEM, {"role": "user", "content": "question"}])
+    hashes = prompt.prefix_hashes()
+
+    prompt._conversation_history = [SYSTEM, {"role": "user", "content": "other question"}]
+
+    assert prompt.prefix_hashes()[0] == hashes[0]
+    assert prompt.prefix_hashes()[1] != hashes[1]
+    assert prompt.prefix_hashes() == SinglePrompt(list(prompt.chat)).prefix_hashes()
+
+
+def test_compacted_chat_is_hashed_again() -> None:
+    prompt = SinglePrompt([SYSTEM]).set_history_budget(
+        HistoryBudget(max_tokens=50, target_ratio=0.5, token_counter=lambda message: 10)
+    )
+    prompt.add_user_message("question 0").add_assistant_message("answer 0")
+    prompt.prefix_hashes()
+
+    for turn in range(1, 4):
+        prompt.add_user_message(f"question {turn}").add_assistant_message(f"answer {turn}")
+
+    assert prompt.prefix_hashes() == SinglePrompt(list(prompt.chat)).prefix_hashes()
@@ -0,0 +1,106 @@
+from typing import Any, ClassVar
+
+import pytest
+
+from fetchbits.core.options import Options
+from fetchbits.core.types import NOT_GIVEN, NotGiven
+
+
+class _ProviderNotGiven:
+    pass
+
+
+PROVIDER_NOT_GIVEN = _ProviderNotGiven()
+
+
+class ExampleOptions(Options):
+    _not_given: ClassVar[Any] = PROVIDER_NOT_GIVEN
+
+    temperature: float | None | NotGiven = NOT_GIVEN
+    max_tokens: int | None | NotGiven = NOT_GIVEN
+    stop: list[str] | None | NotGiven = NOT_GIVEN
+    metadata: dict | None | NotGiven = NOT_GIVEN
+
+
+def test_equal_options_have_equal_hashes() -> None:
+    first = ExampleOptions(temperature=0.5, metadata={"b": [1, 2], "a": {"c": None}})
+    second = ExampleOptions(metadata={"a": {"c": None}, "b": [1, 2]}, temperature=0.5)
+
+    assert first == second
+    assert hash(first) == hash(second)
+    assert len({first, second}) == 1
+    assert first != ExampleOptions(temperature=0.5, metadata={"b": [1, 2]})
+
+
+def test_scalars_of_different_types_are_different_options() -> None:
+    options = [ExampleOptions(metadata={"value": value}) for value in (True, 1, 1.0)]
+
+    assert len(set(options)) == 3
+
+
+def test_extra_options_are_hashed() -> None:
+    assert ExampleOptions(top_k=3) == ExampleOptions(top_k=3)  # type: ignore[call-arg]
+    assert ExampleOptions(top_k=3) != ExampleOptions(top_k=4)  # type: ignore[call-arg]
+    assert hash(ExampleOptions(extra={"a": [1]})) == hash(ExampleOptions(extra={"a": [1]}))  # type: ignore[call-arg]
+
+
+def test_nested_containers_are_immutable() -> None:
+    metadata = {"tags": ["a"]}
+    options = ExampleOptions(stop=["\n"], metadata=metadata)
+    metadata["tags"].append("b")
+
+    assert options.metadata == {"tags": ["a"]}
+    with pytest.raises(TypeError):
+        options.stop.append("END")  # type: ignore[union-attr]
+    with pytest.raises(TypeError):
+        options.metadata["tags"] = []  # type: ignore[index]
+
+
+def test_merge() -> None:
+    defaults = ExampleOptions(temperature=0.5, max_tokens=100)
+    overrides = ExampleOptions(max_tokens=None, stop=["\n"])
+
+    merged = defaults | overrides
+
+    assert merged == ExampleOptions(temperature=0.5, max_tokens=None, stop=["\n"])
+    assert defaults | overrides is merged
+    assert defaults | ExampleOptions(max_tokens=None, stop=["\n"]) is merged
+    assert defaults | ExampleOptions(temperature=1.0) is not merged
+
+
+def test_dict_replaces_missing_values_with_the_sentinel() -> None:
+    options = ExampleOptions(temperature=0.5, max_tokens=None, metadata={"tags": ["a"]})
+
+    resolved = options.dict()
+
+    assert resolved["temperature"] == 0.5
+    assert resolved["max_tokens"] is PROVIDER_NOT_GIVEN
+    assert resolved["stop"] is PROVIDER_NOT_GIVEN
+    assert resolved["metadata"] == {"tags": ["a"]}
+    assert type(resolved["metadata"]) is dict
+    assert type(resolved["metadata"]["tags"]) is list
+
+
+def test_dict_returns_copies() -> None:
+    options = ExampleOptions(metadata={"tags": ["a"]})
+
+    first = options.dict()
+    first["metadata"]["tags"].append("b")
+    first["temperature"] = 1.0
+
+    second = options.dict()
+    assert second["metadata"] == {"tags": ["a"]}
+    assert second["temperature"] is PROVIDER_NOT_GIVEN
+    assert second is not first
+
+
+def test_model_copy_drops_cached_values() -> None:
+    options = ExampleOptions(temperature=0.5)
+    merged = options | ExampleOptions(max_tokens=10)
+    assert options.dict()["temperature"] == 0.5
+
+    copied = options.model_copy(update={"temperature": 1.0})
+
+    assert copied.dict()["temperature"] == 1.0
+    assert copied | ExampleOptions(max_tokens=10) is not merged
+    assert hash(copied) != hash(options)
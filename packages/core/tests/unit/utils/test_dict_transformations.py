@@ -0,0 +1,94 @@
+import pytest
+
+from fetchbits.core.utils.dict_transformations import flatten_dict, flatten_many, unflatten_dict, unflatten_many
+
+
+def test_flatten_dict() -> None:
+    nested = {
+        "name": "entry",
+        "person": {"age": 30, "tags": ["a", {"deep": None}], "ratio": 0.5},
+        "flag": True,
+        "other": (1, 2),
+    }
+
+    assert flatten_dict(nested) == {
+        "name": "entry",
+        "person.age": 30,
+        "person.tags[0]": "a",
+        "person.tags[1].deep": None,
+        "person.ratio": 0.5,
+        "flag": True,
+        "other": "(1, 2)",
+    }
+    assert flatten_dict({"a": {"b": 1}}, sep="/") == {"a/b": 1}
+    assert flatten_dict({}) == {}
+
+
+@pytest.mark.parametrize("nested", [{"a.b": 1}, {"a": {"b[0]": 1}}])
+def test_flatten_dict_rejects_ambiguous_keys(nested: dict) -> None:
+    with pytest.raises(ValueError):
+        flatten_dict(nested)
+
+
+def test_flatten_many_matches_flatten_dict() -> None:
+    nested = [
+        {"person": {"age": 30, "tags": ["a", {"deep": None}]}, "flag": True},
+        {"person": {"age": 31, "tags": ["b"]}, "other": (1, 2)},
+        {},
+    ]
+
+    flattened = flatten_many(nested)
+
+    assert flattened == [flatten_dict(item) for item in nested]
+    first_keys, second_keys = list(flattened[0]), list(flattened[1])
+    assert first_keys[0] is second_keys[0]
+    assert first_keys[1] is second_keys[1]
+    assert flatten_many([{"a": {"b": 1}}], sep="/") == [{"a/b": 1}]
+
+
+@pytest.mark.parametrize("nested", [{"a.b": 1}, {"a": {"b[0]": 1}}])
+def test_flatten_many_rejects_ambiguous_keys(nested: dict) -> None:
+    with pytest.raises(ValueError):
+        flatten_many([{"a": {"b": 1}}, nested])
+
+
+
+ROWS = [
+    {"person.name": "John", "person.age": 30},
+    {"addresses[0].street": "Main St", "addresses[1].street": "Broadway"},
+    {"tags[0]": "a", "tags[2]": "c"},
+    {"items[1].name": "second"},
+    {"0": "first", "1": "second"},
+    {"a": 1, "a.b": 2},
+    {},
+]
+
+
+def test_unflatten_dict() -> None:
+    assert unflatten_dict({"person.name": "John", "person.tags[1]": "b", "person.tags[0]": "a"}) == {
+        "person": {"name": "John", "tags": ["a", "b"]}
+    }
+    assert unflatten_dict({"addresses[0].street": "Main St", "addresses[1].street": "Broadway"}) == {
+        "addresses": [{"street": "Main St"}, {"street": "Broadway"}]
+    }
+    assert unflatten_dict({}) == {}
+
+
+def test_unflatten_dict_reverses_flatten_dict() -> None:
+    nested = {"name": "entry", "person": {"age": 30, "tags": ["a", {"deep": 1.5}]}, "flag": False}
+
+    assert unflatten_dict(flatten_dict(nested)) == nested
+
+
+def test_unflatten_many_matches_unflatten_dict() -> None:
+    rows = ROWS + [{"person.name": "Jane", "person.age": 31}, {"person.age": 32, "person.name": "Jim"}]
+
+    assert unflatten_many(rows) == [unflatten_dict(row) for row in rows]
+
+
+def test_unflatten_many_builds_independent_dicts() -> None:
+    first, second = unflatten_many([{"tags[0]": "a", "person.name": "John"}, {"tags[0]": "b", "person.name": "Jane"}])
+
+    first["person"]["name"] = "changed"
+
+    assert second == {"tags": ["b"], "person": {"name": "Jane"}}
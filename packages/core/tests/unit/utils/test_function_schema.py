@@ -0,0 +1,45 @@
+from fetchbits.core.utils.function_schema import convert_function_to_function_schema, function_arguments_model
+
+
+def add(first: int, second: int = 0) -> int:
+    """
+    Adds two numbers.
+
+    Args:
+        first: The first number.
+        second: The second number.
+    """
+    return first + second
+
+
+class Calculator:
+    def multiply(self, factor: float) -> float:
+        """
+        Multiplies by the factor.
+        """
+        return factor
+
+
+def test_function_schema() -> None:
+    schema = convert_function_to_function_schema(add)
+
+    assert schema["function"]["name"] == "add"
+    assert schema["function"]["description"] == "Adds two numbers."
+    assert schema["function"]["parameters"]["required"] == ["first"]
+    assert schema["function"]["parameters"]["properties"]["second"]["description"] == "The second number."
+
+
+def test_schema_is_built_once_and_returned_as_a_copy() -> None:
+    schema = convert_function_to_function_schema(add)
+    schema["function"]["parameters"]["required"].append("second")
+
+    assert convert_function_to_function_schema(add)["function"]["parameters"]["required"] == ["first"]
+    assert function_arguments_model(add) is function_arguments_model(add)
+
+
+def test_bound_methods_share_the_schema() -> None:
+    first, second = Calculator(), Calculator()
+
+    assert function_arguments_model(first.multiply) is function_arguments_model(second.multiply)
+    assert list(function_arguments_model(first.multiply).model_fields) == ["factor"]
+    assert list(function_arguments_model(Calculator.multiply).model_fields) == ["self", "factor"]
@@ -0,0 +1,78 @@
+import zlib
+from collections import Counter
+from collections.abc import Callable
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from fetchbits.core.embeddings import DenseEmbedder, SparseEmbedder, SparseVector
+from fetchbits.core.vector_stores.base import VectorStoreEntry
+
+
+class VectorEmbedder(DenseEmbedder):
+    """
+    Embeds texts spelling out their vectors, e.g. "1 0 2", as those vectors and any other text as a random
+    vector seeded with the text, so equal texts get equal vectors. Records the batches it was called with.
+    """
+
+    def __init__(self, dim: int = 8) -> None:
+        super().__init__()
+        self.dim = dim
+        self.calls: list[list[str]] = []
+
+    def _embed(self, text: str) -> list[float]:
+        try:
+            return [float(value) for value in text.split()]
+        except ValueError:
+            return np.random.default_rng(zlib.crc32(text.encode())).standard_normal(self.dim).tolist()
+
+    async def embed_text(self, data: list[str], options: object = None) -> list[list[float]]:
+        self.calls.append(list(data))
+        return [self._embed(text) for text in data]
+
+
+class TermEmbedder(SparseEmbedder):
+    """
+    Embeds texts of integer terms, e.g. "1 2 2", as sparse vectors of the term counts.
+    """
+
+    async def embed_text(self, data: list[str], options: object = None) -> list[SparseVector]:
+        vectors = []
+        for text in data:
+            counts = sorted(Counter(int(term) for term in text.split()).items())
+            vectors.append(
+                SparseVector(indices=[term for term, _ in counts], values=[float(count) for _, count in counts])
+            )
+        return vectors
+
+
+@pytest.fixture(name="embedder")
+def embedder_fixture() -> VectorEmbedder:
+    return VectorEmbedder()
+
+
+@pytest.fixture(name="sparse_embedder")
+def sparse_embedder_fixture() -> TermEmbedder:
+    return TermEmbedder()
+
+
+@pytest.fixture(name="make_entries")
+def make_entries_fixture() -> Callable[[int], list[VectorStoreEntry]]:
+    """
+    Makes entries embeddable by both embedders, the text of the entry `index` being "<index> 1". Odd entries
+    have an image, and the metadata holds the parity, the remainder of dividing by three and a nested list.
+    """
+
+    def make(count: int) -> list[VectorStoreEntry]:
+        return [
+            VectorStoreEntry(
+                id=uuid4(),
+                text=f"{index} 1",
+                image_bytes=bytes([index % 256]) * 3 if index % 2 else None,
+                metadata={"odd": index % 2, "group": index % 3, "nested": {"tags": [str(index)]}},
+            )
+            for index in range(count)
+        ]
+
+    return make
@@ -0,0 +1,155 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from fetchbits.core.embeddings import DenseEmbedder
+from fetchbits.core.vector_stores.base import VectorStoreEntry, VectorStoreOptions, VectorStoreResult
+from fetchbits.core.vector_stores.cached import CachedVectorStore, QueryResultCache, normalize_query
+from fetchbits.core.vector_stores.in_memory import InMemoryVectorStore
+
+ENTRIES = [VectorStoreEntry(id=uuid4(), text=f"entry {index}", metadata={"index": index}) for index in range(10)]
+
+
+class CountingStore(InMemoryVectorStore):
+    """
+    Store counting the searches, optionally holding them until released and failing them.
+    """
+
+    def __init__(self, embedder: DenseEmbedder) -> None:
+        super().__init__(embedder=embedder)
+        self.searches: list[list[str]] = []
+        self.release: asyncio.Event | None = None
+        self.error: Exception | None = None
+
+    async def retrieve_many(
+        self, texts: list[str], options: VectorStoreOptions | None = None
+    ) -> list[list[VectorStoreResult]]:
+        self.searches.append(texts)
+        if self.release is not None:
+            await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return await super().retrieve_many(texts, options)
+
+
+@pytest.fixture(name="wrapped")
+def wrapped_fixture(embedder: DenseEmbedder) -> CountingStore:
+    return CountingStore(embedder)
+
+
+def test_normalize_query() -> None:
+    assert normalize_query("  what is\n\tthis  ") == "what is this"
+
+
+def test_query_result_cache_eviction_and_expiry(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr("fetchbits.core.vector_stores.cached.time.monotonic", lambda: now[0])
+    cache = QueryResultCache(max_size=2, ttl=10)
+    results = [VectorStoreResult(entry=ENTRIES[0], score=1.0)]
+
+    cache.set("a", 0, results)
+    cache.set("b", 0, results)
+    assert cache.get("a", 0) == results
+    cache.set("c", 0, results)
+
+    assert cache.get("b", 0) is None
+    assert cache.get("a", 1) is None
+    assert cache.get("c", 0) == results
+    now[0] += 11
+    assert cache.get("c", 0) is None
+    assert len(cache) == 0
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.evictions) == (2, 3, 1)
+
+
+@pytest.mark.asyncio
+async def test_repeated_queries_are_cached(wrapped: CountingStore) -> None:
+    store = CachedVectorStore(wrapped)
+    await store.store(ENTRIES)
+
+    first = await store.retreive("entry 1")
+    first[0].score = -1.0
+    second = await store.retreive("  entry   1 ")
+    other_options = await store.retreive("entry 1", VectorStoreOptions(k=2))
+
+    assert wrapped.searches == [["entry 1"], ["entry 1"]]
+    assert second[0].entry == ENTRIES[1]
+    assert second[0].score > 0
+    assert len(other_options) == 2
+    assert store.cache.stats.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_the_cache(wrapped: CountingStore) -> None:
+    store = CachedVectorStore(wrapped)
+    await store.store(ENTRIES)
+    await store.retreive("entry 1")
+
+    await store.remove([ENTRIES[1].id])
+    results = await store.retreive("entry 1")
+
+    assert len(wrapped.searches) == 2
+    assert ENTRIES[1].id not in {result.entry.id for result in results}
+
+
+@pytest.mark.asyncio
+async def test_direct_writes_to_the_wrapped_store_invalidate_the_cache(wrapped: CountingStore) -> None:
+    store = CachedVectorStore(wrapped)
+    await wrapped.store(ENTRIES)
+    await store.retreive("entry 1")
+
+    await wrapped.remove([ENTRIES[1].id])
+    results = await store.retreive("entry 1")
+
+    assert len(wrapped.searches) == 2
+    assert ENTRIES[1].id not in {result.entry.id for result in results}
+    assert store.cache.stats.hits == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_share_one_search(wrapped: CountingStore) -> None:
+    store = CachedVectorStore(wrapped)
+    await store.store(ENTRIES)
+    wrapped.release = asyncio.Event()
+
+    tasks = [asyncio.create_task(store.retreive("entry 2")) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    wrapped.release.set()
+    first, *joined = await asyncio.gather(*tasks)
+    first[0].score = -1.0
+
+    assert wrapped.searches == [["entry 2"]]
+    for results in joined:
+        assert results[0].entry == ENTRIES[2]
+        assert results[0].score > 0
+        assert results[0] is not first[0]
+        assert results[0].entry is not first[0].entry
+    assert joined[0][0].entry is not joined[1][0].entry
+
+
+@pytest.mark.asyncio
+async def test_failed_search_is_raised_to_all_callers(wrapped: CountingStore) -> None:
+    store = CachedVectorStore(wrapped)
+    await store.store(ENTRIES)
+    wrapped.release = asyncio.Event()
+    wrapped.error = RuntimeError("Search failed.")
+
+    tasks = [asyncio.create_task(store.retreive("entry 3")) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    wrapped.release.set()
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert [type(outcome) for outcome in outcomes] == [RuntimeError, RuntimeError]
+    assert len(store.cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_retrieve_many_searches_only_missing_texts(wrapped: CountingStore) -> None:
+    store = CachedVectorStore(wrapped)
+    await store.store(ENTRIES)
+    await store.retreive("entry 4")
+
+    results = await store.retrieve_many(["entry 4", "entry 5", " entry 4", "entry 6"])
+
+    assert wrapped.searches == [["entry 4"], ["entry 5", "entry 6"]]
+    assert [batch[0].entry for batch in results] == [ENTRIES[4], ENTRIES[5], ENTRIES[4], ENTRIES[6]]
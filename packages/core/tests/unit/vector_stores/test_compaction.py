@@ -0,0 +1,145 @@
+import asyncio
+from collections.abc import Callable
+from uuid import UUID, uuid4
+
+import pytest
+
+from fetchbits.core.embeddings import DenseEmbedder, SparseEmbedder
+from fetchbits.core.vector_stores.base import VectorStoreEntry, VectorStoreOptions
+from fetchbits.core.vector_stores.compaction import CompactionPolicy, Tombstones
+from fetchbits.core.vector_stores.hnsw import HNSWVectorStore
+from fetchbits.core.vector_stores.in_memory import InMemoryVectorStore
+from fetchbits.core.vector_stores.sparse import SparseVectorStore
+
+NEVER = CompactionPolicy(max_tombstones=10**9, max_tombstone_ratio=1.0)
+
+
+def test_compaction_policy() -> None:
+    policy = CompactionPolicy(max_tombstones=5, max_tombstone_ratio=0.25)
+
+    assert not policy.should_compact(0, 0)
+    assert not policy.should_compact(2, 10)
+    assert policy.should_compact(3, 10)
+    assert policy.should_compact(5, 1000)
+
+
+@pytest.mark.asyncio
+async def test_tombstones_are_purged_in_the_background() -> None:
+    purged: list[UUID] = []
+    tombstones = Tombstones(purged.append, CompactionPolicy(max_tombstones=3, chunk_size=2))
+    ids = [uuid4() for _ in range(4)]
+
+    tombstones.add(ids[:2], total=100)
+    await asyncio.sleep(0)
+    assert purged == []
+    assert set(tombstones) == set(ids[:2])
+
+    tombstones.add(ids[2:], total=100)
+    tombstones.discard([ids[3]])
+    await tombstones.compact()
+
+    assert sorted(purged) == sorted(ids[:3])
+    assert len(tombstones) == 0
+    assert tombstones.metrics.compactions == 2
+    assert tombstones.metrics.compacted_entries == 3
+    assert tombstones.metrics.tombstones == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_background_compaction_is_raised_once() -> None:
+    def purge(entry_id: UUID) -> None:
+        raise RuntimeError("Purge failed.")
+
+    tombstones = Tombstones(purge, CompactionPolicy(max_tombstones=1))
+    entry_id = uuid4()
+    tombstones.add([entry_id], total=10)
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(RuntimeError):
+        await tombstones.compact()
+    assert entry_id in tombstones
+    with pytest.raises(RuntimeError):
+        # The next compaction retries the entries left tombstoned.
+        await tombstones.compact()
+
+
+def _store(
+    store_cls: type[InMemoryVectorStore | HNSWVectorStore | SparseVectorStore],
+    embedder: DenseEmbedder,
+    sparse_embedder: SparseEmbedder,
+) -> InMemoryVectorStore | HNSWVectorStore | SparseVectorStore:
+    if store_cls is SparseVectorStore:
+        return SparseVectorStore(embedder=sparse_embedder, compaction_policy=NEVER)
+    return store_cls(embedder=embedder, compaction_policy=NEVER)  # type: ignore[call-arg]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("store_cls", [InMemoryVectorStore, HNSWVectorStore, SparseVectorStore])
+async def test_removed_entries_are_tombstoned(
+    embedder: DenseEmbedder,
+    sparse_embedder: SparseEmbedder,
+    store_cls: type[InMemoryVectorStore | HNSWVectorStore | SparseVectorStore],
+    make_entries: Callable[[int], list[VectorStoreEntry]],
+) -> None:
+    store = _store(store_cls, embedder, sparse_embedder)
+    entries = make_entries(30)
+    await store.store(entries)
+
+    removed = entries[::3]
+    await store.remove([entry.id for entry in removed] + [uuid4()])
+    await store.remove([removed[0].id])
+
+    assert len(store) == 20
+    assert store.compaction_metrics.tombstones == 10
+    assert store.compaction_metrics.compactions == 0
+    for options in (VectorStoreOptions(k=30), VectorStoreOptions(k=30, where={"odd": 1})):
+        hits = {result.entry.id for result in await store.retreive("0 1", options)}
+        assert hits.isdisjoint(entry.id for entry in removed)
+    assert {entry.id for entry in await store.list()} == {entry.id for entry in entries} - {e.id for e in removed}
+
+    await store.compact()
+
+    assert store.compaction_metrics.tombstones == 0
+    assert store.compaction_metrics.compacted_entries == 10
+    assert len(store) == 20
+    results = await store.retreive("1 1", VectorStoreOptions(k=3))
+    assert results[0].entry == entries[1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("store_cls", [InMemoryVectorStore, HNSWVectorStore, SparseVectorStore])
+async def test_tombstoned_entry_stored_again(
+    embedder: DenseEmbedder,
+    sparse_embedder: SparseEmbedder,
+    store_cls: type[InMemoryVectorStore | HNSWVectorStore | SparseVectorStore],
+    make_entries: Callable[[int], list[VectorStoreEntry]],
+) -> None:
+    store = _store(store_cls, embedder, sparse_embedder)
+    entries = make_entries(5)
+    await store.store(entries)
+    await store.remove([entries[0].id])
+
+    await store.store([entries[0]])
+    await store.compact()
+
+    assert len(store) == 5
+    results = await store.retreive("0 1", VectorStoreOptions(k=5))
+    assert {result.entry.id for result in results} == {entry.id for entry in entries}
+
+
+@pytest.mark.asyncio
+async def test_compaction_starts_in_the_background(
+    embedder: DenseEmbedder, make_entries: Callable[[int], list[VectorStoreEntry]]
+) -> None:
+    store = InMemoryVectorStore(embedder=embedder, compaction_policy=CompactionPolicy(max_tombstones=4, chunk_size=2))
+    entries = make_entries(20)
+    await store.store(entries)
+
+    await store.remove([entry.id for entry in entries[:4]])
+    await asyncio.sleep(0.01)
+
+    assert store.compaction_metrics.compactions == 1
+    assert store.compaction_metrics.tombstones == 0
+    assert {result.entry.id for result in await store.retreive("4 1", VectorStoreOptions(k=20))} == {
+        entry.id for entry in entries[4:]
+    }
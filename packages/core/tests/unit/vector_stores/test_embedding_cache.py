@@ -0,0 +1,136 @@
+import sqlite3
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+
+from fetchbits.core.embeddings import DenseEmbedder, SparseVector
+from fetchbits.core.options import Options
+from fetchbits.core.types import NOT_GIVEN, NotGiven
+from fetchbits.core.vector_stores.base import VectorStoreEntry
+from fetchbits.core.vector_stores.embedding_cache import (
+    Embedding,
+    InMemoryEmbeddingCache,
+    SQLiteEmbeddingCache,
+    TieredEmbeddingCache,
+    content_key,
+    embed_with_cache,
+    embedder_fingerprint,
+)
+from fetchbits.core.vector_stores.in_memory import InMemoryVectorStore
+
+
+class EmbedderOptions(Options):
+    dimensions: int | None | NotGiven = NOT_GIVEN
+    normalize: bool = True
+
+
+class FakeEmbedder:
+    def __init__(self, model_name: str = "model", default_options: Options | None = None) -> None:
+        self.model_name = model_name
+        self.default_options = default_options or EmbedderOptions()
+        self.calls: list[list[str]] = []
+
+    async def embed_text(self, data: list[str]) -> list[list[float]]:
+        self.calls.append(list(data))
+        return [[float(len(text)), 0.5] for text in data]
+
+
+def test_embedder_fingerprint() -> None:
+    fingerprint = embedder_fingerprint(FakeEmbedder(), "text")
+
+    assert fingerprint == embedder_fingerprint(FakeEmbedder(default_options=EmbedderOptions()), "text")
+    assert fingerprint == embedder_fingerprint(FakeEmbedder(default_options=EmbedderOptions(dimensions=None)), "text")
+    assert fingerprint != embedder_fingerprint(FakeEmbedder(), "image")
+    assert fingerprint != embedder_fingerprint(FakeEmbedder(model_name="other"), "text")
+    assert fingerprint != embedder_fingerprint(FakeEmbedder(default_options=EmbedderOptions(dimensions=8)), "text")
+    assert fingerprint != embedder_fingerprint(FakeEmbedder(default_options=EmbedderOptions(normalize=False)), "text")
+
+
+def test_content_key() -> None:
+    key = content_key("fingerprint", "text")
+
+    assert key == content_key("fingerprint", b"text")
+    assert key != content_key("fingerprint", "other text")
+    assert key != content_key("other fingerprint", "text")
+
+
+@pytest.mark.asyncio
+async def test_embed_with_cache_embeds_distinct_contents_once() -> None:
+    embedder, cache = FakeEmbedder(), InMemoryEmbeddingCache()
+
+    first = await embed_with_cache(["a", "bb", "a"], embedder.embed_text, "fingerprint", cache)
+    second = await embed_with_cache(["bb", "ccc"], embedder.embed_text, "fingerprint", cache)
+    other = await embed_with_cache(["a"], embedder.embed_text, "other fingerprint", cache)
+
+    assert first == [[1.0, 0.5], [2.0, 0.5], [1.0, 0.5]]
+    assert second == [[2.0, 0.5], [3.0, 0.5]]
+    assert other == [[1.0, 0.5]]
+    assert embedder.calls == [["a", "bb"], ["ccc"], ["a"]]
+
+
+@pytest.mark.asyncio
+async def test_embed_without_cache_skips_duplicates() -> None:
+    embedder = FakeEmbedder()
+
+    assert await embed_with_cache(["a", "a", "b"], embedder.embed_text, "fingerprint") == [[1.0, 0.5]] * 3
+    assert embedder.calls == [["a", "b"]]
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_evicts_least_recently_used() -> None:
+    cache = InMemoryEmbeddingCache(max_size=2)
+    await cache.set_many({"a": [1.0], "b": [2.0]})
+    await cache.get_many(["a"])
+
+    await cache.set_many({"c": [3.0]})
+
+    assert len(cache) == 2
+    assert await cache.get_many(["a", "b", "c"]) == {"a": [1.0], "c": [3.0]}
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_round_trip(tmp_path: Path) -> None:
+    embeddings: dict[str, Embedding] = {
+        "dense": [0.5, -1.25, 3.0],
+        "sparse": SparseVector(indices=[1, 7], values=[0.5, 2.0]),
+        **{f"key {index}": [float(index)] for index in range(1200)},
+    }
+    cache = SQLiteEmbeddingCache(tmp_path / "cache.db")
+    await cache.set_many(embeddings)
+    cache.close()
+
+    reopened = SQLiteEmbeddingCache(tmp_path / "cache.db")
+    found = await reopened.get_many([*embeddings, "missing"])
+    reopened.close()
+
+    assert found == embeddings
+    with sqlite3.connect(tmp_path / "cache.db") as connection:
+        kinds = dict(connection.execute("SELECT key, kind FROM embeddings WHERE key IN ('dense', 'sparse')"))
+    assert kinds == {"dense": "dense32", "sparse": "sparse"}
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_promotes_slow_hits(tmp_path: Path) -> None:
+    fast, slow = InMemoryEmbeddingCache(), SQLiteEmbeddingCache(tmp_path / "cache.db")
+    cache = TieredEmbeddingCache(fast, slow)
+    await slow.set_many({"slow": [1.0]})
+    await cache.set_many({"both": [2.0]})
+
+    assert await cache.get_many(["slow", "both", "missing"]) == {"slow": [1.0], "both": [2.0]}
+    assert await fast.get_many(["slow", "both"]) == {"slow": [1.0], "both": [2.0]}
+    assert await slow.get_many(["both"]) == {"both": [2.0]}
+    slow.close()
+
+
+@pytest.mark.asyncio
+async def test_store_reuses_cached_embeddings(embedder: DenseEmbedder) -> None:
+    cache = InMemoryEmbeddingCache()
+    first = InMemoryVectorStore(embedder=embedder, embedding_cache=cache)
+    second = InMemoryVectorStore(embedder=embedder, embedding_cache=cache)
+
+    await first.store([VectorStoreEntry(id=uuid4(), text=text) for text in ("1 0", "0 1", "1 0")])
+    await second.store([VectorStoreEntry(id=uuid4(), text=text) for text in ("0 1", "1 1")])
+
+    assert embedder.calls == [["1 0", "0 1"], ["1 1"]]  # type: ignore[attr-defined]
+    assert len(second) == 2
@@ -0,0 +1,45 @@
+from uuid import UUID, uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from fetchbits.core.vector_stores.base import VectorStoreEntry
+
+
+def test_from_records_validates_records() -> None:
+    entry = VectorStoreEntry(id=uuid4(), text="entry")
+    entry_id = uuid4()
+
+    entries = VectorStoreEntry.from_records(
+        [entry, {"id": str(entry_id), "image_bytes": "00ff", "metadata": {"tags": ["a"]}}]
+    )
+
+    assert entries[0] == entry
+    assert entries[1] == VectorStoreEntry(id=entry_id, image_bytes=b"\x00\xff", metadata={"tags": ["a"]})
+    assert VectorStoreEntry.from_records([]) == []
+
+
+def test_from_records_rejects_invalid_records() -> None:
+    with pytest.raises(ValidationError):
+        VectorStoreEntry.from_records([{"id": str(uuid4()), "text": "entry"}, {"id": str(uuid4())}])
+    with pytest.raises(ValidationError):
+        VectorStoreEntry.from_records([{"id": "not an ID", "text": "entry"}])
+
+
+def test_from_records_rejects_unserializable_metadata() -> None:
+    records = [{"id": uuid4(), "text": "entry"}, {"id": uuid4(), "text": "entry", "metadata": {"value": object()}}]
+
+    with pytest.raises(ValueError, match="Record 1"):
+        VectorStoreEntry.from_records(records)
+    with pytest.raises(ValueError):
+        VectorStoreEntry(**records[1])
+
+
+def test_from_trusted_records() -> None:
+    entry = VectorStoreEntry(id=uuid4(), text="entry", image_bytes=b"\x01", metadata={"a": 1})
+
+    entries = VectorStoreEntry.from_records([entry, dict(entry)], trusted=True)
+
+    assert entries == [entry, entry]
+    assert entries[0] is entry
+    assert isinstance(entries[1].id, UUID)
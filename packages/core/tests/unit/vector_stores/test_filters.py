@@ -0,0 +1,67 @@
+from fetchbits.core.vector_stores.filters import MetadataIndex, WhereFilter, compile_where
+
+
+def test_compile_where_flattens_nested_filters() -> None:
+    where_filter = compile_where({"source": {"name": "wiki", "page": 3}, "lang": "en"})
+
+    assert where_filter.conditions == (("source.name", "wiki"), ("source.page", 3), ("lang", "en"))
+    assert compile_where(where_filter) is where_filter
+    assert not compile_where(None)
+    assert not compile_where({})
+
+
+def test_where_filter_matches_nested_metadata() -> None:
+    where_filter = compile_where({"source": {"name": "wiki"}, "tags": ["a", "b"]})
+
+    assert where_filter({"source": {"name": "wiki", "page": 3}, "tags": ["a", "b"]})
+    assert not where_filter({"source": {"name": "wiki"}, "tags": ["b", "a"]})
+    assert not where_filter({"source": {"name": "blog"}, "tags": ["a", "b"]})
+    assert WhereFilter(conditions=())({"anything": 1})
+
+
+def test_booleans_do_not_match_numbers() -> None:
+    assert not compile_where({"flag": True})({"flag": 1})
+    assert not compile_where({"flag": 0})({"flag": False})
+    assert compile_where({"flag": True})({"flag": True})
+    assert compile_where({"count": 1})({"count": 1.0})
+
+
+def test_metadata_index_match() -> None:
+    index = MetadataIndex()
+    index.add_many(
+        [
+            ("a", {"lang": "en", "source": {"name": "wiki"}}),
+            ("b", {"lang": "pl", "source": {"name": "wiki"}}),
+            ("c", {"lang": "en", "source": {"name": "blog"}}),
+            ("d", {"lang": "en", "source": {"name": "wiki"}, "flag": True}),
+        ]
+    )
+
+    assert len(index) == 4
+    assert index.match({"lang": "en"}) == ["a", "c", "d"]
+    assert index.match({"lang": "en", "source": {"name": "wiki"}}) == ["a", "d"]
+    assert index.match({"flag": 1}) == []
+    assert index.match({"flag": True}) == ["d"]
+    assert index.match({"missing": "key"}) == []
+    assert index.match({}) == ["a", "b", "c", "d"]
+
+
+def test_metadata_index_replace_and_remove() -> None:
+    index = MetadataIndex()
+    index.add("a", {"lang": "en"})
+    index.add("b", {"lang": "en"})
+
+    index.add("a", {"lang": "pl"})
+
+    assert index.match({"lang": "en"}) == ["b"]
+    assert index.match({"lang": "pl"}) == ["a"]
+    assert index.matches("a", {"lang": "pl"})
+    assert not index.matches("a", compile_where({"lang": "en"}))
+
+    index.remove("a")
+    index.remove("unknown")
+
+    assert len(index) == 1
+    assert index.match({"lang": "pl"}) == []
+    assert not index.matches("a", {})
+    assert index._postings == {"lang": {(False, "en"): {"b": None}}}
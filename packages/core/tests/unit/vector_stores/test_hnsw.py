@@ -0,0 +1,170 @@
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from fetchbits.core.embeddings import DenseEmbedder
+from fetchbits.core.vector_stores.base import VectorStoreEntry
+from fetchbits.core.vector_stores.compaction import CompactionPolicy
+from fetchbits.core.vector_stores.hnsw import HNSWIndex, HNSWVectorStore, HNSWVectorStoreOptions
+
+
+@pytest.fixture(name="vectors")
+def vectors_fixture() -> np.ndarray:
+    return np.random.default_rng(0).standard_normal((1000, 32)).astype(np.float32)
+
+
+@pytest.fixture(name="queries")
+def queries_fixture() -> np.ndarray:
+    return np.random.default_rng(1).standard_normal((50, 32)).astype(np.float32)
+
+
+def _recall(index: HNSWIndex, vectors: np.ndarray, keys: list[int], queries: np.ndarray, k: int = 10) -> float:
+    normalized = vectors[keys] / np.linalg.norm(vectors[keys], axis=1, keepdims=True)
+    hits = 0
+    for query in queries:
+        scores = normalized @ (query / np.linalg.norm(query))
+        expected = {keys[row] for row in np.argsort(-scores)[:k]}
+        hits += len(expected & {key for key, _ in index.search(query, k, ef=64)})
+    return hits / (k * len(queries))
+
+
+def test_search_recall(vectors: np.ndarray, queries: np.ndarray) -> None:
+    index = HNSWIndex(m=8, ef_construction=100, seed=0)
+    for key, vector in enumerate(vectors):
+        index.add(key, vector)
+
+    assert len(index) == 1000
+    assert _recall(index, vectors, list(range(1000)), queries) >= 0.9
+
+
+def test_search_scores_are_cosine_similarities(vectors: np.ndarray, queries: np.ndarray) -> None:
+    index = HNSWIndex(m=8, seed=0)
+    for key, vector in enumerate(vectors[:100]):
+        index.add(key, vector)
+
+    hits = index.search(queries[0], 5)
+
+    scores = [score for _, score in hits]
+    assert scores == sorted(scores, reverse=True)
+    for key, score in hits:
+        vector = vectors[key]  # type: ignore[index]
+        expected = vector @ queries[0] / (np.linalg.norm(vector) * np.linalg.norm(queries[0]))
+        assert score == pytest.approx(expected, abs=1e-5)
+
+
+def test_search_after_removal(vectors: np.ndarray, queries: np.ndarray) -> None:
+    index = HNSWIndex(m=8, ef_construction=100, seed=0)
+    for key, vector in enumerate(vectors):
+        index.add(key, vector)
+
+    for key in range(0, 1000, 2):
+        index.remove(key)
+    index.remove(-1)
+
+    assert len(index) == 500
+    assert 0 not in index
+    for query in queries:
+        assert all(key % 2 for key, _ in index.search(query, 10))
+    assert _recall(index, vectors, list(range(1, 1000, 2)), queries) >= 0.9
+
+    # The slots of the removed nodes are reused.
+    for key in range(0, 1000, 2):
+        index.add(key, vectors[key])
+    assert len(index._keys) == 1000
+    assert _recall(index, vectors, list(range(1000)), queries) >= 0.9
+
+
+def test_add_replaces_vector() -> None:
+    index = HNSWIndex(seed=0)
+    index.add("a", [1.0, 0.0])
+    index.add("b", [0.0, 1.0])
+
+    index.add("a", [0.0, 2.0])
+
+    assert len(index) == 2
+    np.testing.assert_allclose(index.vector("a"), [0.0, 2.0])
+    assert [score for _, score in index.search([0.0, 1.0], 2)] == pytest.approx([1.0, 1.0])
+
+
+def test_search_with_allowed_keys(vectors: np.ndarray, queries: np.ndarray) -> None:
+    index = HNSWIndex(m=8, seed=0)
+    for key, vector in enumerate(vectors[:200]):
+        index.add(key, vector)
+
+    hits = index.search(queries[0], 10, allowed=lambda key: key < 20)  # type: ignore[operator]
+
+    assert len(hits) == 10
+    assert all(key < 20 for key, _ in hits)  # type: ignore[operator]
+
+
+def test_index_rejects_invalid_input() -> None:
+    with pytest.raises(ValueError):
+        HNSWIndex(m=1)
+
+    index = HNSWIndex()
+    assert index.search([1.0, 0.0], 3) == []
+    index.add("a", [1.0, 0.0])
+    with pytest.raises(ValueError):
+        index.add("b", [1.0, 0.0, 0.0])
+
+
+@pytest.mark.asyncio
+async def test_store_retrieve(embedder: DenseEmbedder) -> None:
+    store = HNSWVectorStore(embedder=embedder, seed=0)
+    entries = [VectorStoreEntry(id=uuid4(), text=f"1 {index}", metadata={"odd": index % 2}) for index in range(20)]
+    await store.store(entries)
+
+    results = await store.retreive("1 0", HNSWVectorStoreOptions(k=3))
+    assert [result.entry for result in results] == entries[:3]
+    assert results[0].score == pytest.approx(1.0)
+
+    filtered = await store.retreive("1 0", HNSWVectorStoreOptions(k=3, where={"odd": 1}))
+    assert [result.entry for result in filtered] == [entries[1], entries[3], entries[5]]
+
+    thresholded = await store.retreive("1 0", HNSWVectorStoreOptions(k=3, score_threshold=0.5))
+    assert [result.entry for result in thresholded] == entries[:2]
+
+
+@pytest.mark.asyncio
+async def test_store_remove(embedder: DenseEmbedder) -> None:
+    store = HNSWVectorStore(
+        embedder=embedder, seed=0, compaction_policy=CompactionPolicy(max_tombstones=100, max_tombstone_ratio=1.0)
+    )
+    entries = [VectorStoreEntry(id=uuid4(), text=f"1 {index}") for index in range(10)]
+    await store.store(entries)
+
+    await store.remove([entries[0].id, entries[1].id])
+
+    assert len(store) == 8
+    assert store.compaction_metrics.tombstones == 2
+    results = await store.retreive("1 0", HNSWVectorStoreOptions(k=2))
+    assert [result.entry for result in results] == entries[2:4]
+
+    await store.compact()
+
+    assert store.compaction_metrics.tombstones == 0
+    assert store.compaction_metrics.compacted_entries == 2
+    assert entries[0].id not in store._index
+    assert [result.entry for result in await store.retreive("1 0", HNSWVectorStoreOptions(k=2))] == entries[2:4]
+
+
+@pytest.mark.asyncio
+async def test_retrieved_vectors_are_not_normalized(embedder: DenseEmbedder) -> None:
+    store = HNSWVectorStore(embedder=embedder, m=4, ef_construction=16, seed=0)
+    entries = [VectorStoreEntry(id=uuid4(), text=f"{index} 3 -4") for index in range(5)]
+    await store.store(entries)
+
+    results = await store.retreive("0 3 -4", HNSWVectorStoreOptions(k=5))
+
+    assert {result.entry.id: result.vector for result in results} == {
+        entry.id: [float(index), 3.0, -4.0] for index, entry in enumerate(entries)
+    }
+    assert results[0].score == pytest.approx(1.0)
+
+
+def test_options_reject_graph_parameters() -> None:
+    with pytest.raises(ValueError, match="constructor"):
+        HNSWVectorStoreOptions(m=8)
+    with pytest.raises(ValueError, match="constructor"):
+        HNSWVectorStoreOptions(k=3, ef_construction=100)
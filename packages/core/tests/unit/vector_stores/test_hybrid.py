@@ -0,0 +1,99 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from fetchbits.core.embeddings import DenseEmbedder, SparseEmbedder
+from fetchbits.core.vector_stores.base import VectorStoreEntry, VectorStoreOptions, VectorStoreResult
+from fetchbits.core.vector_stores.hybrid import HybridSearchVectorStore
+from fetchbits.core.vector_stores.hybrid_strategies import ReciprocalRankFusion, WeightedScoreFusion
+from fetchbits.core.vector_stores.in_memory import InMemoryVectorStore
+from fetchbits.core.vector_stores.sparse import SparseVectorStore
+
+ENTRIES = [VectorStoreEntry(id=uuid4(), text=name) for name in ("a", "b", "c", "d")]
+
+
+def _results(*hits: tuple[int, float]) -> list[VectorStoreResult]:
+    return [VectorStoreResult(entry=ENTRIES[index], score=score) for index, score in hits]
+
+
+def test_reciprocal_rank_fusion() -> None:
+    dense, sparse = _results((0, 0.9), (1, 0.8), (2, 0.1)), _results((2, 12.0), (0, 3.0))
+
+    joined = ReciprocalRankFusion().join([dense, sparse])
+
+    assert [result.entry for result in joined] == [ENTRIES[0], ENTRIES[2], ENTRIES[1]]
+    assert [result.score for result in joined] == pytest.approx([1 / 61 + 1 / 62, 1 / 63 + 1 / 61, 1 / 62])
+    assert joined[0].subresults == [dense[0], sparse[1]]
+    assert joined[2].subresults == [dense[1]]
+
+
+def test_weighted_reciprocal_rank_fusion() -> None:
+    dense, sparse = _results((0, 0.9), (1, 0.8)), _results((1, 5.0), (0, 1.0))
+
+    joined = ReciprocalRankFusion(k_constant=1.0, weights=[1.0, 3.0]).join([dense, sparse])
+
+    assert [result.entry for result in joined] == [ENTRIES[1], ENTRIES[0]]
+    assert [result.score for result in joined] == pytest.approx([1 / 3 + 3 / 2, 1 / 2 + 3 / 3])
+
+
+def test_weighted_score_fusion() -> None:
+    dense, sparse, single = _results((0, 0.9), (1, 0.5), (2, 0.1)), _results((2, 20.0), (1, 10.0)), _results((3, 7.0))
+
+    joined = WeightedScoreFusion(weights=[2.0, 1.0, 0.5, 1.0]).join([dense, sparse, single, []])
+
+    scores = {result.entry.id: result.score for result in joined}
+    assert scores == pytest.approx({ENTRIES[0].id: 2.0, ENTRIES[1].id: 1.0, ENTRIES[2].id: 1.0, ENTRIES[3].id: 0.5})
+    assert joined[0].entry == ENTRIES[0]
+    assert [result.score for result in joined] == sorted(scores.values(), reverse=True)
+
+
+class GatedStore(InMemoryVectorStore):
+    """
+    Store answering only once all the gated stores are searching, so it deadlocks if they are queried one by one.
+    """
+
+    def __init__(self, embedder: DenseEmbedder, started: list[asyncio.Event], index: int) -> None:
+        super().__init__(embedder=embedder)
+        self.started = started
+        self.index = index
+
+    async def retrieve_many(
+        self, texts: list[str], options: VectorStoreOptions | None = None
+    ) -> list[list[VectorStoreResult]]:
+        self.started[self.index].set()
+        await asyncio.gather(*(event.wait() for event in self.started))
+        return await super().retrieve_many(texts, options)
+
+
+@pytest.mark.asyncio
+async def test_stores_are_queried_concurrently(embedder: DenseEmbedder) -> None:
+    started = [asyncio.Event(), asyncio.Event()]
+    store = HybridSearchVectorStore(GatedStore(embedder, started, 0), GatedStore(embedder, started, 1))
+    entry = VectorStoreEntry(id=uuid4(), text="1 0")
+    await store.store([entry])
+
+    results = await asyncio.wait_for(store.retreive("1 0"), timeout=5)
+
+    assert [result.entry for result in results] == [entry]
+    assert len(results[0].subresults) == 2
+
+
+@pytest.mark.asyncio
+async def test_dense_and_sparse_retrieval(embedder: DenseEmbedder, sparse_embedder: SparseEmbedder) -> None:
+    dense, sparse = InMemoryVectorStore(embedder=embedder), SparseVectorStore(embedder=sparse_embedder)
+    store = HybridSearchVectorStore(dense, sparse)
+    entries = [VectorStoreEntry(id=uuid4(), text=text) for text in ("1 2", "3 4", "5 6", "2 9")]
+    await store.store(entries)
+
+    results = await store.retrieve_many(["1 2", "4 4"], VectorStoreOptions(k=2))
+
+    assert [len(batch) for batch in results] == [2, 2]
+    assert results[0][0].entry == entries[0]
+    assert results[1][0].entry == entries[1]
+    assert {result.entry.id for result in results[1][0].subresults} == {entries[1].id}
+
+    await store.remove([entries[0].id])
+
+    assert len(await dense.list()) == len(await sparse.list()) == 3
+    assert entries[0] not in [result.entry for result in await store.retreive("1 2", VectorStoreOptions(k=4))]
@@ -0,0 +1,119 @@
+from uuid import uuid4
+
+import pytest
+
+from fetchbits.core.embeddings import DenseEmbedder
+from fetchbits.core.vector_stores.base import VectorStoreEntry, VectorStoreOptions
+from fetchbits.core.vector_stores.in_memory import InMemoryVectorStore
+
+
+def _entry(text: str, **metadata: object) -> VectorStoreEntry:
+    return VectorStoreEntry(id=uuid4(), text=text, metadata=metadata)
+
+
+@pytest.mark.asyncio
+async def test_retrieve_orders_by_cosine_similarity(embedder: DenseEmbedder) -> None:
+    store = InMemoryVectorStore(embedder=embedder)
+    x, y, xy = _entry("2 0"), _entry("0 3"), _entry("1 1")
+    await store.store([x, y, xy])
+
+    results = await store.retreive("5 0", VectorStoreOptions(k=3))
+
+    assert [result.entry for result in results] == [x, xy, y]
+    assert [result.score for result in results] == pytest.approx([1.0, 2**-0.5, 0.0], abs=1e-6)
+    assert results[0].vector == [2.0, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_retrieve_k_and_score_threshold(embedder: DenseEmbedder) -> None:
+    store = InMemoryVectorStore(embedder=embedder)
+    entries = [_entry(f"1 {index}") for index in range(10)]
+    await store.store(entries)
+
+    assert [result.entry for result in await store.retreive("1 0", VectorStoreOptions(k=3))] == entries[:3]
+    thresholded = await store.retreive("1 0", VectorStoreOptions(k=10, score_threshold=0.5))
+    assert [result.entry for result in thresholded] == entries[:2]
+    assert await store.retreive("1 0", VectorStoreOptions(k=0)) == []
+
+
+@pytest.mark.asyncio
+async def test_retrieve_with_where(embedder: DenseEmbedder) -> None:
+    store = InMemoryVectorStore(embedder=embedder)
+    entries = [_entry(f"1 {index}", parity=index % 2) for index in range(6)]
+    await store.store(entries)
+
+    results = await store.retreive("1 0", VectorStoreOptions(k=2, where={"parity": 1}))
+
+    assert [result.entry for result in results] == [entries[1], entries[3]]
+
+
+@pytest.mark.asyncio
+async def test_zero_vectors_score_zero(embedder: DenseEmbedder) -> None:
+    store = InMemoryVectorStore(embedder=embedder)
+    zero, unit = _entry("0 0"), _entry("1 0")
+    await store.store([zero, unit])
+
+    results = await store.retreive("1 0", VectorStoreOptions(k=2))
+    assert [(result.entry, result.score) for result in results] == [(unit, pytest.approx(1.0)), (zero, 0.0)]
+    assert [result.score for result in await store.retreive("0 0", VectorStoreOptions(k=2))] == [0.0, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_store_overwrites_entries(embedder: DenseEmbedder) -> None:
+    store = InMemoryVectorStore(embedder=embedder)
+    entry = _entry("1 0", version=1)
+    await store.store([entry, _entry("0 1")])
+
+    overwrite = VectorStoreEntry(id=entry.id, text="0 1", metadata={"version": 2})
+    await store.store([overwrite])
+
+    assert len(store) == 2
+    results = await store.retreive("0 1", VectorStoreOptions(k=2))
+    assert [result.score for result in results] == pytest.approx([1.0, 1.0])
+    assert overwrite in [result.entry for result in results]
+    assert await store.list(where={"version": 1}) == []
+    assert await store.list(where={"version": 2}) == [overwrite]
+
+
+@pytest.mark.asyncio
+async def test_store_rejects_other_dimensions(embedder: DenseEmbedder) -> None:
+    store = InMemoryVectorStore(embedder=embedder)
+    await store.store([_entry("1 0")])
+
+    with pytest.raises(ValueError):
+        await store.store([_entry("1 0 0")])
+
+
+@pytest.mark.asyncio
+async def test_remove(embedder: DenseEmbedder) -> None:
+    store = InMemoryVectorStore(embedder=embedder)
+    entries = [_entry(f"1 {index}") for index in range(5)]
+    await store.store(entries)
+
+    await store.remove([entries[0].id, entries[2].id, uuid4()])
+
+    assert len(store) == 3
+    results = await store.retreive("1 0", VectorStoreOptions(k=5))
+    assert [result.entry for result in results] == [entries[1], entries[3], entries[4]]
+    assert {entry.id for entry in await store.list()} == {entries[1].id, entries[3].id, entries[4].id}
+
+
+@pytest.mark.asyncio
+async def test_list_with_where_limit_and_offset(embedder: DenseEmbedder) -> None:
+    store = InMemoryVectorStore(embedder=embedder)
+    entries = [_entry(f"1 {index}", group=index % 3) for index in range(9)]
+    await store.store(entries)
+
+    assert await store.list() == entries
+    assert await store.list(limit=2, offset=3) == entries[3:5]
+    assert await store.list(where={"group": 2}) == entries[2::3]
+    assert await store.list(where={"group": 2}, limit=1, offset=1) == [entries[5]]
+
+
+@pytest.mark.asyncio
+async def test_empty_store(embedder: DenseEmbedder) -> None:
+    store = InMemoryVectorStore(embedder=embedder)
+
+    assert len(store) == 0
+    assert await store.retreive("1 0") == []
+    assert await store.list() == []
@@ -0,0 +1,161 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from fetchbits.core.embeddings import DenseEmbedder
+from fetchbits.core.vector_stores.base import IngestionProgress, VectorStoreEntry
+from fetchbits.core.vector_stores.in_memory import InMemoryVectorStore
+
+
+class SlowStore(InMemoryVectorStore):
+    """
+    Store taking a while to store every batch, recording the batches and how many were stored at once.
+    """
+
+    def __init__(self, embedder: DenseEmbedder, fail_on: str | None = None) -> None:
+        super().__init__(embedder=embedder)
+        self.fail_on = fail_on
+        self.batches: list[list[VectorStoreEntry]] = []
+        self.stored_entries = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def store(self, entries: list[VectorStoreEntry]) -> None:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if any(entry.text == self.fail_on for entry in entries):
+                raise RuntimeError("Embedding failed.")
+            await super().store(entries)
+            self.batches.append(entries)
+            self.stored_entries += len(entries)
+        finally:
+            self.active -= 1
+
+
+@pytest.mark.asyncio
+async def test_store_batched(embedder: DenseEmbedder, make_entries: Callable[[int], list[VectorStoreEntry]]) -> None:
+    store = SlowStore(embedder)
+    entries = make_entries(95)
+    reports: list[IngestionProgress] = []
+
+    await store.store_batched(entries, batch_size=10, max_concurrency=3, on_progress=reports.append)
+
+    assert len(store) == 95
+    assert sorted(len(batch) for batch in store.batches) == [5] + [10] * 9
+    assert 1 < store.max_active <= 3
+    assert [report.completed_batches for report in reports] == list(range(1, 11))
+    assert reports[-1].completed_entries == 95
+    assert {(report.total_batches, report.total_entries) for report in reports} == {(10, 95)}
+    assert sorted(report.batch_index for report in reports) == list(range(10))
+    assert {report.batch_size for report in reports if report.batch_index == 9} == {5}
+
+
+@pytest.mark.asyncio
+async def test_store_batched_failure_cancels_remaining_batches(
+    embedder: DenseEmbedder, make_entries: Callable[[int], list[VectorStoreEntry]]
+) -> None:
+    store = SlowStore(embedder, fail_on="0 1")
+
+    with pytest.raises(RuntimeError):
+        await store.store_batched(make_entries(100), batch_size=10, max_concurrency=2)
+
+    await asyncio.sleep(0.05)
+    assert store.active == 0
+    assert store.stored_entries < 100
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("batch_size", "max_concurrency"), [(0, 4), (10, 0), (-1, -1)])
+async def test_store_batched_rejects_non_positive_parameters(
+    embedder: DenseEmbedder,
+    batch_size: int,
+    max_concurrency: int,
+    make_entries: Callable[[int], list[VectorStoreEntry]],
+) -> None:
+    store = SlowStore(embedder)
+
+    with pytest.raises(ValueError):
+        await store.store_batched(make_entries(3), batch_size=batch_size, max_concurrency=max_concurrency)
+    assert store.batches == []
+
+
+async def _stream(
+    entries: list[VectorStoreEntry], store: SlowStore, lag: list[int]
+) -> AsyncIterator[VectorStoreEntry | dict]:
+    """
+    Yields the entries, every other one as a raw dictionary, recording how far the producer got ahead of the store.
+    """
+    for index, entry in enumerate(entries):
+        lag.append(index - store.stored_entries)
+        yield entry.model_dump() if index % 2 else entry
+
+
+@pytest.mark.asyncio
+async def test_store_stream(embedder: DenseEmbedder, make_entries: Callable[[int], list[VectorStoreEntry]]) -> None:
+    store = SlowStore(embedder)
+    entries = make_entries(95)
+    reports: list[IngestionProgress] = []
+
+    stored = await store.store_stream(
+        _stream(entries, store, []), window_size=10, max_concurrency=3, on_progress=reports.append
+    )
+
+    assert stored == 95
+    assert {entry.id for entry in await store.list()} == {entry.id for entry in entries}
+    assert all(isinstance(entry, VectorStoreEntry) for batch in store.batches for entry in batch)
+    assert sorted(len(batch) for batch in store.batches) == [5] + [10] * 9
+    assert store.max_active <= 3
+    assert [report.completed_batches for report in reports] == list(range(1, 11))
+    assert (reports[-1].total_batches, reports[-1].total_entries) == (10, 95)
+
+
+@pytest.mark.asyncio
+async def test_store_stream_applies_backpressure(
+    embedder: DenseEmbedder, make_entries: Callable[[int], list[VectorStoreEntry]]
+) -> None:
+    store = SlowStore(embedder)
+    lag: list[int] = []
+
+    await store.store_stream(_stream(make_entries(300), store, lag), window_size=10, max_concurrency=2)
+
+    # At most the windows being stored, the queued ones and the one being filled are read ahead.
+    assert max(lag) <= (2 * 2 + 1) * 10
+    assert len(store) == 300
+
+
+@pytest.mark.asyncio
+async def test_store_stream_of_nothing(embedder: DenseEmbedder) -> None:
+    store = SlowStore(embedder)
+    reports: list[IngestionProgress] = []
+
+    assert await store.store_stream(_stream([], store, []), on_progress=reports.append) == 0
+    assert reports == []
+
+
+@pytest.mark.asyncio
+async def test_store_stream_rejects_invalid_entries(embedder: DenseEmbedder) -> None:
+    store = SlowStore(embedder)
+
+    async def _invalid() -> AsyncIterator[dict]:
+        yield {"id": str(uuid4()), "text": "1 0"}
+        yield {"id": str(uuid4())}
+
+    with pytest.raises(ValidationError):
+        await store.store_stream(_invalid(), window_size=1)
+
+
+@pytest.mark.asyncio
+async def test_store_stream_rejects_non_positive_parameters(
+    embedder: DenseEmbedder, make_entries: Callable[[int], list[VectorStoreEntry]]
+) -> None:
+    store = SlowStore(embedder)
+
+    with pytest.raises(ValueError):
+        await store.store_stream(_stream(make_entries(3), store, []), window_size=0)
+    with pytest.raises(ValueError):
+        await store.store_stream(_stream(make_entries(3), store, []), max_concurrency=0)
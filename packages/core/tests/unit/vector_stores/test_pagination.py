@@ -0,0 +1,126 @@
+from collections.abc import Callable
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import pytest
+
+from fetchbits.core.embeddings import DenseEmbedder, SparseEmbedder
+from fetchbits.core.vector_stores.base import VectorStore, VectorStoreEntry
+from fetchbits.core.vector_stores.hnsw import HNSWVectorStore
+from fetchbits.core.vector_stores.hybrid import HybridSearchVectorStore
+from fetchbits.core.vector_stores.in_memory import InMemoryVectorStore
+from fetchbits.core.vector_stores.pagination import SortedIds, build_page, decode_cursor, encode_cursor
+from fetchbits.core.vector_stores.sparse import SparseVectorStore
+
+
+def test_cursor_round_trip() -> None:
+    entry_id = uuid4()
+
+    assert decode_cursor(encode_cursor(entry_id)) == entry_id
+    assert decode_cursor(None) is None
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor")
+
+
+def test_sorted_ids() -> None:
+    ids = [uuid4() for _ in range(20)]
+    sorted_ids = SortedIds(ids[:10])
+
+    sorted_ids.add(ids[10:] + ids[:2])
+    sorted_ids.remove([ids[0], ids[15], uuid4()])
+    sorted_ids.add([ids[0]])
+
+    expected = sorted(set(ids) - {ids[15]})
+    assert len(sorted_ids) == 19
+    assert list(sorted_ids.after()) == expected
+    assert list(sorted_ids.after(expected[4])) == expected[5:]
+    assert list(sorted_ids.after(ids[15])) == [entry_id for entry_id in expected if entry_id > ids[15]]
+
+
+def test_build_page() -> None:
+    ids = sorted(uuid4() for _ in range(5))
+
+    page = build_page(iter(ids), 2, str)
+    last_page = build_page(iter(ids[3:]), 2, str)
+
+    assert page.entries == [str(ids[0]), str(ids[1])]  # type: ignore[comparison-overlap]
+    assert page.next_cursor == encode_cursor(ids[1])
+    assert last_page.next_cursor is None
+    assert build_page(iter([]), 2, str).entries == []
+
+
+def _stores(embedder: DenseEmbedder, sparse_embedder: SparseEmbedder) -> list[VectorStore]:
+    return [
+        InMemoryVectorStore(embedder=embedder),
+        HNSWVectorStore(embedder=embedder),
+        SparseVectorStore(embedder=sparse_embedder),
+        HybridSearchVectorStore(InMemoryVectorStore(embedder=embedder), SparseVectorStore(embedder=sparse_embedder)),
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("store_index", range(4))
+async def test_list_pages(
+    embedder: DenseEmbedder,
+    sparse_embedder: SparseEmbedder,
+    store_index: int,
+    make_entries: Callable[[int], list[VectorStoreEntry]],
+) -> None:
+    store = _stores(embedder, sparse_embedder)[store_index]
+    entries = make_entries(25)
+    await store.store(entries)
+
+    pages = [await store.list_page(limit=10)]
+    while pages[-1].next_cursor is not None:
+        pages.append(await store.list_page(limit=10, cursor=pages[-1].next_cursor))
+
+    assert [len(page.entries) for page in pages] == [10, 10, 5]
+    assert [entry.id for page in pages for entry in page.entries] == sorted(entry.id for entry in entries)
+
+    odd = [entry.id async for entry in store.iter_entries(where={"odd": 1}, batch_size=4)]
+    assert odd == sorted(entry.id for entry in entries if entry.metadata["odd"])
+
+
+@pytest.mark.asyncio
+async def test_pages_are_stable_under_writes(
+    embedder: DenseEmbedder, make_entries: Callable[[int], list[VectorStoreEntry]]
+) -> None:
+    store = InMemoryVectorStore(embedder=embedder)
+    entries = make_entries(20)
+    await store.store(entries)
+    first = await store.list_page(limit=10)
+    last_listed = first.entries[-1].id
+
+    added = make_entries(10)
+    await store.store(added)
+    await store.remove([entry.id for entry in first.entries[:3]])
+    rest = [entry.id async for entry in store.iter_entries(batch_size=3, cursor=first.next_cursor)]
+
+    assert rest == sorted(entry.id for entry in entries + added if entry.id > last_listed)
+
+
+@pytest.mark.asyncio
+async def test_list_pages_of_saved_store(
+    tmp_path: Path, embedder: DenseEmbedder, make_entries: Callable[[int], list[VectorStoreEntry]]
+) -> None:
+    reference = InMemoryVectorStore(embedder=embedder)
+    entries = make_entries(15)
+    await reference.store(entries)
+    reference.save(tmp_path / "segment")
+    store = InMemoryVectorStore.load(tmp_path / "segment", embedder)
+    added = make_entries(5)
+    await store.store(added)
+    await store.remove([entries[0].id])
+
+    listed: list[UUID] = [entry.id async for entry in store.iter_entries(batch_size=4)]
+
+    assert listed == sorted(entry.id for entry in entries[1:] + added)
+
+
+@pytest.mark.asyncio
+async def test_iter_entries_rejects_non_positive_batch_size(embedder: DenseEmbedder) -> None:
+    store = InMemoryVectorStore(embedder=embedder)
+
+    with pytest.raises(ValueError):
+        _ = [entry async for entry in store.iter_entries(batch_size=0)]
+
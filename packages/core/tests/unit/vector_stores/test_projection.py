@@ -0,0 +1,74 @@
+from uuid import uuid4
+
+import pytest
+
+from fetchbits.core.embeddings import DenseEmbedder, SparseEmbedder
+from fetchbits.core.vector_stores.base import (
+    ResultProjection,
+    VectorStore,
+    VectorStoreEntry,
+    VectorStoreOptions,
+    VectorStoreResult,
+    project_result,
+)
+from fetchbits.core.vector_stores.hnsw import HNSWVectorStore
+from fetchbits.core.vector_stores.in_memory import InMemoryVectorStore
+from fetchbits.core.vector_stores.sparse import SparseVectorStore
+
+ENTRY = VectorStoreEntry(id=uuid4(), text="1 2", image_bytes=b"\x01", metadata={"a": 1})
+
+
+def test_project_result() -> None:
+    fetched: list[str] = []
+
+    def entry() -> VectorStoreEntry:
+        fetched.append("entry")
+        return ENTRY
+
+    def vector() -> list[float]:
+        fetched.append("vector")
+        return [1.0, 2.0]
+
+    full = project_result(ENTRY.id, 0.5, ResultProjection.FULL, entry, vector)
+    assert full == VectorStoreResult(entry=ENTRY, vector=[1.0, 2.0], score=0.5)
+    assert fetched == ["entry", "vector"]
+
+    fetched.clear()
+    projected = project_result(ENTRY.id, 0.5, ResultProjection.ENTRY, entry, vector)
+    assert (projected.entry.id, projected.entry.text, projected.entry.metadata) == (ENTRY.id, "1 2", {"a": 1})
+    assert (projected.entry.image_bytes, projected.vector) == (None, None)
+    assert fetched == ["entry"]
+
+    fetched.clear()
+    ids_only = project_result(ENTRY.id, 0.5, ResultProjection.IDS, entry, vector)
+    assert (ids_only.entry.id, ids_only.entry.text, ids_only.entry.metadata) == (ENTRY.id, None, {})
+    assert (ids_only.vector, ids_only.score) == (None, 0.5)
+    assert fetched == []
+
+
+def _stores(embedder: DenseEmbedder, sparse_embedder: SparseEmbedder) -> list[VectorStore]:
+    return [
+        InMemoryVectorStore(embedder=embedder),
+        HNSWVectorStore(embedder=embedder),
+        SparseVectorStore(embedder=sparse_embedder),
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("store_index", range(3))
+async def test_retrieve_with_projection(
+    embedder: DenseEmbedder, sparse_embedder: SparseEmbedder, store_index: int
+) -> None:
+    store = _stores(embedder, sparse_embedder)[store_index]
+    await store.store([ENTRY, VectorStoreEntry(id=uuid4(), text="3 4")])
+
+    full = await store.retreive("1 2", VectorStoreOptions(k=1))
+    projected = await store.retreive("1 2", VectorStoreOptions(k=1, projection=ResultProjection.ENTRY))
+    ids_only = await store.retreive("1 2", VectorStoreOptions(k=1, projection=ResultProjection.IDS))
+
+    assert full[0].entry == ENTRY
+    assert full[0].vector is not None
+    assert [result.score for result in projected] == [result.score for result in ids_only] == [full[0].score]
+    assert projected[0].entry.model_dump(exclude={"image_bytes"}) == ENTRY.model_dump(exclude={"image_bytes"})
+    assert (projected[0].entry.image_bytes, projected[0].vector) == (None, None)
+    assert (ids_only[0].entry.id, ids_only[0].entry.text, ids_only[0].vector) == (ENTRY.id, None, None)
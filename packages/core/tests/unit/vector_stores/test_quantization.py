@@ -0,0 +1,134 @@
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from fetchbits.core.embeddings import DenseEmbedder
+from fetchbits.core.vector_stores.base import VectorStoreEntry
+from fetchbits.core.vector_stores.in_memory import InMemoryVectorStore, InMemoryVectorStoreOptions
+from fetchbits.core.vector_stores.quantization import ProductQuantizer, Quantizer, ScalarQuantizer, load_quantizer
+
+DIM = 32
+CORPUS_SIZE = 2000
+QUERY_COUNT = 20
+K = 10
+
+
+class LookupEmbedder(DenseEmbedder):
+    """
+    Embeds the texts with the vectors given up front.
+    """
+
+    def __init__(self, vectors: dict[str, list[float]]) -> None:
+        self.vectors = vectors
+
+    async def embed_text(self, data: list[str], options: object = None) -> list[list[float]]:
+        return [self.vectors[text] for text in data]
+
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture(name="vectors")
+def vectors_fixture() -> np.ndarray:
+    # Clustered data, so the exact neighbours are well separated from the rest of the corpus.
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((40, DIM))
+    return (centers[rng.integers(0, 40, CORPUS_SIZE)] + 0.5 * rng.standard_normal((CORPUS_SIZE, DIM))).astype(
+        np.float32
+    )
+
+
+@pytest.fixture(name="queries")
+def queries_fixture(vectors: np.ndarray) -> np.ndarray:
+    rng = np.random.default_rng(1)
+    return vectors[rng.choice(CORPUS_SIZE, QUERY_COUNT, replace=False)] + 0.1 * rng.standard_normal((QUERY_COUNT, DIM))
+
+
+async def _recall(quantizer: Quantizer, vectors: np.ndarray, queries: np.ndarray, rescore_factor: int) -> float:
+    texts = {f"document {row}": vector.tolist() for row, vector in enumerate(vectors)}
+    texts |= {f"query {row}": query.tolist() for row, query in enumerate(queries)}
+    store = InMemoryVectorStore(embedder=LookupEmbedder(texts), quantizer=quantizer)
+    await store.store([VectorStoreEntry(id=uuid4(), text=f"document {row}") for row in range(CORPUS_SIZE)])
+    store.quantize(seed=0)
+
+    exact = np.argsort(-(_normalized(queries) @ _normalized(vectors).T), axis=1)[:, :K]
+    results = await store.retrieve_many(
+        [f"query {row}" for row in range(QUERY_COUNT)],
+        InMemoryVectorStoreOptions(k=K, rescore_factor=rescore_factor),
+    )
+    found = [{int(result.entry.text.split()[1]) for result in batch} for batch in results]  # type: ignore[union-attr]
+    return np.mean([len(found[row] & set(exact[row].tolist())) / K for row in range(QUERY_COUNT)])
+
+
+@pytest.mark.asyncio
+async def test_scalar_quantizer_recall(vectors: np.ndarray, queries: np.ndarray) -> None:
+    assert await _recall(ScalarQuantizer(), vectors, queries, rescore_factor=0) >= 0.9
+    assert await _recall(ScalarQuantizer(), vectors, queries, rescore_factor=4) >= 0.95
+
+
+@pytest.mark.asyncio
+async def test_product_quantizer_recall(vectors: np.ndarray, queries: np.ndarray) -> None:
+    assert await _recall(ProductQuantizer(subspaces=8, seed=0), vectors, queries, rescore_factor=0) >= 0.4
+    assert await _recall(ProductQuantizer(subspaces=8, seed=0), vectors, queries, rescore_factor=4) >= 0.9
+
+
+@pytest.mark.asyncio
+async def test_rescored_scores_are_exact(vectors: np.ndarray, queries: np.ndarray) -> None:
+    texts = {f"document {row}": vector.tolist() for row, vector in enumerate(vectors)} | {"query": queries[0].tolist()}
+    store = InMemoryVectorStore(embedder=LookupEmbedder(texts), quantizer=ProductQuantizer(subspaces=8, seed=0))
+    await store.store([VectorStoreEntry(id=uuid4(), text=f"document {row}") for row in range(CORPUS_SIZE)])
+    store.quantize(seed=0)
+
+    results = await store.retreive("query", InMemoryVectorStoreOptions(k=K))
+
+    exact = _normalized(queries[:1]) @ _normalized(vectors).T
+    for result in results:
+        row = int(result.entry.text.split()[1])  # type: ignore[union-attr]
+        assert result.score == pytest.approx(exact[0, row], abs=1e-5)
+
+
+@pytest.mark.parametrize("quantizer", [ScalarQuantizer(), ProductQuantizer(subspaces=4, centroids=16, seed=0)])
+def test_quantizer_state_round_trip(quantizer: Quantizer, vectors: np.ndarray) -> None:
+    quantizer.train(_normalized(vectors))
+
+    loaded = load_quantizer(type(quantizer).__name__, quantizer.get_state())
+
+    codes = quantizer.encode(_normalized(vectors[:50]))
+    np.testing.assert_array_equal(loaded.encode(_normalized(vectors[:50])), codes)
+    np.testing.assert_allclose(loaded.decode(codes), quantizer.decode(codes))
+
+
+def test_untrained_quantizer_cannot_encode() -> None:
+    with pytest.raises(ValueError):
+        ScalarQuantizer().encode(np.zeros((1, DIM)))
+    with pytest.raises(ValueError):
+        ProductQuantizer().encode(np.zeros((1, DIM)))
+
+
+def test_unknown_quantizer() -> None:
+    with pytest.raises(ValueError):
+        load_quantizer("OptimizedProductQuantizer", {})
+
+
+@pytest.mark.asyncio
+async def test_quantize_moves_vectors_out_of_memory(embedder: DenseEmbedder) -> None:
+    store = InMemoryVectorStore(embedder=embedder, quantizer=ScalarQuantizer())
+    await store.store([VectorStoreEntry(id=uuid4(), text=f"text {row}") for row in range(100)])
+
+    store.quantize(seed=0)
+    assert isinstance(store._vectors, np.memmap)
+
+    new = VectorStoreEntry(id=uuid4(), text="new")
+    await store.store([new] + [VectorStoreEntry(id=uuid4(), text=f"more {row}") for row in range(100)])
+    assert isinstance(store._vectors, np.memmap)
+    assert (await store.retreive("new", InMemoryVectorStoreOptions(k=1)))[0].entry == new
+
+
+@pytest.mark.asyncio
+async def test_quantize_requires_quantizer_and_vectors(embedder: DenseEmbedder) -> None:
+    with pytest.raises(ValueError):
+        InMemoryVectorStore(embedder=embedder).quantize()
+    with pytest.raises(ValueError):
+        InMemoryVectorStore(embedder=embedder, quantizer=ScalarQuantizer()).quantize()
@@ -0,0 +1,91 @@
+from uuid import uuid4
+
+import pytest
+
+from fetchbits.core.embeddings import DenseEmbedder
+from fetchbits.core.vector_stores.base import (
+    VectorStore,
+    VectorStoreEntry,
+    VectorStoreOptions,
+    VectorStoreResult,
+    VectorStoreWithDenseEmbedder,
+)
+from fetchbits.core.vector_stores.hnsw import HNSWVectorStore
+from fetchbits.core.vector_stores.in_memory import InMemoryVectorStore
+
+TEXTS = [f"text {index}" for index in range(40)]
+
+
+class PerQueryStore(InMemoryVectorStore):
+    """
+    Store falling back to the default `retrieve_many`, running `retreive` for every text.
+    """
+
+    retrieve_many = VectorStore.retrieve_many  # type: ignore[assignment]
+
+    async def retreive(self, text: str, options: VectorStoreOptions | None = None) -> list[VectorStoreResult]:
+        return (await InMemoryVectorStore.retrieve_many(self, [text], options))[0]
+
+
+def _ids(results: list[list[VectorStoreResult]]) -> list[list[object]]:
+    return [[result.entry.id for result in batch] for batch in results]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("store_cls", [InMemoryVectorStore, HNSWVectorStore, PerQueryStore])
+async def test_retrieve_many_matches_retrieve(
+    embedder: DenseEmbedder, store_cls: type[VectorStoreWithDenseEmbedder]
+) -> None:
+    store = store_cls(embedder=embedder)
+    await store.store(
+        [VectorStoreEntry(id=uuid4(), text=text, metadata={"odd": index % 2}) for index, text in enumerate(TEXTS)]
+    )
+    queries = ["text 3", "text 17", "something else", "text 3"]
+
+    for options in (VectorStoreOptions(k=5), VectorStoreOptions(k=3, where={"odd": 1})):
+        results = await store.retrieve_many(queries, options)
+        expected = [await store.retreive(query, options) for query in queries]
+
+        assert _ids(results) == _ids(expected)
+        for batch, expected_batch in zip(results, expected, strict=True):
+            assert [result.score for result in batch] == pytest.approx([result.score for result in expected_batch])
+        assert results[0][0].entry.text == "text 3"
+        assert _ids(results)[0] == _ids(results)[3]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("store_cls", [InMemoryVectorStore, HNSWVectorStore])
+async def test_retrieve_many_embeds_queries_once(
+    embedder: DenseEmbedder, store_cls: type[VectorStoreWithDenseEmbedder]
+) -> None:
+    store = store_cls(embedder=embedder)
+    await store.store([VectorStoreEntry(id=uuid4(), text=text) for text in TEXTS])
+    embedder.calls.clear()  # type: ignore[attr-defined]
+
+    await store.retrieve_many(["text 1", "text 2", "text 3"])
+
+    assert embedder.calls == [["text 1", "text 2", "text 3"]]  # type: ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_retrieve_many_in_chunks(embedder: DenseEmbedder, monkeypatch: pytest.MonkeyPatch) -> None:
+    store = InMemoryVectorStore(embedder=embedder)
+    await store.store([VectorStoreEntry(id=uuid4(), text=text) for text in TEXTS])
+    queries = TEXTS[::3]
+    expected = await store.retrieve_many(queries)
+
+    # Every chunk of the score matrix holds a single query.
+    monkeypatch.setattr("fetchbits.core.vector_stores.in_memory._SCORE_CHUNK_ELEMENTS", len(TEXTS))
+    results = await store.retrieve_many(queries)
+
+    assert _ids(results) == _ids(expected)
+    assert [batch[0].entry.text for batch in results] == queries
+
+
+@pytest.mark.asyncio
+async def test_retrieve_many_without_queries_or_entries(embedder: DenseEmbedder) -> None:
+    store = InMemoryVectorStore(embedder=embedder)
+
+    assert await store.retrieve_many([]) == []
+    assert await store.retrieve_many(["text 1", "text 2"]) == [[], []]
+    assert embedder.calls == []  # type: ignore[attr-defined]
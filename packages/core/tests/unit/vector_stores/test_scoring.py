@@ -0,0 +1,12 @@
+import numpy as np
+
+from fetchbits.core.vector_stores.scoring import top_k
+
+
+def test_top_k() -> None:
+    scores = np.array([0.1, 0.9, -0.5, 0.9, 0.3, np.nan, 0.7], dtype=np.float32)
+
+    assert top_k(scores, 3).tolist() == [1, 3, 6]
+    assert top_k(scores, 10).tolist() == [1, 3, 6, 4, 0, 2]
+    assert top_k(scores, 10, score_threshold=0.3).tolist() == [1, 3, 6, 4]
+    assert top_k(np.empty(0, dtype=np.float32), 3).tolist() == []
@@ -0,0 +1,209 @@
+import json
+from collections.abc import Callable
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import numpy as np
+import pytest
+
+from fetchbits.core.embeddings import DenseEmbedder
+from fetchbits.core.vector_stores.base import VectorStoreEntry, VectorStoreOptions
+from fetchbits.core.vector_stores.in_memory import InMemoryVectorStore
+from fetchbits.core.vector_stores.quantization import ScalarQuantizer
+from fetchbits.core.vector_stores.segment import SegmentEntries, VectorSegment
+
+
+async def _all_ids(store: InMemoryVectorStore) -> list[UUID]:
+    ids: list[UUID] = []
+    cursor = None
+    while True:
+        page = await store.list_page(limit=7, cursor=cursor)
+        ids.extend(entry.id for entry in page.entries)
+        if (cursor := page.next_cursor) is None:
+            return ids
+
+
+def test_segment_round_trip(tmp_path: Path, make_entries: Callable[[int], list[VectorStoreEntry]]) -> None:
+    entries = make_entries(20)
+    vectors = np.random.default_rng(0).standard_normal((20, 4)).astype(np.float32)
+
+    segment = VectorSegment.write(tmp_path / "segment", entries, vectors)
+
+    assert len(segment) == 20
+    assert segment.dim == 4
+    assert segment.codes is None
+    assert segment.quantizer is None
+    for entry, vector in zip(entries, vectors, strict=True):
+        row = segment.row_of(entry.id)
+        assert row is not None
+        assert segment.id_at(row) == entry.id
+        assert segment.entry(row) == entry
+        np.testing.assert_array_equal(segment.vectors[row], vector)
+        assert segment.norms[row] == pytest.approx(np.linalg.norm(vector), rel=1e-6)
+    assert segment.row_of(uuid4()) is None
+
+
+def test_segment_rows_are_sorted_by_id(tmp_path: Path, make_entries: Callable[[int], list[VectorStoreEntry]]) -> None:
+    entries = make_entries(20)
+    segment = VectorSegment.write(tmp_path / "segment", entries, np.zeros((20, 2)))
+
+    ids = [segment.id_at(row) for row in range(len(segment))]
+    assert ids == sorted(entry.id for entry in entries)
+    assert list(segment.rows_after()) == list(range(20))
+    assert list(segment.rows_after(ids[4])) == list(range(5, 20))
+    assert list(segment.rows_after(ids[-1])) == []
+
+
+def test_empty_segment(tmp_path: Path) -> None:
+    segment = VectorSegment.write(tmp_path / "segment", [], np.zeros((0, 3)))
+
+    assert len(segment) == 0
+    assert segment.vectors.shape == (0, 3)
+    assert segment.row_of(uuid4()) is None
+
+
+def test_segment_write_rejects_mismatched_vectors(
+    tmp_path: Path, make_entries: Callable[[int], list[VectorStoreEntry]]
+) -> None:
+    with pytest.raises(ValueError):
+        VectorSegment.write(tmp_path / "segment", make_entries(3), np.zeros((2, 4)))
+    with pytest.raises(ValueError):
+        VectorSegment.write(tmp_path / "segment", make_entries(3), np.zeros((3, 4)), codes=np.zeros((3, 4)))
+
+
+def test_segment_write_replaces_existing_segment(
+    tmp_path: Path, make_entries: Callable[[int], list[VectorStoreEntry]]
+) -> None:
+    old_entries, new_entries = make_entries(5), make_entries(8)
+    old = VectorSegment.write(tmp_path / "segment", old_entries, np.ones((5, 2)))
+
+    new = VectorSegment.write(tmp_path / "segment", new_entries, np.zeros((8, 2)))
+
+    assert [path.name for path in tmp_path.iterdir()] == ["segment"]
+    assert len(new) == 8
+    assert new.row_of(old_entries[0].id) is None
+    # The segment opened before the replacement keeps serving its own files.
+    row = old.row_of(old_entries[0].id)
+    assert row is not None
+    assert old.entry(row) == old_entries[0]
+
+
+def test_failed_segment_write_keeps_existing_segment(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, make_entries: Callable[[int], list[VectorStoreEntry]]
+) -> None:
+    entries = make_entries(5)
+    VectorSegment.write(tmp_path / "segment", entries, np.ones((5, 2)))
+
+    def fail(entry: VectorStoreEntry) -> bytes:
+        raise RuntimeError("Disk full.")
+
+    monkeypatch.setattr("fetchbits.core.vector_stores.segment.encode_entry", fail)
+    with pytest.raises(RuntimeError):
+        VectorSegment.write(tmp_path / "segment", make_entries(8), np.zeros((8, 2)))
+
+    assert [path.name for path in tmp_path.iterdir()] == ["segment"]
+    segment = VectorSegment(tmp_path / "segment")
+    assert {segment.id_at(row) for row in range(len(segment))} == {entry.id for entry in entries}
+
+
+def test_unsupported_segment_version(tmp_path: Path, make_entries: Callable[[int], list[VectorStoreEntry]]) -> None:
+    path = tmp_path / "segment"
+    VectorSegment.write(path, make_entries(2), np.zeros((2, 2)))
+    (path / "header.json").write_text(json.dumps({"version": 99, "count": 2, "dim": 2}))
+
+    with pytest.raises(ValueError):
+        VectorSegment(path)
+
+
+def test_segment_entries_shadow_segment(tmp_path: Path, make_entries: Callable[[int], list[VectorStoreEntry]]) -> None:
+    entries = make_entries(3)
+    mapping = SegmentEntries(VectorSegment.write(tmp_path / "segment", entries, np.zeros((3, 2))))
+    replacement = VectorStoreEntry(id=entries[0].id, text="replaced")
+    added = VectorStoreEntry(id=uuid4(), text="added")
+
+    mapping[replacement.id] = replacement
+    mapping[added.id] = added
+    del mapping[entries[1].id]
+
+    assert len(mapping) == 3
+    assert mapping[entries[0].id] == replacement
+    assert entries[1].id not in mapping
+    assert set(mapping) == {entries[0].id, entries[2].id, added.id}
+    with pytest.raises(KeyError):
+        del mapping[entries[1].id]
+
+
+@pytest.mark.asyncio
+async def test_store_save_and_load(
+    tmp_path: Path, embedder: DenseEmbedder, make_entries: Callable[[int], list[VectorStoreEntry]]
+) -> None:
+    entries = make_entries(50)
+    reference = InMemoryVectorStore(embedder=embedder)
+    await reference.store(entries)
+    reference.save(tmp_path / "segment")
+
+    loaded = InMemoryVectorStore.load(tmp_path / "segment", embedder)
+
+    assert len(loaded) == 50
+    assert await _all_ids(loaded) == sorted(entry.id for entry in entries)
+    for options in (VectorStoreOptions(k=5), VectorStoreOptions(k=5, where={"group": 1})):
+        expected = await reference.retreive("7 1", options)
+        results = await loaded.retreive("7 1", options)
+        assert [result.entry for result in results] == [result.entry for result in expected]
+        assert [result.score for result in results] == pytest.approx([result.score for result in expected], abs=1e-5)
+
+
+@pytest.mark.asyncio
+async def test_loaded_store_modifications(
+    tmp_path: Path, embedder: DenseEmbedder, make_entries: Callable[[int], list[VectorStoreEntry]]
+) -> None:
+    entries = make_entries(30)
+    reference = InMemoryVectorStore(embedder=embedder)
+    await reference.store(entries)
+    reference.save(tmp_path / "segment")
+    loaded = InMemoryVectorStore.load(tmp_path / "segment", embedder)
+
+    overwrite = VectorStoreEntry(id=entries[3].id, text="-1 5", metadata={"group": 9})
+    added = [VectorStoreEntry(id=uuid4(), text=f"{index + 2} -1", metadata={"group": 1}) for index in range(5)]
+    for store in (reference, loaded):
+        await store.store([overwrite, *added])
+        await store.remove([entries[4].id, added[0].id])
+
+    assert len(loaded) == len(reference) == 33
+    assert await _all_ids(loaded) == await _all_ids(reference)
+    for options in (VectorStoreOptions(k=5), VectorStoreOptions(k=5, where={"group": 9})):
+        expected = await reference.retreive("-1 5", options)
+        results = await loaded.retreive("-1 5", options)
+        assert [result.entry for result in results] == [result.entry for result in expected]
+
+    # Saving over the loaded segment folds the modifications in.
+    loaded.save(tmp_path / "segment")
+    reloaded = InMemoryVectorStore.load(tmp_path / "segment", embedder)
+    assert await _all_ids(reloaded) == await _all_ids(reference)
+    assert (await reloaded.retreive("-1 5", VectorStoreOptions(k=1)))[0].entry == overwrite
+
+
+@pytest.mark.asyncio
+async def test_quantized_store_save_and_load(
+    tmp_path: Path, embedder: DenseEmbedder, make_entries: Callable[[int], list[VectorStoreEntry]]
+) -> None:
+    entries = make_entries(100)
+    store = InMemoryVectorStore(embedder=embedder, quantizer=ScalarQuantizer())
+    await store.store(entries)
+    store.quantize(seed=0)
+    store.save(tmp_path / "segment")
+
+    loaded = InMemoryVectorStore.load(tmp_path / "segment", embedder)
+
+    segment = VectorSegment(tmp_path / "segment")
+    assert isinstance(segment.quantizer, ScalarQuantizer)
+    assert segment.codes is not None
+    assert segment.codes.shape == (100, 2)
+    expected = await store.retrieve_many(["1 1", "2 1"], VectorStoreOptions(k=5))
+    results = await loaded.retrieve_many(["1 1", "2 1"], VectorStoreOptions(k=5))
+    assert [[result.entry.id for result in batch] for batch in results] == [
+        [result.entry.id for result in batch] for batch in expected
+    ]
+
+    await loaded.store([VectorStoreEntry(id=uuid4(), text="1 2")])
+    assert (await loaded.retreive("1 2", VectorStoreOptions(k=1)))[0].entry.text == "1 2"
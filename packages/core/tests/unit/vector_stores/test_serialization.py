@@ -0,0 +1,101 @@
+import json
+from uuid import uuid4
+
+import pytest
+
+from fetchbits.core.embeddings import SparseVector
+from fetchbits.core.utils.pydantic import BASE64_PREFIX, BYTES_ENCODING_CONTEXT_KEY
+from fetchbits.core.vector_stores.base import VectorStoreEntry, VectorStoreResult
+from fetchbits.core.vector_stores.serialization import (
+    decode_entries,
+    decode_entry,
+    decode_results,
+    encode_entries,
+    encode_entry,
+    encode_results,
+)
+
+ENTRIES = [
+    VectorStoreEntry(id=uuid4(), text="text", image_bytes=b"\x00\xffimage", metadata={"nested": {"tags": ["a"]}}),
+    VectorStoreEntry(id=uuid4(), text="zażółć"),
+    VectorStoreEntry(id=uuid4(), image_bytes=b"\x01"),
+]
+
+
+def test_entry_round_trip() -> None:
+    for entry in ENTRIES:
+        assert decode_entry(encode_entry(entry)) == entry
+
+
+def test_entries_round_trip() -> None:
+    buffer = encode_entries(ENTRIES)
+
+    assert decode_entries(buffer) == ENTRIES
+    assert decode_entries(encode_entries([])) == []
+
+
+def test_zero_copy_decoding_keeps_images_in_the_buffer() -> None:
+    buffer = encode_entries(ENTRIES)
+
+    entries = decode_entries(buffer, zero_copy=True)
+
+    assert isinstance(entries[0].image_bytes, memoryview)
+    assert bytes(entries[0].image_bytes) == ENTRIES[0].image_bytes
+    assert [entry.metadata for entry in entries] == [entry.metadata for entry in ENTRIES]
+
+
+def test_results_round_trip() -> None:
+    results = [
+        VectorStoreResult(
+            entry=ENTRIES[0],
+            vector=[0.5, -1.0],
+            score=0.25,
+            subresults=[
+                VectorStoreResult(entry=ENTRIES[0], vector=[0.5, -1.0], score=0.5),
+                VectorStoreResult(entry=ENTRIES[0], vector=SparseVector(indices=[3, 7], values=[1.0, 2.0]), score=4),
+            ],
+        ),
+        VectorStoreResult(entry=ENTRIES[1], score=0.125),
+    ]
+
+    assert decode_results(encode_results(results)) == results
+
+
+def test_truncated_and_mismatched_buffers_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        decode_entry(encode_entry(ENTRIES[0])[:-3])
+    with pytest.raises(ValueError):
+        decode_results(encode_entries(ENTRIES))
+    with pytest.raises(ValueError):
+        decode_entries(b"JSON" + encode_entries(ENTRIES)[4:])
+
+
+def test_image_bytes_python_dump_is_hex() -> None:
+    entry = ENTRIES[0]
+
+    assert entry.model_dump()["image_bytes"] == entry.image_bytes.hex()  # type: ignore[union-attr]
+    assert VectorStoreEntry.model_validate(entry.model_dump()) == entry
+
+    base64_dump = entry.model_dump(context={BYTES_ENCODING_CONTEXT_KEY: "base64"})
+    assert base64_dump["image_bytes"].startswith(BASE64_PREFIX)
+    assert VectorStoreEntry.model_validate(base64_dump) == entry
+
+
+def test_image_bytes_json_dump_is_hex() -> None:
+    entry = ENTRIES[0]
+
+    assert json.loads(entry.model_dump_json())["image_bytes"] == entry.image_bytes.hex()  # type: ignore[union-attr]
+    assert VectorStoreEntry.model_validate_json(entry.model_dump_json()) == entry
+
+    base64_dump = entry.model_dump_json(context={BYTES_ENCODING_CONTEXT_KEY: "base64"})
+    assert json.loads(base64_dump)["image_bytes"].startswith(BASE64_PREFIX)
+    assert VectorStoreEntry.model_validate_json(base64_dump) == entry
+
+
+def test_hex_json_dump_round_trip() -> None:
+    dump = json.dumps({"id": str(uuid4()), "text": "text", "image_bytes": "00ff696d616765", "metadata": {}})
+
+    entry = VectorStoreEntry.model_validate_json(dump)
+
+    assert entry.image_bytes == b"\x00\xffimage"
+    assert json.loads(entry.model_dump_json()) == json.loads(dump)
@@ -0,0 +1,74 @@
+from collections.abc import Iterator
+from uuid import uuid4
+
+import pytest
+
+from fetchbits.core.embeddings import DenseEmbedder
+from fetchbits.core.vector_stores.base import ResultProjection, VectorStoreEntry, VectorStoreOptions
+from fetchbits.core.vector_stores.in_memory import InMemoryVectorStore
+from fetchbits.core.vector_stores.sharded import ShardedVectorStore
+
+ENTRIES = [VectorStoreEntry(id=uuid4(), text=f"entry {index}", metadata={"odd": index % 2}) for index in range(60)]
+
+
+@pytest.fixture(name="store")
+def store_fixture(embedder: DenseEmbedder) -> Iterator[ShardedVectorStore]:
+    with ShardedVectorStore(embedder=embedder, shards=3) as store:
+        yield store
+
+
+@pytest.mark.asyncio
+async def test_sharded_search_matches_in_memory_store(store: ShardedVectorStore, embedder: DenseEmbedder) -> None:
+    reference = InMemoryVectorStore(embedder=embedder)
+    await store.store(ENTRIES)
+    await reference.store(ENTRIES)
+    queries = ["entry 3", "entry 42", "something else"]
+
+    for options in (
+        VectorStoreOptions(k=7),
+        VectorStoreOptions(k=5, where={"odd": 0}),
+        VectorStoreOptions(k=60, score_threshold=0.2),
+    ):
+        results = await store.retrieve_many(queries, options)
+        expected = await reference.retrieve_many(queries, options)
+
+        assert [[result.entry for result in batch] for batch in results] == [
+            [result.entry for result in batch] for batch in expected
+        ]
+        for batch, expected_batch in zip(results, expected, strict=True):
+            assert [result.score for result in batch] == pytest.approx([result.score for result in expected_batch])
+            for result, expected_result in zip(batch, expected_batch, strict=True):
+                assert result.vector == pytest.approx(expected_result.vector)
+
+
+@pytest.mark.asyncio
+async def test_sharded_store_overwrite_and_remove(store: ShardedVectorStore) -> None:
+    await store.store(ENTRIES)
+    replacement = VectorStoreEntry(id=ENTRIES[0].id, text="entry 0", metadata={"odd": 1})
+    await store.store([replacement])
+    await store.remove([entry.id for entry in ENTRIES[1:10]] + [uuid4()])
+
+    results = await store.retreive("entry 0", VectorStoreOptions(k=60, where={"odd": 1}))
+
+    assert len(store) == 51
+    assert results[0].entry == replacement
+    assert {result.entry.id for result in results}.isdisjoint(entry.id for entry in ENTRIES[1:10])
+    assert [entry.id for entry in (await store.list_page(limit=100)).entries] == sorted(
+        [ENTRIES[0].id] + [entry.id for entry in ENTRIES[10:]]
+    )
+
+
+@pytest.mark.asyncio
+async def test_sharded_projection(store: ShardedVectorStore) -> None:
+    await store.store(ENTRIES)
+
+    results = await store.retreive("entry 5", VectorStoreOptions(k=2, projection=ResultProjection.IDS))
+
+    assert results[0].entry.id == ENTRIES[5].id
+    assert (results[0].entry.text, results[0].vector) == (None, None)
+
+
+@pytest.mark.asyncio
+async def test_empty_sharded_store(store: ShardedVectorStore) -> None:
+    assert await store.retrieve_many(["entry 1", "entry 2"]) == [[], []]
+    assert await store.list() == []
@@ -0,0 +1,149 @@
+from uuid import UUID, uuid4
+
+import numpy as np
+import pytest
+
+from fetchbits.core.embeddings import DenseEmbedder, SparseEmbedder, SparseVector
+from fetchbits.core.vector_stores.base import VectorStoreEntry, VectorStoreOptions
+from fetchbits.core.vector_stores.sparse import SparseInvertedIndex, SparseVectorStore
+
+VOCABULARY_SIZE = 200
+
+
+def _random_vector(rng: np.random.Generator, terms: int) -> SparseVector:
+    indices = np.sort(rng.choice(VOCABULARY_SIZE, size=terms, replace=False))
+    return SparseVector(indices=indices.tolist(), values=rng.exponential(size=terms).round(3).tolist())
+
+
+def _dot(first: SparseVector, second: SparseVector) -> float:
+    weights = dict(zip(first.indices, first.values, strict=True))
+    return sum(weights.get(index, 0.0) * value for index, value in zip(second.indices, second.values, strict=True))
+
+
+def _brute_force(
+    documents: dict[UUID, SparseVector],
+    query: SparseVector,
+    k: int,
+    score_threshold: float | None = None,
+) -> list[tuple[UUID, float]]:
+    scored = [(key, _dot(query, vector)) for key, vector in documents.items()]
+    matching = [
+        (key, score)
+        for key, score in scored
+        if score > 0 and (score_threshold is None or score >= score_threshold)
+    ]
+    return sorted(matching, key=lambda item: item[1], reverse=True)[:k]
+
+
+def _assert_same_top_k(results: list[tuple[UUID, float]], expected: list[tuple[UUID, float]]) -> None:
+    # Keys tied at the k-th score may be swapped, the scores may not.
+    assert [score for _, score in results] == pytest.approx([score for _, score in expected])
+    scores = dict(expected)
+    for key, score in results:
+        if key in scores:
+            assert score == pytest.approx(scores[key])
+
+
+@pytest.fixture(name="corpus")
+def corpus_fixture() -> dict[UUID, SparseVector]:
+    rng = np.random.default_rng(0)
+    return {uuid4(): _random_vector(rng, int(rng.integers(1, 30))) for _ in range(500)}
+
+
+@pytest.mark.parametrize("k", [1, 10, 100])
+def test_search_matches_brute_force(corpus: dict[UUID, SparseVector], k: int) -> None:
+    index = SparseInvertedIndex()
+    for key, vector in corpus.items():
+        index.add(key, vector)
+
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        query = _random_vector(rng, int(rng.integers(1, 10)))
+        _assert_same_top_k(index.search(query, k), _brute_force(corpus, query, k))
+
+
+def test_search_with_threshold_and_filter(corpus: dict[UUID, SparseVector]) -> None:
+    index = SparseInvertedIndex()
+    for key, vector in corpus.items():
+        index.add(key, vector)
+    allowed = set(list(corpus)[::3])
+
+    rng = np.random.default_rng(2)
+    for _ in range(20):
+        query = _random_vector(rng, 5)
+        results = index.search(query, 10, score_threshold=1.0, allowed=allowed.__contains__)
+        expected = _brute_force({key: corpus[key] for key in allowed}, query, 10, score_threshold=1.0)
+        _assert_same_top_k(results, expected)
+
+
+def test_search_after_updates(corpus: dict[UUID, SparseVector]) -> None:
+    index = SparseInvertedIndex(compaction_ratio=0.2)
+    for key, vector in corpus.items():
+        index.add(key, vector)
+
+    rng = np.random.default_rng(3)
+    documents = dict(corpus)
+    keys = list(corpus)
+    for key in keys[:200]:
+        index.remove(key)
+        del documents[key]
+    for key in keys[150:250]:
+        documents[key] = _random_vector(rng, 10)
+        index.add(key, documents[key])
+
+    assert len(index) == len(documents)
+    assert index.vector(keys[220]) == documents[keys[220]]
+    for _ in range(20):
+        query = _random_vector(rng, 8)
+        _assert_same_top_k(index.search(query, 10), _brute_force(documents, query, 10))
+
+
+def test_search_without_matches() -> None:
+    index = SparseInvertedIndex()
+    index.add(uuid4(), SparseVector(indices=[1, 2], values=[1.0, 1.0]))
+
+    assert index.search(SparseVector(indices=[3], values=[1.0]), 10) == []
+    assert index.search(SparseVector(indices=[1], values=[1.0]), 0) == []
+
+
+@pytest.mark.asyncio
+async def test_store_retrieve(sparse_embedder: SparseEmbedder) -> None:
+    store = SparseVectorStore(embedder=sparse_embedder)
+    entries = [
+        VectorStoreEntry(id=uuid4(), text="1 2", metadata={"lang": "en"}),
+        VectorStoreEntry(id=uuid4(), text="2 2 3", metadata={"lang": "pl"}),
+        VectorStoreEntry(id=uuid4(), text="4", metadata={"lang": "en"}),
+    ]
+    await store.store(entries)
+
+    results = await store.retreive("2 3")
+    assert [(result.entry, result.score) for result in results] == [(entries[1], 3.0), (entries[0], 1.0)]
+    assert results[0].vector == SparseVector(indices=[2, 3], values=[2.0, 1.0])
+
+    filtered = await store.retreive("2 3", VectorStoreOptions(where={"lang": "en"}))
+    assert [result.entry for result in filtered] == [entries[0]]
+    thresholded = await store.retreive("2 3", VectorStoreOptions(score_threshold=2.0))
+    assert [result.entry for result in thresholded] == [entries[1]]
+
+
+@pytest.mark.asyncio
+async def test_store_overwrite_and_remove(sparse_embedder: SparseEmbedder) -> None:
+    store = SparseVectorStore(embedder=sparse_embedder)
+    first, second = VectorStoreEntry(id=uuid4(), text="1"), VectorStoreEntry(id=uuid4(), text="1 1")
+    await store.store([first, second])
+
+    overwrite = VectorStoreEntry(id=first.id, text="2")
+    await store.store([overwrite])
+    await store.remove([second.id])
+
+    assert await store.retreive("1") == []
+    assert [result.entry for result in await store.retreive("2")] == [overwrite]
+    assert await store.list() == [overwrite]
+
+
+@pytest.mark.asyncio
+async def test_store_rejects_dense_embedder(embedder: DenseEmbedder) -> None:
+    store = SparseVectorStore(embedder=embedder)
+
+    with pytest.raises(ValueError):
+        await store.store([VectorStoreEntry(id=uuid4(), text="1 0")])